@@ -1,9 +1,12 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import User
 from django.contrib.contenttypes.fields import GenericForeignKey
 from django.contrib.contenttypes.models import ContentType
 from django.utils import timezone
 from django.urls import reverse
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+from apps.common.utils.counters import adjust_counter
 
 
 class Bookmark(models.Model):
@@ -32,6 +35,15 @@ class Bookmark(models.Model):
     def __str__(self):
         return f"{self.user.username} - {self.content_object}"
     
+    def save(self, *args, **kwargs):
+        is_new = self.pk is None
+        
+        # Yer imini kaydet ve içeriğin yer imi sayacını aynı transaction içinde artır
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if is_new:
+                adjust_counter(self.content_type_id, self.object_id, 'bookmark_count', 1)
+    
     @classmethod
     def toggle_bookmark(cls, user, content_object):
         """
@@ -74,4 +86,12 @@ class Bookmark(models.Model):
         # Try to use get_absolute_url if the content object has it
         if hasattr(self.content_object, 'get_absolute_url'):
             return self.content_object.get_absolute_url()
-        return None
\ No newline at end of file
+        return None
+
+
+@receiver(post_delete, sender=Bookmark)
+def decrement_bookmark_count(sender, instance, **kwargs):
+    """
+    Yer imi silindiğinde içeriğin yer imi sayacını azalt (silme transaction'ı içinde çalışır)
+    """
+    adjust_counter(instance.content_type_id, instance.object_id, 'bookmark_count', -1)
@@ -1,10 +1,10 @@
 from django.contrib import admin
-from .models import ChatRoom, Message
+from .models import ArchivedMessage, ChatRoom, Message
 
 
 @admin.register(ChatRoom)
 class ChatRoomAdmin(admin.ModelAdmin):
-    list_display = ['id', 'created_at', 'is_active']
+    list_display = ['id', 'created_at', 'last_message_at', 'is_active']
     list_filter = ['created_at', 'is_active']
     search_fields = ['participants']
     date_hierarchy = 'created_at'
@@ -12,4 +12,9 @@ class ChatRoomAdmin(admin.ModelAdmin):
 
 @admin.register(Message)
 class MessageAdmin(admin.ModelAdmin):
-    list_display = ('id', 'chat_room')
\ No newline at end of file
+    list_display = ('id', 'chat_room')
+
+@admin.register(ArchivedMessage)
+class ArchivedMessageAdmin(admin.ModelAdmin):
+    list_display = ('id', 'chat_room', 'timestamp', 'archived_at')
+    raw_id_fields = ('chat_room', 'sender')
@@ -1,6 +1,7 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
-from apps.chat.models import ChatRoom, Message, MessageAttachment
+from django.db import models
+from apps.chat.models import ChatReadState, ChatRoom, Message, MessageAttachment
 
 User = get_user_model()
 
@@ -71,11 +72,35 @@ class MessageAttachmentSerializer(serializers.ModelSerializer):
         return None
 
 
+class MessageListSerializer(serializers.ListSerializer):
+    """
+    Mesaj listeleri için: sayfadaki mesajların odalarına ait okuma işaretleri
+    (read watermark) tek sorguda yüklenir, is_read mesaj başına sorgu yapmaz.
+    """
+
+    def to_representation(self, data):
+        iterable = data.all() if isinstance(data, models.manager.BaseManager) else data
+        messages = list(iterable)
+
+        watermarks = self.context.setdefault('read_watermarks', {})
+        room_ids = {message.chat_room_id for message in messages} - set(watermarks)
+        if room_ids:
+            for room_id in room_ids:
+                watermarks[room_id] = {}
+            for room_id, user_id, last_read_id in ChatReadState.objects.filter(
+                chat_room_id__in=room_ids
+            ).values_list('chat_room_id', 'user_id', 'last_read_message_id'):
+                watermarks[room_id][user_id] = last_read_id
+
+        return super().to_representation(messages)
+
+
 class MessageSerializer(serializers.ModelSerializer):
     """Serializer for individual messages"""
     sender = UserSerializer(read_only=True)
     attachments = MessageAttachmentSerializer(many=True, read_only=True)
     is_mine = serializers.SerializerMethodField()
+    is_read = serializers.SerializerMethodField()
     uploaded_images = serializers.ListField(
         child=serializers.ImageField(max_length=1000000, allow_empty_file=False, use_url=False),
         write_only=True,
@@ -85,7 +110,13 @@ class MessageSerializer(serializers.ModelSerializer):
     class Meta:
         model = Message
         fields = ['id', 'sender', 'text', 'timestamp', 'is_read', 'is_delivered', 'attachments', 'uploaded_images', 'is_mine']
-        read_only_fields = ['is_read', 'is_delivered', 'timestamp']
+        read_only_fields = ['is_delivered', 'timestamp']
+        list_serializer_class = MessageListSerializer
+    
+    def get_is_read(self, obj):
+        """Whether a recipient's read watermark has reached this message"""
+        watermarks = self.context.get('read_watermarks', {}).get(obj.chat_room_id)
+        return obj.is_read_by_recipients(watermarks)
     
     def get_is_mine(self, obj):
         """Check if this message belongs to the current user"""
@@ -117,10 +148,11 @@ class ChatRoomSerializer(serializers.ModelSerializer):
     last_message = serializers.SerializerMethodField()
     unread = serializers.SerializerMethodField()
     is_deleted = serializers.SerializerMethodField()
+    is_muted = serializers.SerializerMethodField()
     
     class Meta:
         model = ChatRoom
-        fields = ['id', 'participants', 'other_participant', 'created_at', 'updated_at', 'is_active', 'last_message', 'unread', 'is_deleted']
+        fields = ['id', 'participants', 'other_participant', 'created_at', 'updated_at', 'is_active', 'last_message', 'unread', 'is_deleted', 'is_muted']
     
     def get_other_participant(self, obj):
         """Get the other participant (not the current user)"""
@@ -131,24 +163,32 @@ class ChatRoomSerializer(serializers.ModelSerializer):
         # Get the current user
         current_user = request.user
         
-        # Find the other participant
-        other_user = obj.participants.exclude(id=current_user.id).first()
+        # Find the other participant (participants are prefetched by the view)
+        other_user = next(
+            (participant for participant in obj.participants.all() if participant.id != current_user.id),
+            None
+        )
         if other_user:
             return UserSerializer(other_user, context=self.context).data
         return None
     
     def get_last_message(self, obj):
-        """Get the last message in the chat room"""
-        last_message = obj.get_last_message()
-        if last_message:
-            return {
-                'text': last_message.text,
-                'timestamp': last_message.timestamp,
-                'sender': UserSerializer(last_message.sender, context=self.context).data
-            }
-        return None
+        """Get the last message in the chat room (denormalized on the room)"""
+        if obj.last_message_id is None:
+            return None
+        # Deleted by the user and no new messages since
+        if obj.last_message_id <= (getattr(obj, 'cleared_message_id', None) or 0):
+            return None
+        return {
+            'text': obj.last_message_text,
+            'timestamp': obj.last_message_at,
+            'sender': UserSerializer(obj.last_message_sender, context=self.context).data
+        }
     def get_unread(self, obj):
         """Get count of unread messages for the current user"""
+        if hasattr(obj, 'unread_for_user'):
+            # Annotated by ChatRoom.for_participant
+            return obj.unread_for_user
         request = self.context.get('request')
         if request and hasattr(request, 'user'):
             return obj.get_unread_count(request.user)
@@ -156,7 +196,19 @@ class ChatRoomSerializer(serializers.ModelSerializer):
         
     def get_is_deleted(self, obj):
         """Check if the chat room is deleted for the current user"""
+        if hasattr(obj, 'is_deleted_for_user'):
+            # Annotated by ChatRoom.get_active_rooms_for_user
+            return obj.is_deleted_for_user
         request = self.context.get('request')
         if request and hasattr(request, 'user'):
             return obj.deleted_by.filter(id=request.user.id).exists()
         return False
+
+    def get_is_muted(self, obj):
+        """Whether the current user muted the chat room"""
+        if hasattr(obj, 'is_muted_for_user'):
+            return obj.is_muted_for_user
+        request = self.context.get('request')
+        if request and hasattr(request, 'user'):
+            return obj.read_states.filter(user=request.user, is_muted=True).exists()
+        return False
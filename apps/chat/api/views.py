@@ -3,16 +3,18 @@ from rest_framework.response import Response
 from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
 from django.contrib.auth import get_user_model
-from django.db.models import Q, OuterRef, Subquery
+from django.db import transaction
+from django.db.models import Prefetch, Q
 from django.shortcuts import get_object_or_404
 from rest_framework import serializers
-from django.utils import timezone
-from rest_framework.pagination import PageNumberPagination
 from channels.layers import get_channel_layer
 from asgiref.sync import async_to_sync
 
-from apps.chat.models import ChatRoom, Message, MessageAttachment, ChatRoomDeletion
+from apps.chat.archive import read_through
+from apps.chat.models import ChatRoom, MessageAttachment
 from apps.chat.utils import can_message_user
+from apps.profiles.search import search_condition, search_users
+from apps.common.pagination import OptInCursorPagination
 from .serializers import (
     ChatRoomSerializer, 
     MessageSerializer,
@@ -21,10 +23,11 @@ from .serializers import (
 
 User = get_user_model()
 
-class StandardResultsSetPagination(PageNumberPagination):
+class StandardResultsSetPagination(OptInCursorPagination):
     page_size = 20  # Her sayfada kaç mesaj olacağını belirtir
     page_size_query_param = 'page_size' # İstemcinin sayfa boyutunu değiştirmesine izin verir
     max_page_size = 100 # Maksimum sayfa boyutu
+    cursor_ordering = ('timestamp', 'id')  # ?pagination=cursor ile keyset sayfalama
 
 class ChatRoomViewSet(viewsets.ModelViewSet):
     """ViewSet for chat rooms (conversations)"""
@@ -41,45 +44,17 @@ class ChatRoomViewSet(viewsets.ModelViewSet):
         
         if self.action == 'retrieve':
             # For retrieve, allow access to the chat room even if user deleted it
-            return ChatRoom.objects.filter(
-                participants=user
-            ).distinct()
-        
-        # For list action, first get all chat rooms the user is part of
-        chat_rooms = ChatRoom.objects.filter(
-            participants=user,
-            is_active=True
-        ).distinct()
-          # Exclude chat rooms marked as deleted by the user
-        deleted_chat_room_ids = []
-        
-        for chat_room in chat_rooms:
-            # Check if this chat room was deleted by the user
-            if chat_room.deleted_by.filter(id=user.id).exists():
-                # Get the latest deletion record using the related_name
-                deletion_record = chat_room.deletion_records.filter(
-                    user=user
-                ).order_by('-deleted_at').first()
-                
-                if deletion_record:
-                    # Check if there are any messages after deletion
-                    has_new_messages = chat_room.messages.filter(
-                        timestamp__gt=deletion_record.deleted_at
-                    ).exists()
-                    
-                    # If no new messages after deletion, add to exclusion list
-                    if not has_new_messages:
-                        deleted_chat_room_ids.append(chat_room.id)
-          # Return chat rooms excluding the deleted ones without new messages
-        
-        # Get the latest message for each chat room using subquery to order by most recent message
-        latest_message_subquery = Message.objects.filter(
-            chat_room=OuterRef('pk')
-        ).order_by('-timestamp').values('timestamp')[:1]
-        
-        return chat_rooms.exclude(id__in=deleted_chat_room_ids).annotate(
-            last_message_time=Subquery(latest_message_subquery)
-        ).order_by('-last_message_time')
+            queryset = ChatRoom.for_participant(user)
+        else:
+            # For list action: active rooms, minus the ones deleted by the user without new messages
+            queryset = ChatRoom.with_last_message_time(ChatRoom.get_active_rooms_for_user(user))
+        
+        # Son mesaj ve kullanıcı durumu odada tutulur; serileştirme sadece katılımcıları toplu yükler
+        return queryset.select_related(
+            'last_message_sender__profile__university'
+        ).prefetch_related(
+            Prefetch('participants', queryset=User.objects.select_related('profile__university'))
+        )
     
     def create(self, request):
         """Create a new chat room or return existing one between two users"""
@@ -135,15 +110,8 @@ class ChatRoomViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_403_FORBIDDEN
             )
         
-        # Mark as deleted for this user
-        chat_room.deleted_by.add(user)
-        
-        # Create or update deletion record with current timestamp
-        ChatRoomDeletion.objects.update_or_create(
-            chat_room=chat_room,
-            user=user,
-            defaults={'deleted_at': timezone.now()}
-        )
+        # Mark as deleted for this user (messages up to now stay hidden for the user)
+        chat_room.clear_for_user(user)
         
         # Check if all participants have deleted the chat
         all_participants = set(chat_room.participants.all().values_list('id', flat=True))
@@ -151,11 +119,8 @@ class ChatRoomViewSet(viewsets.ModelViewSet):
         
         # If all participants have deleted the chat, delete it permanently
         if all_participants == deleted_by_participants:
-            # First delete all messages to avoid foreign key constraints
-            Message.objects.filter(chat_room=chat_room).delete()
-            
-            # Then delete the chat room itself
-            chat_room.delete()
+            # Delete the messages in batches, then the chat room itself
+            ChatRoom.delete_rooms([chat_room.id])
             
             return Response({'status': 'Chat permanently deleted'}, status=status.HTTP_200_OK)
         
@@ -173,13 +138,11 @@ class ChatRoomViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Search for chat rooms by participant's name or username
+        # Search for chat rooms by participant's name or username (people search index)
         # Only include chat rooms that the current user is in
         queryset = self.get_queryset().filter(
             participants__in=User.objects.filter(
-                Q(username__icontains=query) | 
-                Q(first_name__icontains=query) | 
-                Q(last_name__icontains=query)
+                search_condition(query) or Q(pk__in=[])
             ).exclude(id=user.id)
         ).distinct()
         
@@ -193,27 +156,10 @@ class ChatRoomViewSet(viewsets.ModelViewSet):
         
         # Mark all messages as read for the requesting user
         instance.mark_messages_as_read(request.user)
+        instance.unread_for_user = 0
         
-        # Get the serialized data
-        data = serializer.data
-        
-        # Check if the user has deleted this chat before
-        deletion_record = instance.deletion_records.filter(
-            user=request.user
-        ).order_by('-deleted_at').first()
-        
-        # If there's a deletion record, check if there are any new messages
-        if deletion_record:
-            # Count messages after deletion
-            new_messages_count = instance.messages.filter(
-                timestamp__gt=deletion_record.deleted_at
-            ).count()
-            
-            # If no new messages, clear the last_message field
-            if new_messages_count == 0:
-                data['last_message'] = None
-        
-        return Response(data)
+        # last_message is None if the user deleted this chat and there are no new messages
+        return Response(serializer.data)
     
     @action(detail=True, methods=['post'])
     def mark_as_read(self, request, pk=None):
@@ -257,6 +203,17 @@ class ChatRoomViewSet(viewsets.ModelViewSet):
             'message': f'{marked_count} messages marked as read'
         })
 
+    @action(detail=True, methods=['post'])
+    def mute(self, request, pk=None):
+        """Mute (or with `is_muted: false` unmute) push notifications of a chat room for the current user"""
+        chat_room = self.get_object()
+        is_muted = request.data.get('is_muted', True)
+        if isinstance(is_muted, str):
+            is_muted = is_muted.lower() not in ('false', '0', '')
+        
+        chat_room.set_muted(request.user, bool(is_muted))
+        return Response({'status': 'success', 'is_muted': bool(is_muted)})
+
 class MessageViewSet(viewsets.ModelViewSet):
     """ViewSet for managing messages within a chat room"""
     serializer_class = MessageSerializer
@@ -267,22 +224,31 @@ class MessageViewSet(viewsets.ModelViewSet):
         """Return messages for the specific chat room, ordered by timestamp descending"""
         chat_room_pk = self.kwargs.get('chat_room_pk')
         
-        # Kullanıcının silme kaydını kontrol et
+        # Kullanıcının sildiği (silme işaretine kadarki) mesajlar gösterilmez
         user = self.request.user
         chat_room = get_object_or_404(ChatRoom, id=chat_room_pk)
+        self.chat_room = chat_room
         
-        deletion_record = ChatRoomDeletion.objects.filter(
-            chat_room=chat_room,
-            user=user
-        ).order_by('-deleted_at').first()
-        
-        messages_query = Message.objects.filter(chat_room__id=chat_room_pk)
-        
-        if deletion_record:
-            messages_query = messages_query.filter(timestamp__gt=deletion_record.deleted_at)
+        messages_query = chat_room.visible_messages(user)
             
         # Mesajları en yeniden eskiye doğru sırala (infinite scroll için genellikle bu tercih edilir)
-        return messages_query.order_by('-timestamp')
+        return messages_query.select_related('sender__profile__university').prefetch_related(
+            'attachments'
+        ).order_by('-timestamp')
+
+    def list(self, request, *args, **kwargs):
+        """List messages; pages past the live window continue from the room's archive"""
+        queryset = self.filter_queryset(self.get_queryset())
+        queryset = read_through(queryset, self.chat_room, request.user)
+        
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+        
+        serializer = self.get_serializer(queryset, many=True)
+        return Response(serializer.data)
+    
     def create(self, request, chat_room_pk=None):
         """Create a new message in the specified chat room"""
         try:
@@ -311,24 +277,18 @@ class MessageViewSet(viewsets.ModelViewSet):
             # Create the message
             serializer = self.get_serializer(data=request.data)
             if serializer.is_valid():
-                message = serializer.save(
-                    chat_room=chat_room,
-                    sender=request.user
-                )
-                
-                # Activate the chat room if not already active
-                chat_room.activate()
-                
-                # If this user previously deleted the chat, remove from deleted_by
-                # but keep the ChatRoomDeletion record so old messages remain hidden
-                if chat_room.deleted_by.filter(id=request.user.id).exists():
-                    chat_room.deleted_by.remove(request.user)
+                # Message, the room's last message (activation, updated_at) and the recipients'
+                # unread counts are written in one transaction (ChatRoom.record_message)
+                with transaction.atomic():
+                    message = serializer.save(
+                        chat_room=chat_room,
+                        sender=request.user
+                    )
                     
-                    # DO NOT delete the ChatRoomDeletion record
-                    # This way, old messages will remain hidden
-                
-                # Update chat room's updated_at timestamp
-                chat_room.save(update_fields=['updated_at'])
+                    # If this user previously deleted the chat, remove from deleted_by
+                    # but keep the deletion watermark so old messages remain hidden
+                    if chat_room.deleted_by.filter(id=request.user.id).exists():
+                        chat_room.deleted_by.remove(request.user)
                 
                 return Response(
                     serializer.data, 
@@ -345,6 +305,16 @@ class MessageViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_404_NOT_FOUND
             )
 
+    def perform_destroy(self, instance):
+        """
+        Delete a message; recipients' unread counts and (if it was the room's last message)
+        the room's last message are corrected in the same transaction
+        """
+        instance.chat_room.remove_message(instance)
+
+
+USER_SEARCH_CANDIDATES = 100  # Gizlilik kontrolünden geçirilecek en iyi eşleşme sayısı
+
 
 class UserSearchAPIView(generics.ListAPIView):
     """
@@ -359,13 +329,10 @@ class UserSearchAPIView(generics.ListAPIView):
         if not query:
             return User.objects.none()
             
-        # Get users that match the search query, initially excluding current user
-        users_query = User.objects.filter(
-            ~Q(id=self.request.user.id) &  # Exclude the current user
-            (Q(username__icontains=query) | 
-             Q(first_name__icontains=query) | 
-             Q(last_name__icontains=query))
-        )
+        # Get users that match the search query (ranked, best matches first), excluding current user
+        users_query = search_users(query, exclude_user=self.request.user).select_related(
+            'profile__university'
+        )[:USER_SEARCH_CANDIDATES]
         
         # Manuel filtreleme yaklaşımı
         filtered_users = []
@@ -0,0 +1,160 @@
+"""
+Sohbet mesajı arşivi.
+
+Message tablosu sürekli büyür; etkin olmayan odaların eski mesajları kompakt
+ArchivedMessage tablosuna taşınır (`python manage.py archive_chat_messages`):
+- Sadece son mesajı CHAT_ARCHIVE_INACTIVE_DAYS günden eski odalar arşivlenir
+- CHAT_ARCHIVE_AFTER_DAYS günden eski mesajlar taşınır; her odanın son
+  CHAT_ARCHIVE_KEEP_RECENT mesajı her zaman canlı tabloda kalır
+- Taşıma id sırasıyla, her parti kendi transaction'ında yapılır; oda için
+  ChatRoom.archived_until_id sınırı ilerletilir (sınırın altı arşivde, üstü canlı)
+
+MessageViewSet listeyi `read_through` ile okur: istemci canlı pencerenin sonuna
+kadar kaydırdığında sayfalar (sayfa numaralı ya da keyset) arşivden devam eder.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+CHAT_ARCHIVE_AFTER_DAYS = getattr(settings, 'CHAT_ARCHIVE_AFTER_DAYS', 180)
+CHAT_ARCHIVE_INACTIVE_DAYS = getattr(settings, 'CHAT_ARCHIVE_INACTIVE_DAYS', 30)
+CHAT_ARCHIVE_KEEP_RECENT = getattr(settings, 'CHAT_ARCHIVE_KEEP_RECENT', 100)
+
+
+def archivable_rooms(inactive_days=CHAT_ARCHIVE_INACTIVE_DAYS):
+    """Son mesajı inactive_days günden eski odalar"""
+    from apps.chat.models import ChatRoom
+
+    return ChatRoom.objects.filter(
+        last_message_at__lt=timezone.now() - timedelta(days=inactive_days)
+    ).order_by('id')
+
+
+def archive_boundary(room, after_days=CHAT_ARCHIVE_AFTER_DAYS, keep_recent=CHAT_ARCHIVE_KEEP_RECENT):
+    """
+    Odada arşivlenecek son mesajın id'si: after_days günden eski ve son keep_recent
+    mesajdan önce olan mesajların en büyüğü. Arşivlenecek mesaj yoksa None.
+    """
+    keep_from_id = room.messages.order_by('-id').values_list('id', flat=True)[
+        max(1, keep_recent) - 1:max(1, keep_recent)
+    ].first()
+    if keep_from_id is None:
+        return None
+    return room.messages.filter(
+        id__lt=keep_from_id,
+        timestamp__lt=timezone.now() - timedelta(days=after_days),
+    ).aggregate(boundary=Max('id'))['boundary']
+
+
+def archive_room(room, boundary, batch_size=1000):
+    """
+    Odanın id'si boundary'ye kadar olan mesajlarını partiler halinde arşive taşır.
+    Ek dosyaları silinmez; arşivdeki kayıt onları göstermeye devam eder.
+
+    Returns:
+        int: Taşınan mesaj sayısı
+    """
+    from apps.chat.models import ArchivedMessage, ChatRoom, Message, keep_attachment_files
+
+    moved = 0
+    while True:
+        with transaction.atomic():
+            messages = list(
+                Message.objects.filter(
+                    chat_room=room, id__lte=boundary
+                ).order_by('id').prefetch_related('attachments')[:batch_size]
+            )
+            if not messages:
+                break
+            message_ids = [message.pk for message in messages]
+            ArchivedMessage.objects.bulk_create(
+                [ArchivedMessage.from_message(message) for message in messages],
+                ignore_conflicts=True
+            )
+            # Ek dosyaları arşivde kullanılmaya devam eder; kayıtlarla birlikte silinmez
+            with keep_attachment_files():
+                Message.objects.filter(id__in=message_ids).delete()
+            ChatRoom.objects.filter(pk=room.pk, archived_until_id__lt=message_ids[-1]).update(
+                archived_until_id=message_ids[-1]
+            )
+        moved += len(messages)
+    room.archived_until_id = max(room.archived_until_id, boundary)
+    return moved
+
+
+class MessageHistory:
+    """
+    Canlı ve arşivlenmiş mesajları sayfalayıcılara tek bir sıralı liste gibi gösterir.
+
+    Arşiv sınırı id ile belirlendiğinden tüm canlı mesajlar arşivdekilerden yenidir:
+    azalan sıralamada (en yeni önce) liste canlı mesajlarla başlar ve arşivle devam eder.
+    Sayfalayıcıların kullandığı order_by/filter/count/dilimleme desteklenir; arşiv
+    sadece canlı pencerenin ötesindeki sayfalar istendiğinde sorgulanır.
+    """
+
+    def __init__(self, live, archived):
+        self.live = live
+        self.archived = archived
+        self.model = live.model
+        self.query = live.query
+        self.ordered = True
+
+    def _newest_first(self):
+        ordering = list(self.live.query.order_by) or list(self.model._meta.ordering)
+        return bool(ordering) and str(ordering[0]).startswith('-')
+
+    def _parts(self):
+        if self._newest_first():
+            return self.live, self.archived
+        return self.archived, self.live
+
+    def order_by(self, *fields):
+        return MessageHistory(self.live.order_by(*fields), self.archived.order_by(*fields))
+
+    def filter(self, *args, **kwargs):
+        return MessageHistory(self.live.filter(*args, **kwargs), self.archived.filter(*args, **kwargs))
+
+    def count(self):
+        return self.live.count() + self.archived.count()
+
+    def __len__(self):
+        return self.count()
+
+    def __iter__(self):
+        return iter(self[0:None])
+
+    def __getitem__(self, key):
+        if isinstance(key, int):
+            items = self[key:key + 1]
+            if not items:
+                raise IndexError(key)
+            return items[0]
+
+        start, stop = key.start or 0, key.stop
+        first, second = self._parts()
+        items = list(first[start:stop])
+        if stop is not None and len(items) == stop - start:
+            return items
+
+        first_count = start + len(items) if items else first.count()
+        second_start = max(0, start - first_count)
+        second_stop = None if stop is None else stop - first_count
+        if second_stop is not None and second_stop <= second_start:
+            return items
+        return items + list(second[second_start:second_stop])
+
+
+def read_through(messages, room, user):
+    """
+    Odanın mesaj listesi (canlı queryset) arşivlenmiş mesajlarıyla birlikte.
+    Oda hiç arşivlenmemişse queryset olduğu gibi döner.
+    """
+    if not room.archived_until_id:
+        return messages
+    archived = room.visible_messages(user, archived=True).select_related('sender__profile__university').order_by(
+        *messages.query.order_by
+    )
+    return MessageHistory(messages, archived)
@@ -1,15 +1,18 @@
+import asyncio
 import json
+import time
 from channels.generic.websocket import AsyncWebsocketConsumer
 from channels.db import database_sync_to_async
-from django.contrib.auth.models import User, AnonymousUser
-from django.utils import timezone
-from django.conf import settings
-from urllib.parse import parse_qs
-import jwt
-from .models import ChatRoom, Message
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Prefetch
+from django.db.models.functions import Coalesce
+from .models import ChatReadState, ChatRoom, Message
 from apps.common.templatetags.time_tags import relative_time
 from .utils import can_message_user
-from apps.push_notifications.services import firebase_service
+from .delivery import aget_room_member_ids, deliver_message
+from .unread import get_room_unread_count, get_unread_room_count
+from apps.push_notifications.outbox import enqueue_push
 
 class ChatConsumer(AsyncWebsocketConsumer):
     async def connect(self):
@@ -24,85 +27,11 @@ class ChatConsumer(AsyncWebsocketConsumer):
             self.is_room_specific = True
             self.room_group_name = f'chat_{self.room_id}'
         
-        # Kullanıcıyı doğrula
+        # Kullanıcı (session ya da JWT) JWTAuthMiddlewareStack tarafından doğrulanmış gelir
         self.user = self.scope["user"]
         
-        # Headers'dan authorization token'ını alma (React Native için - öncelik)
-        headers = dict(self.scope.get('headers', []))
-        auth_header = headers.get(b'authorization', b'').decode('utf-8')
-        
-        # Fallback: Query string'den token alma (eski yöntem)
-        query_string = parse_qs(self.scope['query_string'].decode())
-        query_auth_header = query_string.get('authorization', [None])[0]
-        token_param = query_string.get('token', [None])[0]
-        
-        # Eğer user anonim ise ve token varsa (mobil uygulama için)
-        if isinstance(self.user, AnonymousUser) and (auth_header or query_auth_header or token_param):
-            try:
-                # Token'ı al - öncelik sırası: headers > query auth > query token
-                token = None
-                if auth_header and auth_header.startswith('Bearer '):
-                    token = auth_header.split(' ')[1]
-                elif query_auth_header and query_auth_header.startswith('Bearer '):
-                    token = query_auth_header.split(' ')[1]
-                    print(f"Token query auth'dan alındı: {token[:20]}...")
-                elif token_param:
-                    token = token_param
-                    print(f"Token query param'dan alındı: {token[:20]}...")
-                
-                if not token:
-                    print("Token bulunamadı")
-                    await self.close(code=4003)
-                    return
-                
-                # JWT token'ı çözümle
-                from rest_framework_simplejwt.tokens import UntypedToken
-                from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
-                from django.contrib.auth import get_user_model
-                
-                try:
-                    # JWT settings'ten key'i al
-                    jwt_settings = settings.SIMPLE_JWT
-                    signing_key = jwt_settings.get('SIGNING_KEY', settings.SECRET_KEY)
-                    algorithm = jwt_settings.get('ALGORITHM', 'HS256')
-                    
-                    # Token'ı doğrula
-                    UntypedToken(token)  # Token geçerliliğini kontrol et
-                    
-                    # Payload'ı decode et
-                    payload = jwt.decode(
-                        token,
-                        signing_key,
-                        algorithms=[algorithm]
-                    )
-                    
-                    # Token'dan user_id al
-                    user_id = payload.get('user_id')
-                    if user_id:
-                        self.user = await self.get_user_by_id(user_id)
-                        if not self.user:
-                            await self.close(code=4003)
-                            return
-                    else:
-                        await self.close(code=4003)
-                        return
-                        
-                except (jwt.DecodeError, jwt.ExpiredSignatureError, InvalidToken, TokenError) as e:
-                    print(f"Token doğrulama hatası: {str(e)}")
-                    await self.close(code=4003)
-                    return
-                    
-            except (jwt.DecodeError, jwt.ExpiredSignatureError) as e:
-                print(f"Token doğrulama hatası: {str(e)}")
-                await self.close(code=4003)
-                return
-            except Exception as e:
-                print(f"Beklenmeyen hata: {str(e)}")
-                await self.close(code=4003)
-                return
-        
         # Kullanıcı kimliği doğrulanmadıysa bağlantıyı reddet
-        if not self.user or isinstance(self.user, AnonymousUser):
+        if not self.user or not self.user.is_authenticated:
             await self.close(code=4003)
             return
         
@@ -166,31 +95,16 @@ class ChatConsumer(AsyncWebsocketConsumer):
             if not room_id:
                 return
                 
+            received_at = time.monotonic()
+            
             # Mesajı veritabanına kaydet (engelleme kontrolü içerir)
             message_data, error = await self.save_message(room_id, message_text)
             
             if message_data:
-                # Odadaki herkese mesajı gönder
-                await self.channel_layer.group_send(
-                    f'chat_{room_id}',
-                    {
-                        'type': 'chat_message',
-                        'message': message_data
-                    }
+                # Odadaki herkese mesajı ve alıcılara bildirimi eşzamanlı gönder
+                await deliver_message(
+                    self.channel_layer, room_id, message_data, self.user.id, created_at=received_at
                 )
-                
-                # Alıcı kullanıcılara bildirim gönder
-                recipients = await self.get_room_recipients(room_id)
-                for recipient_id in recipients:
-                    if recipient_id != self.user.id:
-                        await self.channel_layer.group_send(
-                            f'chat_personal_{recipient_id}',
-                            {
-                                'type': 'new_message_notification',
-                                'message': message_data,
-                                'room_id': room_id
-                            }
-                        )
             else:
                 # Mesaj gönderilemedi (engellenmiş kullanıcı veya diğer hata)
                 await self.send(text_data=json.dumps({
@@ -270,28 +184,10 @@ class ChatConsumer(AsyncWebsocketConsumer):
                     # Mesajı veritabanından al
                     message = await self.get_message_by_id(message_id)
                     if message:
-                        # Odadaki herkese mesajı gönder
-                        room_id = message.get('chat_room_id')
-                        await self.channel_layer.group_send(
-                            f'chat_{room_id}',
-                            {
-                                'type': 'chat_message',
-                                'message': message
-                            }
+                        # Odadaki herkese mesajı ve alıcılara bildirimi eşzamanlı gönder
+                        await deliver_message(
+                            self.channel_layer, message.get('chat_room_id'), message, self.user.id
                         )
-                        
-                        # Alıcı kullanıcılara bildirim gönder
-                        recipients = await self.get_room_recipients(room_id)
-                        for recipient_id in recipients:
-                            if recipient_id != self.user.id:  # Kendime bildirim gönderme
-                                await self.channel_layer.group_send(
-                                    f'chat_personal_{recipient_id}',
-                                    {
-                                        'type': 'new_message_notification',
-                                        'message': message,
-                                        'room_id': room_id
-                                    }
-                                )
                 except Exception as e:
                     print(f"Mesaj işleme hatası: {str(e)}")
 
@@ -305,8 +201,12 @@ class ChatConsumer(AsyncWebsocketConsumer):
             message.get('sender_id') != self.user.id and 
             str(self.room_id) == str(message.get('chat_room_id', self.room_id))):
             
-            # Mesajı otomatik olarak okundu işaretle
-            await self.auto_mark_message_as_read(message.get('id'))
+            # Mesajı otomatik olarak okundu işaretle, bildirimleri birlikte gönder
+            read_events = await self.auto_mark_message_as_read(message)
+            if read_events:
+                await asyncio.gather(*(
+                    self.channel_layer.group_send(group, event) for group, event in read_events
+                ))
             
             # Mesaj verisini güncelle
             message['is_read'] = True
@@ -343,23 +243,9 @@ class ChatConsumer(AsyncWebsocketConsumer):
             'message_id': message_id
         }))
 
-    @database_sync_to_async
-    def get_user_by_id(self, user_id):
-        """Kullanıcı ID'sine göre kullanıcıyı al"""
-        try:
-            return User.objects.get(id=user_id)
-        except User.DoesNotExist:
-            return None
-
-    @database_sync_to_async
-    def check_room_access(self, room_id):
-        """Kullanıcının bu odaya erişimi var mı kontrol et"""
-        try:
-            room = ChatRoom.objects.get(id=room_id)
-            # Kullanıcı bu odanın katılımcısı mı?
-            return room.participants.filter(id=self.user.id).exists()
-        except ChatRoom.DoesNotExist:
-            return False
+    async def check_room_access(self, room_id):
+        """Kullanıcının bu odaya erişimi var mı kontrol et (cache'li katılımcı listesi)"""
+        return self.user.id in await aget_room_member_ids(room_id)
     @database_sync_to_async
     def save_message(self, room_id, content):
         """Mesajı veritabanına kaydet ve JSON temsilini döndür"""
@@ -375,16 +261,17 @@ class ChatConsumer(AsyncWebsocketConsumer):
                 if not can_send:
                     return None, reason
             
-            # Yeni mesaj oluştur
-            message = Message.objects.create(
-                chat_room=chat_room,
-                sender=self.user,
-                text=content,
-                is_read=False
-            )
-            if not chat_room.is_active:
-                chat_room.is_active = True
-                chat_room.save(update_fields=['is_active'])
+            with transaction.atomic():
+                # Yeni mesaj oluştur; odanın son mesajı, aktifliği ve alıcıların okunmamış
+                # sayıları aynı transaction'da güncellenir (ChatRoom.record_message)
+                message = Message.objects.create(
+                    chat_room=chat_room,
+                    sender=self.user,
+                    text=content
+                )
+                
+                # Push notification'lar (offline kullanıcılar için) mesajla aynı transaction'da outbox'a yazılır
+                self.send_push_notification_for_message(message, chat_room, other_participants)
             # JSON temsilini oluştur
             message_data = {
                 'id': message.id,
@@ -396,10 +283,8 @@ class ChatConsumer(AsyncWebsocketConsumer):
                 'sender_full_name': message.sender.get_full_name(),
                 'sender_avatar': message.sender.profile.avatar.url if hasattr(message.sender, 'profile') and message.sender.profile.avatar else None,
                 'created_at': message.timestamp.isoformat(),
-                'is_read': message.is_read            }
-            
-            # Push notification gönder (offline kullanıcılar için)
-            self.send_push_notification_for_message(message, chat_room, other_participants)
+                'is_read': False
+            }
             
             return message_data, None
             
@@ -411,8 +296,7 @@ class ChatConsumer(AsyncWebsocketConsumer):
         """Mesajı okundu olarak işaretle"""
         try:
             message = Message.objects.get(id=message_id)
-            message.is_read = True  # 'read_by.add' yerine 'is_read = True'
-            message.save()  # Değişiklikleri kaydetmeyi unutmayın
+            message.mark_as_read(self.user)
             return True
         except Message.DoesNotExist:
             return False
@@ -424,18 +308,9 @@ class ChatConsumer(AsyncWebsocketConsumer):
             room_id = self.room_id
             
         try:
-            # Kullanıcının henüz okumadığı mesajları bul
+            # Kullanıcının henüz okumadığı mesajları tek UPDATE ile okundu işaretle
             room = ChatRoom.objects.get(id=room_id)
-            unread_messages = Message.objects.filter(
-                chat_room=room,
-                is_read=False
-            ).exclude(sender=self.user)  # sender__id__ne yerine exclude kullan
-            
-            # Mesajları okundu olarak işaretle
-            for message in unread_messages:
-                message.is_read = True
-                message.save()
-                    
+            room.mark_messages_as_read(self.user)
             return True
         except ChatRoom.DoesNotExist:
             return False    
@@ -444,22 +319,8 @@ class ChatConsumer(AsyncWebsocketConsumer):
     def mark_all_messages_as_read(self):
         """Kullanıcının tüm sohbetlerindeki okunmamış mesajları okundu olarak işaretle"""
         try:
-            # Kullanıcının katılımcı olduğu tüm chat odalarını al
-            chat_rooms = ChatRoom.objects.filter(participants=self.user)
-            
-            # Tüm odalardaki okunmamış mesajları bul
-            for room in chat_rooms:
-                # Kullanıcının gönderdiği mesajlar hariç, okunmamış mesajları al
-                unread_messages = Message.objects.filter(
-                    chat_room=room,
-                    is_read=False
-                ).exclude(sender=self.user)
-                
-                # Mesajları okundu olarak işaretle
-                for message in unread_messages:
-                    message.is_read = True
-                    message.save()
-            
+            # Kullanıcının tüm odalarındaki okuma işaretleri tek UPDATE ile
+            ChatRoom.mark_all_messages_as_read(self.user)
             return True
         except Exception as e:
             print(f"Tüm mesajları okundu olarak işaretleme hatası: {str(e)}")
@@ -467,52 +328,32 @@ class ChatConsumer(AsyncWebsocketConsumer):
 
     @database_sync_to_async
     def get_unread_count(self):
-        """Kullanıcının okunmamış mesaj olan oda sayısını al"""
-        # Kullanıcının katılımcı olduğu tüm odaları bul
-        chat_rooms = ChatRoom.objects.filter(participants=self.user)
-        
-        # Okunmamış mesajı olan oda sayısını hesapla
-        rooms_with_unread = 0
-        for room in chat_rooms:
-            has_unread = Message.objects.filter(
-                chat_room=room,
-                is_read=False
-            ).exclude(sender=self.user).exists()  # Sadece var/yok kontrolü
-            
-            if has_unread:
-                rooms_with_unread += 1
-            
-        return rooms_with_unread
-
-    @database_sync_to_async
-    def get_room_recipients(self, room_id):
-        """Odadaki diğer katılımcıların ID'lerini al"""
-        try:
-            room = ChatRoom.objects.get(id=room_id)
-            return list(room.participants.values_list('id', flat=True))
-        except ChatRoom.DoesNotExist:
-            return []
+        """Kullanıcının okunmamış mesaj olan oda sayısını al (Redis sayacından; yoksa ChatReadState'ten)"""
+        return get_unread_room_count(self.user.id)
 
     @database_sync_to_async
     def get_recent_rooms(self, limit=10):
         """Kullanıcının son mesajlaştığı odaları al"""
-        # Kullanıcının katılımcı olduğu tüm odaları bul
-        chat_rooms = ChatRoom.objects.filter(participants=self.user)
+        # Son mesaj ve okunmamış sayısı odada/oda durumunda tutulur; Message tablosuna inilmez
+        chat_rooms = list(
+            ChatRoom.for_participant(self.user).annotate(
+                last_activity=Coalesce('last_message_at', 'created_at'),
+            ).order_by('-last_activity', '-id').select_related(
+                'last_message_sender__profile'
+            ).prefetch_related(
+                Prefetch(
+                    'participants',
+                    queryset=User.objects.exclude(id=self.user.id).only('id', 'username'),
+                    to_attr='other_participants'
+                ),
+                'read_states'
+            )[:limit]
+        )
 
-        # Her oda için son mesaj ve okunmamış mesaj sayısı
         room_data = []
         for room in chat_rooms:
-            # Son mesaj
-            last_message = Message.objects.filter(chat_room=room).order_by('-timestamp').first()
-            
-            # Okunmamış mesaj sayısı
-            unread_count = Message.objects.filter(
-                chat_room=room,
-                is_read=False
-            ).exclude(sender=self.user).count()
-            
             # Diğer katılımcılar (1-1 sohbet için)
-            other_participants = room.participants.exclude(id=self.user.id)
+            other_participants = room.other_participants
             
             # Oda adı: Katılımcıların isimlerinden oluştur
             room_name = ', '.join([p.username for p in other_participants]) if other_participants else 'Yeni Sohbet'
@@ -520,32 +361,35 @@ class ChatConsumer(AsyncWebsocketConsumer):
             room_info = {
                 'id': room.id,
                 'name': room_name,  # Doğrudan hesaplanmış adı kullan
-                'unread_count': unread_count,
+                'unread_count': room.unread_for_user,
                 'participants': [{'id': p.id, 'username': p.username} for p in other_participants],
-                'updated_at': last_message.timestamp.isoformat() if last_message else room.created_at.isoformat() if hasattr(room, 'created_at') else timezone.now().isoformat()
+                'updated_at': room.last_activity.isoformat()
             }
             
             # Son mesaj bilgisi
-            if last_message:
+            sender = room.last_message_sender
+            if room.last_message_id and sender:
                 room_info['last_message'] = {
-                    'id': last_message.id,
-                    'content': last_message.text,
-                    'sender_id': last_message.sender.id,
-                    'sender_name': last_message.sender.username,
-                    'sender_first_name': last_message.sender.first_name,
-                    'sender_last_name': last_message.sender.last_name,
-                    'sender_full_name': last_message.sender.get_full_name(),
-                    'sender_avatar': last_message.sender.profile.avatar.url if hasattr(last_message.sender, 'profile') and last_message.sender.profile.avatar else None,
-                    # 'created_at': last_message.timestamp.isoformat(),
-                    'created_at': relative_time(last_message.timestamp),
-                    'is_read': last_message.is_read
+                    'id': room.last_message_id,
+                    'content': room.last_message_text,
+                    'sender_id': sender.id,
+                    'sender_name': sender.username,
+                    'sender_first_name': sender.first_name,
+                    'sender_last_name': sender.last_name,
+                    'sender_full_name': sender.get_full_name(),
+                    'sender_avatar': sender.profile.avatar.url if hasattr(sender, 'profile') and sender.profile.avatar else None,
+                    # 'created_at': room.last_message_at.isoformat(),
+                    'created_at': relative_time(room.last_message_at),
+                    'is_read': any(
+                        state.last_read_message_id >= room.last_message_id
+                        for state in room.read_states.all()
+                        if state.user_id != sender.id
+                    )
                 }
             
             room_data.append(room_info)
             
-        # Son mesaj tarihine göre sırala
-        room_data.sort(key=lambda x: x.get('updated_at'), reverse=True)
-        return room_data[:limit]
+        return room_data
 
     @database_sync_to_async
     def get_message_by_id(self, message_id):
@@ -561,8 +405,8 @@ class ChatConsumer(AsyncWebsocketConsumer):
                 'sender_name': message.sender.username,
                 'sender_avatar': message.sender.profile.avatar.url if hasattr(message.sender, 'profile') and message.sender.profile.avatar else None,
                 'created_at': message.timestamp.isoformat(),
-                'is_read': message.is_read,
-                'chat_room_id': message.chat_room.id
+                'is_read': message.is_read_by_recipients(),
+                'chat_room_id': message.chat_room_id
             }
             
             # Ekleri ekle
@@ -584,88 +428,51 @@ class ChatConsumer(AsyncWebsocketConsumer):
     @database_sync_to_async
     def get_room_unread_count(self, room_id):
         """Belirli bir odadaki okunmamış mesaj sayısını al"""
-        try:
-            room = ChatRoom.objects.get(id=room_id)
-            # Kullanıcının gönderdiği mesajlar hariç, okunmamış mesaj sayısı
-            unread_count = Message.objects.filter(
-                chat_room=room,
-                is_read=False
-            ).exclude(sender=self.user).count()
-            
-            return unread_count
-        except ChatRoom.DoesNotExist:
-            return 0
+        return get_room_unread_count(self.user.id, room_id)
     @database_sync_to_async
-    def auto_mark_message_as_read(self, message_id):
+    def auto_mark_message_as_read(self, message):
         """
-        Kullanıcı sohbet odasına aktif olarak bağlıyken gelen mesajları 
-        otomatik olarak okundu işaretle
+        Kullanıcı sohbet odasına aktif olarak bağlıyken gelen mesajı (ve öncesini)
+        okuma işaretini ilerleterek okundu işaretle.
+        Gönderilecek (grup, olay) bildirimlerini döndürür; işaret zaten ilerideyse boş liste.
         """
+        message_id = message.get('id')
+        sender_id = message.get('sender_id')
+        if not message_id or sender_id == self.user.id:
+            return []
+        
         try:
-            message = Message.objects.get(id=message_id)
-            
-            # Mesaj zaten okunmuşsa veya kullanıcının kendi mesajıysa işlem yapma
-            if message.is_read or message.sender == self.user:
-                return False
-            
-            # Mesajı okundu olarak işaretle
-            message.is_read = True
-            message.save(update_fields=['is_read'])
-              # Debug log
-            print(f"Auto-marked message {message_id} as read for user {self.user.username}")
-            print(f"Debug: Message chat room ID: {message.chat_room.id}")
+            room_id = int(message.get('chat_room_id') or self.room_id)
             
-            # Read receipt gönder (opsiyonel - sender'a bildirim)
-            # Bu sayede sender mesajın okunduğunu anlayabilir
-            from channels.layers import get_channel_layer
-            from asgiref.sync import async_to_sync
+            # Tek UPDATE: mesaj veritabanından okunmaz
+            if not ChatRoom(pk=room_id).mark_read_up_to(self.user, message_id):
+                return []
             
-            channel_layer = get_channel_layer()
-            async_to_sync(channel_layer.group_send)(
-                f"chat_personal_{message.sender.id}",
-                {
+            return [
+                # Read receipt (sender'a bildirim) - bu id'ye kadar tüm mesajlar okundu
+                (f"chat_personal_{sender_id}", {
                     'type': 'message_read_receipt',
                     'message_id': message_id,
+                    'last_read_message_id': message_id,
                     'reader_id': self.user.id,
-                    'room_id': message.chat_room.id
-                }
-            )
-              # ChatContext'e unread count güncellemesi gönder
-            # Bu kullanıcının ChatContext'ine mesajın okunduğunu bildir
-            room_unread_count = self.get_room_unread_count_sync(message.chat_room.id)
-            print(f"Debug: Sending messages_read_notification to user {self.user.id} for room {message.chat_room.id} with unread_count {room_unread_count}")
-            async_to_sync(channel_layer.group_send)(
-                f"chat_personal_{self.user.id}",
-                {
+                    'room_id': room_id
+                }),
+                # Bu kullanıcının ChatContext'ine unread count güncellemesi
+                (f"chat_personal_{self.user.id}", {
                     'type': 'messages_read_notification',
-                    'room_id': message.chat_room.id,
-                    'unread_count': room_unread_count,
+                    'room_id': room_id,
+                    'unread_count': self.get_room_unread_count_sync(room_id),
                     'message_id': message_id
-                }
-            )
+                }),
+            ]
             
-            return True
-            
-        except Message.DoesNotExist:
-            print(f"Message {message_id} not found for auto-read marking")
-            return False
         except Exception as e:
             print(f"Error auto-marking message {message_id} as read: {str(e)}")
-            return False
+            return []
 
     def get_room_unread_count_sync(self, room_id):
         """Belirli bir odadaki okunmamış mesaj sayısını al (senkron)"""
-        try:
-            room = ChatRoom.objects.get(id=room_id)
-            # Kullanıcının gönderdiği mesajlar hariç, okunmamış mesaj sayısı
-            unread_count = Message.objects.filter(
-                chat_room=room,
-                is_read=False
-            ).exclude(sender=self.user).count()
-            
-            return unread_count
-        except ChatRoom.DoesNotExist:
-            return 0
+        return get_room_unread_count(self.user.id, room_id)
     async def message_read_receipt(self, event):
         """Read receipt bildirimini gönder"""
         message_id = event['message_id']
@@ -675,41 +482,32 @@ class ChatConsumer(AsyncWebsocketConsumer):
         await self.send(text_data=json.dumps({
             'type': 'message_read',
             'message_id': message_id,
+            'last_read_message_id': event.get('last_read_message_id', message_id),
             'reader_id': reader_id,
             'room_id': room_id
         }))
     
     def send_push_notification_for_message(self, message, chat_room, recipients):
         """
-        Yeni mesaj için push notification gönder
-        Sadece offline olan kullanıcılara gönderir
+        Yeni mesaj için push notification'ları outbox'a yazar (sohbeti sessize alanlar hariç).
+        Gönderim worker tarafından yapılır; consumer FCM isteklerini beklemez.
         """
-        try:
-            for recipient in recipients:
-                # Firebase servisi ile push notification gönder
-                title = f"Yeni mesaj - {message.sender.get_full_name() or message.sender.username}"
-                body = message.text[:100] + "..." if len(message.text) > 100 else message.text
-                
-                # Ekstra data
-                data = {
-                    'type': 'chat_message',
-                    'room_id': str(chat_room.id),
-                    'message_id': str(message.id),
-                    'sender_id': str(message.sender.id),
-                    'sender_name': message.sender.get_full_name() or message.sender.username
-                }
-                
-                # Firebase servis ile push notification gönder
-                firebase_service.send_notification(
-                    user_id=recipient.id,
-                    title=title,
-                    body=body,
-                    data=data
-                )
-                
-                print(f"Chat: Push notification sent to {recipient.username} for message {message.id}")
-                
-        except Exception as e:
-            print(f"Chat: Push notification error: {str(e)}")
-            # Hata durumunda chat işlevselliği etkilenmesin
-            pass
\ No newline at end of file
+        muted_ids = set(ChatReadState.objects.filter(
+            chat_room=chat_room, is_muted=True
+        ).values_list('user_id', flat=True))
+        recipient_ids = [recipient.id for recipient in recipients if recipient.id not in muted_ids]
+        if not recipient_ids:
+            return
+        sender_name = message.sender.get_full_name() or message.sender.username
+        enqueue_push(
+            recipient_ids,
+            title=f"Yeni mesaj - {sender_name}",
+            body=message.text[:100] + "..." if len(message.text) > 100 else message.text,
+            data={
+                'type': 'chat_message',
+                'room_id': str(chat_room.id),
+                'message_id': str(message.id),
+                'sender_id': str(message.sender.id),
+                'sender_name': sender_name
+            }
+        )
\ No newline at end of file
@@ -0,0 +1,100 @@
+"""
+Sohbet mesajlarının channel layer üzerinden dağıtımı.
+
+Kaydedilen bir mesaj oda grubuna (`chat_{id}`) ve gönderen dışındaki katılımcıların
+kişisel gruplarına (`chat_personal_{id}`) gönderilir:
+- Oda katılımcıları cache'den okunur; katılımcı değişiminde (m2m_changed) geçersiz kılınır
+- Tüm grup gönderimleri sırayla beklenmek yerine eşzamanlı yapılır; channels_redis
+  bağlantı havuzu üzerinden Redis gidiş-dönüşleri üst üste biner
+- Her mesaj için dağıtım süresi ve mesaj oluşturulmasından itibaren geçen süre loglanır,
+  CHAT_DELIVERY_SLOW_MS üstü uyarı olarak yazılır
+"""
+import asyncio
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+ROOM_MEMBERS_TIMEOUT = getattr(settings, 'CHAT_ROOM_MEMBERS_TIMEOUT', 60 * 60)  # 1 saat
+CHAT_DELIVERY_SLOW_MS = getattr(settings, 'CHAT_DELIVERY_SLOW_MS', 250)
+
+
+def _members_key(room_id):
+    return f"chat_room_members_{room_id}"
+
+
+def get_room_member_ids(room_id):
+    """Odanın katılımcı id'leri (cache'li)"""
+    member_ids = cache.get(_members_key(room_id))
+    if member_ids is None:
+        from apps.chat.models import ChatRoom
+
+        member_ids = list(
+            ChatRoom.participants.through.objects.filter(
+                chatroom_id=room_id
+            ).values_list('user_id', flat=True)
+        )
+        cache.set(_members_key(room_id), member_ids, ROOM_MEMBERS_TIMEOUT)
+    return member_ids
+
+
+async def aget_room_member_ids(room_id):
+    member_ids = await cache.aget(_members_key(room_id))
+    if member_ids is None:
+        from channels.db import database_sync_to_async
+
+        member_ids = await database_sync_to_async(get_room_member_ids)(room_id)
+    return member_ids
+
+
+def invalidate_room_members(*room_ids):
+    cache.delete_many([_members_key(room_id) for room_id in room_ids])
+
+
+async def deliver_message(channel_layer, room_id, message_data, sender_id, created_at=None):
+    """
+    Mesajı oda grubuna ve alıcıların kişisel gruplarına eşzamanlı gönderir.
+
+    Args:
+        created_at: Mesajın oluşturulma zamanı (time.monotonic()); verilirse
+            kayıttan dağıtım sonuna kadar geçen süre de raporlanır
+
+    Returns:
+        float: Dağıtım süresi (ms)
+    """
+    started = time.monotonic()
+    member_ids = await aget_room_member_ids(room_id)
+
+    groups = [(f'chat_{room_id}', {
+        'type': 'chat_message',
+        'message': message_data
+    })]
+    groups.extend(
+        (f'chat_personal_{member_id}', {
+            'type': 'new_message_notification',
+            'message': message_data,
+            'room_id': room_id
+        })
+        for member_id in member_ids if member_id != sender_id
+    )
+
+    results = await asyncio.gather(
+        *(channel_layer.group_send(group, event) for group, event in groups),
+        return_exceptions=True
+    )
+    for (group, _), result in zip(groups, results):
+        if isinstance(result, Exception):
+            logger.error(f"Mesaj {message_data.get('id')} {group} grubuna gönderilemedi: {result}")
+
+    finished = time.monotonic()
+    fanout_ms = (finished - started) * 1000
+    total_ms = (finished - created_at) * 1000 if created_at is not None else fanout_ms
+    log = logger.warning if total_ms > CHAT_DELIVERY_SLOW_MS else logger.debug
+    log(
+        f"Mesaj {message_data.get('id')} dağıtıldı: oda {room_id}, {len(groups)} grup, "
+        f"dağıtım {fanout_ms:.1f} ms, toplam {total_ms:.1f} ms"
+    )
+    return fanout_ms
@@ -0,0 +1,66 @@
+from django.core.management.base import BaseCommand
+from apps.chat.archive import (
+    CHAT_ARCHIVE_AFTER_DAYS,
+    CHAT_ARCHIVE_INACTIVE_DAYS,
+    CHAT_ARCHIVE_KEEP_RECENT,
+    archivable_rooms,
+    archive_boundary,
+    archive_room,
+)
+
+class Command(BaseCommand):
+    help = 'Moves old messages of inactive chat rooms to the message archive'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=CHAT_ARCHIVE_AFTER_DAYS,
+            help=f'Archive messages older than this many days (default: {CHAT_ARCHIVE_AFTER_DAYS})',
+        )
+        parser.add_argument(
+            '--inactive-days',
+            type=int,
+            default=CHAT_ARCHIVE_INACTIVE_DAYS,
+            help=f'Only rooms without messages for this many days (default: {CHAT_ARCHIVE_INACTIVE_DAYS})',
+        )
+        parser.add_argument(
+            '--keep-recent',
+            type=int,
+            default=CHAT_ARCHIVE_KEEP_RECENT,
+            help=f'Number of latest messages kept live in every room (default: {CHAT_ARCHIVE_KEEP_RECENT})',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of messages moved per transaction (default: 1000)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only show how many messages would be archived',
+        )
+
+    def handle(self, *args, **options):
+        room_count = message_count = 0
+
+        for room in archivable_rooms(options['inactive_days']).iterator():
+            boundary = archive_boundary(room, after_days=options['days'], keep_recent=options['keep_recent'])
+            if boundary is None:
+                continue
+
+            if options['dry_run']:
+                moved = room.messages.filter(id__lte=boundary).count()
+            else:
+                moved = archive_room(room, boundary, batch_size=options['batch_size'])
+                self.stdout.write(f'  ChatRoom #{room.id}: {moved} messages archived')
+
+            room_count += 1
+            message_count += moved
+
+        if options['dry_run']:
+            self.stdout.write(f'{message_count} messages in {room_count} chat rooms would be archived.')
+            return
+
+        self.stdout.write(self.style.SUCCESS(f'Archived {message_count} messages in {room_count} chat rooms.'))
@@ -1,5 +1,5 @@
 from django.core.management.base import BaseCommand
-from apps.chat.models import ChatRoom
+from apps.chat.models import ArchivedMessage, ChatRoom, Message, MessageAttachment
 
 class Command(BaseCommand):
     help = 'Permanently deletes chat rooms where all participants have marked them as deleted'
@@ -10,34 +10,63 @@ class Command(BaseCommand):
             action='store_true',
             help='Force deletion without confirmation',
         )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only show how many rooms, messages and attachments would be deleted',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=100,
+            help='Number of chat rooms deleted per chunk (default: 100)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of messages deleted per transaction (default: 1000)',
+        )
 
     def handle(self, *args, **options):
-        # Count how many chat rooms would be deleted
-        rooms_to_delete = []
-        
-        for chat_room in ChatRoom.objects.all():
-            participants = set(chat_room.participants.all().values_list('id', flat=True))
-            deleted_by = set(chat_room.deleted_by.all().values_list('id', flat=True))
-            
-            if participants and participants == deleted_by:
-                rooms_to_delete.append(chat_room.id)
-        
+        # Rooms deleted by all participants (single grouped query)
+        rooms_to_delete = list(ChatRoom.fully_deleted_room_ids())
         count = len(rooms_to_delete)
-        
+
         if count == 0:
             self.stdout.write(self.style.SUCCESS('No chat rooms to delete.'))
             return
-            
+
+        if options['dry_run']:
+            message_count = Message.objects.filter(chat_room_id__in=rooms_to_delete).count()
+            archived_count = ArchivedMessage.objects.filter(chat_room_id__in=rooms_to_delete).count()
+            attachment_count = MessageAttachment.objects.filter(message__chat_room_id__in=rooms_to_delete).count()
+            batches = -(-message_count // options['batch_size']) + -(-archived_count // options['batch_size'])
+            self.stdout.write(
+                f'{count} chat rooms, {message_count} messages, {archived_count} archived messages and '
+                f'{attachment_count} attachments would be deleted '
+                f'({-(-count // options["chunk_size"])} room chunks, {batches} message batches).'
+            )
+            return
+
         # Ask for confirmation unless --force is specified
         if not options['force']:
             confirm = input(f'\nYou are about to permanently delete {count} chat rooms and all their messages. This action cannot be undone.\n'
                            f'Do you want to continue? [y/N]: ')
-            
+
             if confirm.lower() != 'y':
                 self.stdout.write(self.style.WARNING('Operation cancelled.'))
                 return
-        
-        # Perform the deletion
-        deleted_count = ChatRoom.cleanup_deleted_rooms()
-        
-        self.stdout.write(self.style.SUCCESS(f'Successfully deleted {deleted_count} chat rooms and their messages.')) 
\ No newline at end of file
+
+        def report(deleted_rooms, total_rooms, deleted_messages):
+            self.stdout.write(f'  {deleted_rooms}/{total_rooms} chat rooms, {deleted_messages} messages deleted')
+
+        # Perform the deletion in chunks
+        deleted_count, deleted_messages = ChatRoom.delete_rooms(
+            rooms_to_delete,
+            chunk_size=options['chunk_size'],
+            batch_size=options['batch_size'],
+            progress=report,
+        )
+
+        self.stdout.write(self.style.SUCCESS(f'Successfully deleted {deleted_count} chat rooms and {deleted_messages} messages.'))
@@ -0,0 +1,90 @@
+# Generated by Django 5.2.1 on 2026-10-18 17:08
+
+import django.db.models.deletion
+from django.conf import settings
+from collections import defaultdict
+
+from django.db import migrations, models
+from django.db.models import Max, Min
+
+BATCH_SIZE = 1000
+
+
+def backfill_read_states(apps, schema_editor):
+    """
+    Okuma işaretlerini mevcut is_read verisinden oluştur: katılımcı, başkalarından gelen
+    ilk okunmamış mesajından önceki mesaja kadar (hiç okunmamış yoksa son mesaja kadar) okumuş sayılır.
+    """
+    ChatRoom = apps.get_model('chat', 'ChatRoom')
+    Message = apps.get_model('chat', 'Message')
+    ChatReadState = apps.get_model('chat', 'ChatReadState')
+    Participant = ChatRoom.participants.through
+
+    last_message_ids = dict(
+        Message.objects.order_by().values('chat_room_id').annotate(
+            last_id=Max('id')
+        ).values_list('chat_room_id', 'last_id')
+    )
+    first_unread_ids = defaultdict(dict)  # oda -> {gönderen: ilk okunmamış mesaj id}
+    for room_id, sender_id, first_id in Message.objects.filter(is_read=False).order_by().values(
+        'chat_room_id', 'sender_id'
+    ).annotate(first_id=Min('id')).values_list('chat_room_id', 'sender_id', 'first_id'):
+        first_unread_ids[room_id][sender_id] = first_id
+
+    states = []
+    for room_id, user_id in Participant.objects.values_list('chatroom_id', 'user_id').iterator():
+        unread = [
+            first_id for sender_id, first_id in first_unread_ids[room_id].items()
+            if sender_id != user_id
+        ]
+        last_read_id = min(unread) - 1 if unread else last_message_ids.get(room_id, 0)
+        states.append(ChatReadState(chat_room_id=room_id, user_id=user_id, last_read_message_id=last_read_id))
+        if len(states) >= BATCH_SIZE:
+            ChatReadState.objects.bulk_create(states, ignore_conflicts=True)
+            states = []
+    if states:
+        ChatReadState.objects.bulk_create(states, ignore_conflicts=True)
+
+
+def restore_is_read(apps, schema_editor):
+    """Geri alma: okuma işaretine kadar olan, başkalarından gelen mesajları okundu işaretle"""
+    Message = apps.get_model('chat', 'Message')
+    ChatReadState = apps.get_model('chat', 'ChatReadState')
+
+    for room_id, user_id, last_read_id in ChatReadState.objects.filter(
+        last_read_message_id__gt=0
+    ).values_list('chat_room_id', 'user_id', 'last_read_message_id').iterator():
+        Message.objects.filter(
+            chat_room_id=room_id, id__lte=last_read_id
+        ).exclude(sender_id=user_id).update(is_read=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0008_remove_chatroom_chat_chatro_is_acti_3dedb9_idx_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChatReadState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('last_read_message_id', models.PositiveBigIntegerField(default=0, verbose_name='Last read message id')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Updated at')),
+                ('chat_room', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='read_states', to='chat.chatroom', verbose_name='Chat Room')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='chat_read_states', to=settings.AUTH_USER_MODEL, verbose_name='User')),
+            ],
+            options={
+                'verbose_name': 'Chat Read State',
+                'verbose_name_plural': 'Chat Read States',
+                'constraints': [models.UniqueConstraint(fields=('chat_room', 'user'), name='unique_chat_read_state')],
+            },
+        ),
+        migrations.RunPython(backfill_read_states, restore_is_read),
+        migrations.RemoveField(
+            model_name='message',
+            name='is_read',
+        ),
+    ]
@@ -0,0 +1,103 @@
+# Generated by Django 5.2.1 on 2026-10-18 17:26
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+BATCH_SIZE = 1000
+
+
+def backfill_room_state(apps, schema_editor):
+    """
+    Son mesaj bilgisini, okunmamış sayılarını ve silme işaretlerini mevcut mesajlardan hesapla
+    """
+    ChatRoom = apps.get_model('chat', 'ChatRoom')
+    Message = apps.get_model('chat', 'Message')
+    ChatReadState = apps.get_model('chat', 'ChatReadState')
+    ChatRoomDeletion = apps.get_model('chat', 'ChatRoomDeletion')
+
+    last_message_ids = list(
+        Message.objects.order_by().values('chat_room_id').annotate(
+            last_id=Max('id')
+        ).values_list('last_id', flat=True)
+    )
+    for start in range(0, len(last_message_ids), BATCH_SIZE):
+        rooms = []
+        for message in Message.objects.filter(id__in=last_message_ids[start:start + BATCH_SIZE]):
+            rooms.append(ChatRoom(
+                pk=message.chat_room_id,
+                last_message_id=message.pk,
+                last_message_text=(message.text or '')[:255],
+                last_message_sender_id=message.sender_id,
+                last_message_at=message.timestamp,
+            ))
+        ChatRoom.objects.bulk_update(
+            rooms, ['last_message', 'last_message_text', 'last_message_sender', 'last_message_at']
+        )
+
+    unread = Message.objects.filter(
+        chat_room_id=OuterRef('chat_room_id'), id__gt=OuterRef('last_read_message_id')
+    ).exclude(sender_id=OuterRef('user_id')).order_by().values('chat_room_id').annotate(
+        unread=Count('id')
+    ).values('unread')
+    ChatReadState.objects.update(unread_count=Coalesce(Subquery(unread), 0))
+
+    for room_id, user_id, deleted_at in ChatRoomDeletion.objects.values_list(
+        'chat_room_id', 'user_id', 'deleted_at'
+    ).iterator():
+        cleared_id = Message.objects.filter(
+            chat_room_id=room_id, timestamp__lte=deleted_at
+        ).order_by('-id').values_list('id', flat=True).first()
+        if cleared_id:
+            ChatReadState.objects.filter(chat_room_id=room_id, user_id=user_id).update(
+                cleared_message_id=cleared_id
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0010_message_chat_messag_chat_ro_9355cd_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chatreadstate',
+            name='cleared_message_id',
+            field=models.PositiveBigIntegerField(default=0, verbose_name='Cleared message id'),
+        ),
+        migrations.AddField(
+            model_name='chatreadstate',
+            name='is_muted',
+            field=models.BooleanField(default=False, verbose_name='Is muted'),
+        ),
+        migrations.AddField(
+            model_name='chatreadstate',
+            name='unread_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Unread count'),
+        ),
+        migrations.AddField(
+            model_name='chatroom',
+            name='last_message',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='chat.message', verbose_name='Last message'),
+        ),
+        migrations.AddField(
+            model_name='chatroom',
+            name='last_message_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Last message at'),
+        ),
+        migrations.AddField(
+            model_name='chatroom',
+            name='last_message_sender',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Last message sender'),
+        ),
+        migrations.AddField(
+            model_name='chatroom',
+            name='last_message_text',
+            field=models.CharField(blank=True, default='', max_length=255, verbose_name='Last message preview'),
+        ),
+        migrations.RunPython(backfill_room_state, migrations.RunPython.noop),
+    ]
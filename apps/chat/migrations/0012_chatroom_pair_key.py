@@ -0,0 +1,106 @@
+# Generated by Django 5.2.1 on 2026-10-18 17:28
+
+from collections import Counter, defaultdict
+
+from django.db import migrations, models
+
+BATCH_SIZE = 1000
+
+
+def merge_rooms(apps, keeper_id, duplicate_ids):
+    """
+    Aynı iki kullanıcı arasındaki fazla odaları en eski odada birleştir: mesajlar taşınır,
+    okuma durumları birleştirilir (okunan en ileri mesaj, en geri silme işareti), fazla odalar silinir
+    """
+    ChatRoom = apps.get_model('chat', 'ChatRoom')
+    Message = apps.get_model('chat', 'Message')
+    ChatReadState = apps.get_model('chat', 'ChatReadState')
+    ChatRoomDeletion = apps.get_model('chat', 'ChatRoomDeletion')
+    DeletedBy = ChatRoom.deleted_by.through
+    room_ids = [keeper_id, *duplicate_ids]
+
+    Message.objects.filter(chat_room_id__in=duplicate_ids).update(chat_room_id=keeper_id)
+
+    states = defaultdict(list)
+    for state in ChatReadState.objects.filter(chat_room_id__in=room_ids):
+        states[state.user_id].append(state)
+    for user_id, user_states in states.items():
+        last_read_id = max(state.last_read_message_id for state in user_states)
+        ChatReadState.objects.update_or_create(
+            chat_room_id=keeper_id,
+            user_id=user_id,
+            defaults={
+                'last_read_message_id': last_read_id,
+                'cleared_message_id': min(state.cleared_message_id for state in user_states),
+                'is_muted': any(state.is_muted for state in user_states),
+                'unread_count': Message.objects.filter(
+                    chat_room_id=keeper_id, id__gt=last_read_id
+                ).exclude(sender_id=user_id).count(),
+            }
+        )
+
+    # Sohbet sadece tüm kopyalarını silen kullanıcı için silinmiş sayılır
+    deleted_counts = Counter(
+        DeletedBy.objects.filter(chatroom_id__in=room_ids).values_list('user_id', flat=True)
+    )
+    still_deleted = [user_id for user_id, count in deleted_counts.items() if count == len(room_ids)]
+    DeletedBy.objects.filter(chatroom_id=keeper_id).exclude(user_id__in=still_deleted).delete()
+    DeletedBy.objects.bulk_create(
+        [DeletedBy(chatroom_id=keeper_id, user_id=user_id) for user_id in still_deleted],
+        ignore_conflicts=True
+    )
+    ChatRoomDeletion.objects.filter(chat_room_id=keeper_id).exclude(user_id__in=still_deleted).delete()
+
+    last_message = Message.objects.filter(chat_room_id=keeper_id).order_by('-id').first()
+    ChatRoom.objects.filter(pk=keeper_id).update(
+        is_active=ChatRoom.objects.filter(pk__in=room_ids, is_active=True).exists(),
+        last_message_id=last_message.pk if last_message else None,
+        last_message_text=((last_message.text or '') if last_message else '')[:255],
+        last_message_sender_id=last_message.sender_id if last_message else None,
+        last_message_at=last_message.timestamp if last_message else None,
+    )
+    ChatRoom.objects.filter(pk__in=duplicate_ids).delete()
+
+
+def set_pair_keys(apps, schema_editor):
+    """İki katılımcılı odalara sıralı kullanıcı id çiftini yaz, aynı çiftin fazla odalarını birleştir"""
+    ChatRoom = apps.get_model('chat', 'ChatRoom')
+    Participant = ChatRoom.participants.through
+
+    members = defaultdict(set)
+    for room_id, user_id in Participant.objects.values_list('chatroom_id', 'user_id').iterator():
+        members[room_id].add(user_id)
+
+    rooms_by_key = defaultdict(list)
+    for room_id, user_ids in members.items():
+        if len(user_ids) == 2:
+            low, high = sorted(user_ids)
+            rooms_by_key[f"{low}:{high}"].append(room_id)
+
+    rooms = []
+    for pair_key, room_ids in rooms_by_key.items():
+        room_ids.sort()
+        if len(room_ids) > 1:
+            merge_rooms(apps, room_ids[0], room_ids[1:])
+        rooms.append(ChatRoom(pk=room_ids[0], pair_key=pair_key))
+        if len(rooms) >= BATCH_SIZE:
+            ChatRoom.objects.bulk_update(rooms, ['pair_key'])
+            rooms = []
+    if rooms:
+        ChatRoom.objects.bulk_update(rooms, ['pair_key'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0011_chatroom_last_message_chatreadstate_unread_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chatroom',
+            name='pair_key',
+            field=models.CharField(blank=True, max_length=64, null=True, verbose_name='Pair key'),
+        ),
+        migrations.RunPython(set_pair_keys, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.1 on 2026-10-18 17:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Birleştirme (0012) ayrı transaction'da tamamlandıktan sonra tekil index eklenir
+
+    dependencies = [
+        ('chat', '0012_chatroom_pair_key'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='chatroom',
+            name='pair_key',
+            field=models.CharField(blank=True, max_length=64, null=True, unique=True, verbose_name='Pair key'),
+        ),
+    ]
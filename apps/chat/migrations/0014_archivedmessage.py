@@ -0,0 +1,39 @@
+# Generated by Django 5.2.1 on 2026-10-18 17:32
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0013_alter_chatroom_pair_key'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chatroom',
+            name='archived_until_id',
+            field=models.PositiveBigIntegerField(default=0, verbose_name='Archived until message id'),
+        ),
+        migrations.CreateModel(
+            name='ArchivedMessage',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('text', models.TextField(blank=True, null=True, verbose_name='Message Text')),
+                ('timestamp', models.DateTimeField(verbose_name='Timestamp')),
+                ('attachment_data', models.JSONField(blank=True, default=list, verbose_name='Attachments')),
+                ('archived_at', models.DateTimeField(auto_now_add=True, verbose_name='Archived at')),
+                ('chat_room', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_messages', to='chat.chatroom', verbose_name='Chat Room')),
+                ('sender', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Sender')),
+            ],
+            options={
+                'verbose_name': 'Archived Message',
+                'verbose_name_plural': 'Archived Messages',
+                'ordering': ['timestamp'],
+                'indexes': [models.Index(fields=['chat_room', 'timestamp'], name='chat_archiv_chat_ro_65a246_idx')],
+            },
+        ),
+    ]
@@ -1,14 +1,36 @@
-from django.db import models
+import threading
+from contextlib import contextmanager
+
+from django.db import IntegrityError, models, transaction
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.utils.translation import gettext_lazy as _
 from django.utils import timezone
-from django.db.models.signals import post_delete
+from django.utils.dateparse import parse_datetime
+from django.db.models.signals import m2m_changed, post_delete, post_save
 from django.core.files.storage import default_storage
+from django.db.models import Count, Exists, F, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce, Greatest
 from django.dispatch import receiver
 
 User = get_user_model()
 
+CHAT_PREVIEW_LENGTH = 255
+
+_attachment_files = threading.local()
+
+
+@contextmanager
+def keep_attachment_files():
+    """Blok içinde silinen MessageAttachment kayıtlarının dosyaları silinmez (ör. mesaj arşive taşınırken)"""
+    previous = getattr(_attachment_files, 'keep', False)
+    _attachment_files.keep = True
+    try:
+        yield
+    finally:
+        _attachment_files.keep = previous
+
+
 class ChatRoom(models.Model):
     """
     Represents a chat conversation between two users.
@@ -37,6 +59,48 @@ class ChatRoom(models.Model):
         verbose_name=_("Deleted by"),
         blank=True
     )
+    # Son mesaj bilgisi; mesaj oluşturulurken aynı transaction'da güncellenir (record_message)
+    last_message = models.ForeignKey(
+        'Message',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name=_("Last message")
+    )
+    last_message_text = models.CharField(
+        max_length=CHAT_PREVIEW_LENGTH,
+        blank=True,
+        default='',
+        verbose_name=_("Last message preview")
+    )
+    last_message_sender = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name=_("Last message sender")
+    )
+    last_message_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name=_("Last message at")
+    )
+    # Birebir sohbetlerde sıralı kullanıcı id çifti ("küçük:büyük"); aynı iki kullanıcı
+    # arasında ikinci bir oda oluşturulamaz
+    pair_key = models.CharField(
+        max_length=64,
+        unique=True,
+        null=True,
+        blank=True,
+        verbose_name=_("Pair key")
+    )
+    # Bu id'ye kadarki mesajlar ArchivedMessage tablosuna taşındı (apps.chat.archive)
+    archived_until_id = models.PositiveBigIntegerField(
+        default=0,
+        verbose_name=_("Archived until message id")
+    )
 
     class Meta:
         verbose_name = _("Chat Room")
@@ -49,15 +113,81 @@ class ChatRoom(models.Model):
     
     def get_last_message(self):
         """Returns the last message sent in this chat room"""
-        return self.messages.order_by('-timestamp').first()
+        if self.last_message_id is None:
+            return None
+        return self.messages.filter(pk=self.last_message_id).first()
     
     def get_unread_count(self, user):
         """Returns the number of unread messages for a specific user"""
-        return self.messages.filter(is_read=False).exclude(sender=user).count()
+        from apps.chat.unread import get_room_unread_count
+        return get_room_unread_count(user.id, self.pk)
+    
+    def read_watermarks(self):
+        """Returns {user_id: last read message id} for the participants of this chat room"""
+        return dict(self.read_states.values_list('user_id', 'last_read_message_id'))
     
     def mark_messages_as_read(self, user):
-        """Mark all messages as read for a specific user"""
-        return self.messages.filter(is_read=False).exclude(sender=user).update(is_read=True)
+        """
+        Mark all messages as read for a specific user.
+        Moves the user's read watermark to the latest message with a single UPDATE.
+        Returns the number of messages that became read.
+        """
+        from apps.chat.unread import get_room_unread_count
+        marked = get_room_unread_count(user.id, self.pk)
+        latest_message_id = Coalesce(
+            Subquery(
+                Message.objects.filter(chat_room_id=OuterRef('chat_room_id')).order_by('-id').values('id')[:1]
+            ),
+            0
+        )
+        advanced = ChatReadState.objects.filter(
+            Q(last_read_message_id__lt=latest_message_id) | Q(unread_count__gt=0),
+            chat_room=self, user=user
+        ).update(last_read_message_id=latest_message_id, unread_count=0, updated_at=timezone.now())
+        if advanced:
+            from apps.chat.unread import reset_unread
+            transaction.on_commit(lambda: reset_unread(user.id, self.pk))
+        return marked if advanced else 0
+    
+    def mark_read_up_to(self, user, message_id):
+        """
+        Mark messages up to (and including) message_id as read for a specific user.
+        Returns True if the user's read watermark moved forward.
+        """
+        remaining = Message.objects.filter(
+            chat_room_id=OuterRef('chat_room_id'), id__gt=message_id
+        ).exclude(sender_id=OuterRef('user_id')).order_by().values('chat_room_id').annotate(
+            unread=Count('id')
+        ).values('unread')
+        advanced = ChatReadState.objects.filter(
+            chat_room=self, user=user, last_read_message_id__lt=message_id
+        ).update(
+            last_read_message_id=message_id,
+            unread_count=Coalesce(Subquery(remaining), 0),
+            updated_at=timezone.now()
+        )
+        if advanced:
+            from apps.chat.unread import invalidate_unread
+            transaction.on_commit(lambda: invalidate_unread(user.id))
+        return bool(advanced)
+    
+    @classmethod
+    def mark_all_messages_as_read(cls, user):
+        """Mark the messages in all chat rooms of a user as read (single UPDATE)"""
+        latest_message_id = Coalesce(
+            Subquery(
+                Message.objects.filter(chat_room_id=OuterRef('chat_room_id')).order_by('-id').values('id')[:1]
+            ),
+            0
+        )
+        advanced = ChatReadState.objects.filter(
+            Q(last_read_message_id__lt=latest_message_id) | Q(unread_count__gt=0),
+            user=user
+        ).update(last_read_message_id=latest_message_id, unread_count=0, updated_at=timezone.now())
+        if advanced:
+            from apps.chat.unread import invalidate_unread
+            transaction.on_commit(lambda: invalidate_unread(user.id))
+        return advanced
     
     def activate(self):
         """Activates the chat room when the first message is sent"""
@@ -65,91 +195,264 @@ class ChatRoom(models.Model):
             self.is_active = True
             self.save(update_fields=['is_active'])
     
+    def record_message(self, message):
+        """
+        Yeni mesajı odanın son mesaj bilgisine ve alıcıların okunmamış sayaçlarına yansıtır.
+        Mesajı oluşturan transaction içinde çağrılır (post_save); oda listesi Message
+        tablosuna inmeden bu alanlardan okunur.
+        """
+        ChatRoom.objects.filter(
+            Q(last_message_id__isnull=True) | Q(last_message_id__lt=message.pk),
+            pk=self.pk
+        ).update(
+            last_message=message,
+            last_message_text=(message.text or '')[:CHAT_PREVIEW_LENGTH],
+            last_message_sender_id=message.sender_id,
+            last_message_at=message.timestamp,
+            is_active=True,
+            updated_at=timezone.now()
+        )
+        ChatReadState.objects.filter(chat_room=self).exclude(user_id=message.sender_id).update(
+            unread_count=F('unread_count') + 1
+        )
+
+    def remove_message(self, message):
+        """
+        Mesajı siler. Mesajı henüz okumamış alıcıların okunmamış sayısı bir azaltılır; mesaj
+        odanın son mesajıysa son mesaj bilgisi yeniden hesaplanır. Hepsi aynı transaction'dadır.
+        """
+        from apps.chat.unread import increment_unread
+
+        message_id, sender_id = message.pk, message.sender_id
+        with transaction.atomic():
+            message.delete()
+            recipient_ids = list(
+                ChatReadState.objects.select_for_update().filter(
+                    chat_room=self, last_read_message_id__lt=message_id, unread_count__gt=0
+                ).exclude(user_id=sender_id).values_list('user_id', flat=True)
+            )
+            ChatReadState.objects.filter(chat_room=self, user_id__in=recipient_ids).update(
+                unread_count=F('unread_count') - 1,
+                updated_at=timezone.now()
+            )
+            if self.last_message_id == message_id:
+                self.refresh_last_message()
+            transaction.on_commit(lambda: increment_unread(self.pk, recipient_ids, -1))
+
+    def refresh_last_message(self):
+        """Son mesaj silindiğinde son mesaj bilgisini Message tablosundan yeniden hesaplar"""
+        last_message = self.messages.order_by('-id').first()
+        self.last_message = last_message
+        self.last_message_text = ((last_message.text or '') if last_message else '')[:CHAT_PREVIEW_LENGTH]
+        self.last_message_sender_id = last_message.sender_id if last_message else None
+        self.last_message_at = last_message.timestamp if last_message else None
+        self.save(update_fields=['last_message', 'last_message_text', 'last_message_sender', 'last_message_at'])
+
+    def clear_for_user(self, user):
+        """
+        Sohbeti kullanıcı için siler: o ana kadarki mesajlar kullanıcıya bir daha gösterilmez
+        (silme işareti son mesaja taşınır) ve okunmuş sayılır.
+        """
+        self.deleted_by.add(user)
+        ChatRoomDeletion.objects.update_or_create(
+            chat_room=self,
+            user=user,
+            defaults={'deleted_at': timezone.now()}
+        )
+        last_message_id = self.last_message_id or 0
+        ChatReadState.objects.filter(chat_room=self, user=user).update(
+            cleared_message_id=Greatest('cleared_message_id', last_message_id),
+            last_read_message_id=Greatest('last_read_message_id', last_message_id),
+            unread_count=0,
+            updated_at=timezone.now()
+        )
+        from apps.chat.unread import reset_unread
+        transaction.on_commit(lambda: reset_unread(user.id, self.pk))
+
+    def visible_messages(self, user, archived=False):
+        """
+        Kullanıcının görebildiği mesajlar: sohbeti sildiği andan (silme işaretinden) sonrakiler.
+        archived=True ise arşivlenmiş mesajlar (ArchivedMessage) döner.
+        """
+        cleared_message_id = ChatReadState.objects.filter(
+            chat_room=self, user=user
+        ).values_list('cleared_message_id', flat=True).first()
+        messages = (self.archived_messages if archived else self.messages).all()
+        if cleared_message_id:
+            messages = messages.filter(id__gt=cleared_message_id)
+        return messages
+
+    def set_muted(self, user, is_muted=True):
+        """Kullanıcı için sohbetin push bildirimlerini kapatır/açar"""
+        return ChatReadState.objects.filter(chat_room=self, user=user).update(
+            is_muted=is_muted, updated_at=timezone.now()
+        )
+
+    @classmethod
+    def for_participant(cls, user):
+        """
+        Kullanıcının katıldığı odalar, kullanıcının oda durumuyla birlikte
+        (ChatReadState ile tek join): `unread_for_user`, `is_muted_for_user`, `cleared_message_id`
+        """
+        return cls.objects.filter(read_states__user=user).annotate(
+            unread_for_user=F('read_states__unread_count'),
+            is_muted_for_user=F('read_states__is_muted'),
+            cleared_message_id=F('read_states__cleared_message_id'),
+        )
+
     @classmethod
     def get_active_rooms_for_user(cls, user):
         """
         Returns only active chat rooms for a specific user.
-        Excludes chat rooms that the user has deleted and that have no new messages since deletion.
+        Excludes chat rooms that the user has deleted and that have no new messages since deletion
+        (the last message is not newer than the user's deletion watermark).
+        Computed in a single query; rooms are annotated with `is_deleted_for_user`.
         """
-        # Get all active chat rooms for this user
-
-        chat_rooms = cls.objects.filter(
-            participants=user,
+        deleted_by_user = cls.deleted_by.through.objects.filter(
+            chatroom_id=OuterRef('pk'),
+            user_id=user.id
+        )
+        return cls.for_participant(user).filter(
+            Q(cleared_message_id=0) | Q(last_message_id__gt=F('cleared_message_id')),
             is_active=True
-        ).distinct()
-        print(chat_rooms)
-        # Exclude chat rooms marked as deleted by the user with no new messages
-        deleted_chat_room_ids = []
-        
-        for chat_room in chat_rooms:
-            # Check if this chat room was deleted by the user
-            if chat_room.deleted_by.filter(id=user.id).exists():
-                # Get the latest deletion record - avoid circular import
-                deletion_record = chat_room.deletion_records.filter(
-                    user=user
-                ).order_by('-deleted_at').first()
-                
-                if deletion_record:
-                    # Check if there are any messages after deletion
-                    has_new_messages = chat_room.messages.filter(
-                        timestamp__gt=deletion_record.deleted_at
-                    ).exists()
-                    
-                    # If no new messages after deletion, add to exclusion list
-                    if not has_new_messages:
-                        deleted_chat_room_ids.append(chat_room.id)
-        
-        # Return chat rooms excluding the deleted ones without new messages
-        return chat_rooms.exclude(id__in=deleted_chat_room_ids).order_by('-updated_at')
+        ).annotate(
+            is_deleted_for_user=Exists(deleted_by_user)
+        ).order_by('-updated_at')
+
+    @classmethod
+    def with_last_message_time(cls, queryset):
+        """Annotates `last_message_time` and orders by it (denormalized last_message_at)"""
+        return queryset.annotate(
+            last_message_time=F('last_message_at')
+        ).order_by(F('last_message_at').desc(nulls_last=True), '-id')
+
+    @staticmethod
+    def make_pair_key(user1_id, user2_id):
+        """Canonical key of the direct chat between two users (sorted id pair)"""
+        low, high = sorted((int(user1_id), int(user2_id)))
+        return f"{low}:{high}"
+
     @classmethod
     def get_or_create_chat_room(cls, user1, user2):
         """
         Get an existing chat room between two users or create a new one
         Returns tuple (chat_room, created) like Django's get_or_create
         """
-        # Try to find an existing chat room
-        chat_rooms = ChatRoom.objects.filter(participants=user1).filter(participants=user2)
-        
-        if chat_rooms.exists():
-            return chat_rooms.first(), False
+        pair_key = cls.make_pair_key(user1.id, user2.id)
+
+        # Try to find an existing chat room (single lookup on the unique pair_key index)
+        chat_room = cls.objects.filter(pair_key=pair_key).first()
+        if chat_room:
+            return chat_room, False
         
-        # Create a new chat room if one doesn't exist
-        chat_room = ChatRoom.objects.create()
-        chat_room.participants.add(user1, user2)
+        # Create a new chat room if one doesn't exist; a concurrent request that created
+        # the same room first wins and its room is returned
+        try:
+            with transaction.atomic():
+                chat_room = cls.objects.create(pair_key=pair_key)
+                chat_room.participants.add(user1, user2)
+        except IntegrityError:
+            return cls.objects.get(pair_key=pair_key), False
         return chat_room, True
 
     @classmethod
-    def cleanup_deleted_rooms(cls):
+    def fully_deleted_room_ids(cls):
         """
-        Permanently deletes chat rooms where all participants have marked them as deleted.
-        This can be run as a periodic task to clean up the database.
+        Ids of chat rooms where all participants have marked them as deleted.
+        Single grouped query over the participants table.
+        """
+        deleted_by_participant = cls.deleted_by.through.objects.filter(
+            chatroom_id=OuterRef('chatroom_id'),
+            user_id=OuterRef('user_id')
+        )
+        return cls.participants.through.objects.values('chatroom_id').annotate(
+            participant_count=Count('user_id'),
+            deleted_count=Count('user_id', filter=Q(Exists(deleted_by_participant))),
+        ).filter(
+            participant_count=F('deleted_count')
+        ).values_list('chatroom_id', flat=True)
+
+    @classmethod
+    def lock_fully_deleted(cls, room_ids):
+        """
+        Locks the given chat rooms and returns the ids of those still deleted by all participants.
+        Must be called inside a transaction: a message sent to a locked room waits until the
+        transaction ends, so a room that got a new message since it was selected is never deleted.
+        """
+        list(cls.objects.select_for_update().filter(id__in=room_ids).values_list('id', flat=True))
+        return list(cls.fully_deleted_room_ids().filter(chatroom_id__in=room_ids))
+
+    @classmethod
+    def delete_rooms(cls, room_ids, chunk_size=100, batch_size=1000, progress=None):
+        """
+        Permanently deletes the given chat rooms with their messages.
+        Rooms are processed in chunks of chunk_size, messages are deleted in batches of
+        batch_size (each batch in its own transaction), so locks stay short.
+        Every batch re-checks its rooms (lock_fully_deleted): rooms that a participant
+        sent a message to after they were selected are skipped.
+        
+        Args:
+            progress: Optional callable(deleted_rooms, total_rooms, deleted_messages) called after each chunk
         
         Returns:
-            int: Number of chat rooms deleted
+            tuple: (deleted rooms, deleted messages)
         """
-        rooms_to_delete = []
+        from apps.chat.delivery import invalidate_room_members
+        room_ids = list(room_ids)
+        deleted_rooms = deleted_messages = 0
         
-        # Get all chat rooms
-        for chat_room in cls.objects.all():
-            # Get all participants and deleted_by users
-            participants = set(chat_room.participants.all().values_list('id', flat=True))
-            deleted_by = set(chat_room.deleted_by.all().values_list('id', flat=True))
+        for start in range(0, len(room_ids), chunk_size):
+            chunk = room_ids[start:start + chunk_size]
             
-            # If all participants have deleted the chat room, mark it for deletion
-            if participants and participants == deleted_by:
-                rooms_to_delete.append(chat_room.id)
-        
-        # Get count before deletion
-        count = len(rooms_to_delete)
-        
-        # First delete messages to avoid foreign key constraints
-        from apps.chat.models import Message
-        Message.objects.filter(chat_room_id__in=rooms_to_delete).delete()
+            # First delete messages (and attachments) in bounded batches, then archived messages
+            # (their attachment files are removed by delete_archived_attachment_files)
+            while chunk:
+                with transaction.atomic():
+                    chunk = cls.lock_fully_deleted(chunk)
+                    message_ids = list(
+                        Message.objects.filter(chat_room_id__in=chunk).order_by().values_list('id', flat=True)[:batch_size]
+                    )
+                    if message_ids:
+                        # Last message pointers are cleared first so the message delete doesn't update the rooms
+                        cls.objects.filter(id__in=chunk, last_message__isnull=False).update(last_message=None)
+                        Message.objects.filter(id__in=message_ids).delete()
+                    else:
+                        message_ids = list(
+                            ArchivedMessage.objects.filter(
+                                chat_room_id__in=chunk
+                            ).order_by().values_list('id', flat=True)[:batch_size]
+                        )
+                        if not message_ids:
+                            break
+                        ArchivedMessage.objects.filter(id__in=message_ids).delete()
+                deleted_messages += len(message_ids)
+            
+            # Then delete chat rooms (participants, read states and deletion records cascade)
+            if chunk:
+                with transaction.atomic():
+                    chunk = cls.lock_fully_deleted(chunk)
+                    cls.objects.filter(id__in=chunk).delete()
+                deleted_rooms += len(chunk)
+                invalidate_room_members(*chunk)
+            
+            if progress:
+                progress(deleted_rooms, len(room_ids), deleted_messages)
         
-        # Then delete chat rooms
-        cls.objects.filter(id__in=rooms_to_delete).delete()
+        return deleted_rooms, deleted_messages
+
+    @classmethod
+    def cleanup_deleted_rooms(cls, chunk_size=100, batch_size=1000, progress=None):
+        """
+        Permanently deletes chat rooms where all participants have marked them as deleted.
+        This can be run as a periodic task to clean up the database.
         
-        return count
+        Returns:
+            int: Number of chat rooms deleted
+        """
+        deleted_rooms, _ = cls.delete_rooms(
+            cls.fully_deleted_room_ids(), chunk_size=chunk_size, batch_size=batch_size, progress=progress
+        )
+        return deleted_rooms
 
 
 class Message(models.Model):
@@ -177,10 +480,6 @@ class Message(models.Model):
         default=timezone.now,
         verbose_name=_("Timestamp")
     )
-    is_read = models.BooleanField(
-        default=False,
-        verbose_name=_("Is Read")
-    )
     is_delivered = models.BooleanField(
         default=False,
         verbose_name=_("Is Delivered")
@@ -190,15 +489,32 @@ class Message(models.Model):
         verbose_name = _("Message")
         verbose_name_plural = _("Messages")
         ordering = ['timestamp']
+        indexes = [
+            # Last message / new-since-deletion lookups per room
+            models.Index(fields=['chat_room', 'timestamp']),
+        ]
     
     def __str__(self):
         return f"Message from {self.sender.username} at {self.timestamp.strftime('%Y-%m-%d %H:%M')}"
     
-    def mark_as_read(self):
-        """Mark message as read"""
-        if not self.is_read:
-            self.is_read = True
-            self.save(update_fields=['is_read'])
+    def mark_as_read(self, user):
+        """Mark message (and every earlier message in the room) as read for a user"""
+        if user.id == self.sender_id:
+            return False
+        return self.chat_room.mark_read_up_to(user, self.id)
+    
+    def is_read_by_recipients(self, watermarks=None):
+        """
+        Whether a participant other than the sender has read this message.
+        watermarks: {user_id: last read message id}, ChatRoom.read_watermarks() if omitted
+        """
+        if watermarks is None:
+            watermarks = self.chat_room.read_watermarks()
+        return any(
+            last_read_id >= self.id
+            for user_id, last_read_id in watermarks.items()
+            if user_id != self.sender_id
+        )
     
     def mark_as_delivered(self):
         """Mark message as delivered"""
@@ -259,12 +575,138 @@ class MessageAttachment(models.Model):
         
         super().save(*args, **kwargs)
 
+class ArchivedMessage(models.Model):
+    """
+    Arşivlenmiş mesaj: etkin olmayan odaların eski mesajları Message tablosundan buraya
+    taşınır (apps.chat.archive). Mesaj id'si korunur; okuma ve silme işaretleri aynen geçerlidir.
+    Ekler dosyalarıyla birlikte korunur, bilgileri attachment_data'da tutulur.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    chat_room = models.ForeignKey(
+        ChatRoom,
+        on_delete=models.CASCADE,
+        related_name='archived_messages',
+        verbose_name=_("Chat Room")
+    )
+    sender = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name=_("Sender")
+    )
+    text = models.TextField(
+        verbose_name=_("Message Text"),
+        blank=True,
+        null=True
+    )
+    timestamp = models.DateTimeField(
+        verbose_name=_("Timestamp")
+    )
+    attachment_data = models.JSONField(
+        default=list,
+        blank=True,
+        verbose_name=_("Attachments")
+    )
+    archived_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name=_("Archived at")
+    )
+
+    # Arşivlenen mesajlar teslim edilmiş sayılır
+    is_delivered = True
+
+    class Meta:
+        verbose_name = _("Archived Message")
+        verbose_name_plural = _("Archived Messages")
+        ordering = ['timestamp']
+        indexes = [
+            models.Index(fields=['chat_room', 'timestamp']),
+        ]
+
+    def __str__(self):
+        return f"Archived message #{self.pk} in ChatRoom #{self.chat_room_id}"
+
+    @property
+    def attachments(self):
+        """Ekler, MessageAttachment olarak (kaydedilmemiş; serileştirme için)"""
+        return [
+            MessageAttachment(
+                id=data['id'],
+                message_id=self.pk,
+                file=data['file'],
+                file_type=data.get('file_type', ''),
+                thumbnail=data.get('thumbnail') or None,
+                created_at=parse_datetime(data['created_at']) if data.get('created_at') else None,
+            )
+            for data in self.attachment_data
+        ]
+
+    def is_read_by_recipients(self, watermarks=None):
+        return Message.is_read_by_recipients(self, watermarks)
+
+    def attachment_files(self):
+        """Eklerin depodaki dosya yolları (dosya ve küçük resim)"""
+        return [
+            path
+            for data in self.attachment_data
+            for path in (data.get('file'), data.get('thumbnail'))
+            if path
+        ]
+
+    @classmethod
+    def from_message(cls, message):
+        """Message (ekleri prefetch edilmiş) -> ArchivedMessage"""
+        return cls(
+            id=message.pk,
+            chat_room_id=message.chat_room_id,
+            sender_id=message.sender_id,
+            text=message.text,
+            timestamp=message.timestamp,
+            attachment_data=[
+                {
+                    'id': attachment.pk,
+                    'file': attachment.file.name,
+                    'file_type': attachment.file_type,
+                    'thumbnail': attachment.thumbnail.name if attachment.thumbnail else None,
+                    'created_at': attachment.created_at.isoformat(),
+                }
+                for attachment in message.attachments.all()
+            ],
+        )
+
+
 @receiver(post_delete, sender=MessageAttachment)
 def delete_photo_file(sender, instance, **kwargs):
+    if getattr(_attachment_files, 'keep', False):
+        return
     if instance.file:
         if default_storage.exists(instance.file.name):
             default_storage.delete(instance.file.name)
 
+@receiver(post_delete, sender=ArchivedMessage)
+def delete_archived_attachment_files(sender, instance, **kwargs):
+    """Arşivlenmiş mesaj silindiğinde arşivin koruduğu ek dosyalarını sil"""
+    for path in instance.attachment_files():
+        if default_storage.exists(path):
+            default_storage.delete(path)
+
+@receiver(post_save, sender=Message)
+def count_unread_message(sender, instance, created, **kwargs):
+    """
+    Yeni mesaj: odanın son mesaj bilgisi ve alıcıların okunmamış sayıları mesajla aynı
+    transaction'da güncellenir; alıcıların Redis sayaçları commit sonrası artırılır
+    """
+    if not created:
+        return
+
+    instance.chat_room.record_message(instance)
+
+    from apps.chat.delivery import get_room_member_ids
+    from apps.chat.unread import increment_unread
+    room_id, sender_id = instance.chat_room_id, instance.sender_id
+    recipient_ids = [user_id for user_id in get_room_member_ids(room_id) if user_id != sender_id]
+    transaction.on_commit(lambda: increment_unread(room_id, recipient_ids))
+
 class ChatRoomDeletion(models.Model):
     """Model to track when a user deleted a chat room"""
     chat_room = models.ForeignKey('ChatRoom', on_delete=models.CASCADE, related_name='deletion_records')
@@ -275,4 +717,91 @@ class ChatRoomDeletion(models.Model):
         unique_together = ('chat_room', 'user')
         
     def __str__(self):
-        return f"ChatRoom #{self.chat_room_id} deleted by {self.user.username} at {self.deleted_at}"
\ No newline at end of file
+        return f"ChatRoom #{self.chat_room_id} deleted by {self.user.username} at {self.deleted_at}"
+
+
+class ChatReadState(models.Model):
+    """
+    State of a participant in a chat room.
+    Read watermark: every message with an id up to last_read_message_id counts as read for the user;
+    unread_count is kept in sync with it. Deletion watermark: messages with an id up to
+    cleared_message_id were deleted by the user and are not shown to them.
+    """
+    chat_room = models.ForeignKey(
+        ChatRoom,
+        on_delete=models.CASCADE,
+        related_name='read_states',
+        verbose_name=_("Chat Room")
+    )
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='chat_read_states',
+        verbose_name=_("User")
+    )
+    last_read_message_id = models.PositiveBigIntegerField(
+        default=0,
+        verbose_name=_("Last read message id")
+    )
+    unread_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name=_("Unread count")
+    )
+    cleared_message_id = models.PositiveBigIntegerField(
+        default=0,
+        verbose_name=_("Cleared message id")
+    )
+    is_muted = models.BooleanField(
+        default=False,
+        verbose_name=_("Is muted")
+    )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name=_("Updated at")
+    )
+
+    class Meta:
+        verbose_name = _("Chat Read State")
+        verbose_name_plural = _("Chat Read States")
+        constraints = [
+            models.UniqueConstraint(fields=['chat_room', 'user'], name='unique_chat_read_state'),
+        ]
+
+    def __str__(self):
+        return f"ChatRoom #{self.chat_room_id} read by {self.user_id} up to #{self.last_read_message_id}"
+
+
+@receiver(m2m_changed, sender=ChatRoom.participants.through)
+def sync_chat_read_states(sender, instance, action, reverse, pk_set, **kwargs):
+    """Katılımcı eklenince okuma durumu oluştur, çıkarılınca sil; katılımcı cache'ini geçersiz kıl"""
+    from apps.chat.delivery import invalidate_room_members
+
+    if action == 'pre_clear':
+        if reverse:
+            invalidate_room_members(*instance.chat_rooms.values_list('id', flat=True))
+            ChatReadState.objects.filter(user=instance).delete()
+        else:
+            invalidate_room_members(instance.pk)
+            ChatReadState.objects.filter(chat_room=instance).delete()
+        return
+
+    if action not in ('post_add', 'post_remove') or not pk_set:
+        return
+
+    invalidate_room_members(*(pk_set if reverse else [instance.pk]))
+
+    if reverse:
+        pairs = [(room_id, instance.pk) for room_id in pk_set]
+    else:
+        pairs = [(instance.pk, user_id) for user_id in pk_set]
+
+    if action == 'post_add':
+        ChatReadState.objects.bulk_create(
+            [ChatReadState(chat_room_id=room_id, user_id=user_id) for room_id, user_id in pairs],
+            ignore_conflicts=True
+        )
+    else:
+        if reverse:
+            ChatReadState.objects.filter(user=instance, chat_room_id__in=pk_set).delete()
+        else:
+            ChatReadState.objects.filter(chat_room=instance, user_id__in=pk_set).delete()
@@ -1,3 +1,379 @@
-from django.test import TestCase
+import shutil
+import tempfile
+from datetime import timedelta
+from importlib import import_module
+from unittest import mock, skipUnless
+from urllib.parse import parse_qs, urlsplit
 
-# Create your tests here.
+from django.apps import apps as global_apps
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.chat import unread
+from apps.chat.archive import archive_room
+from apps.chat.models import ArchivedMessage, ChatReadState, ChatRoom, Message, MessageAttachment
+from apps.chat.unread import get_room_unread_count, get_unread_counts, get_unread_room_count
+
+try:
+    import fakeredis
+except ImportError:
+    fakeredis = None
+
+
+class ChatTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        # Sayaçlar ChatReadState'ten okunur; Redis sayacı RedisUnreadCountTests'te
+        connection = mock.patch.object(unread, 'redis_connection', return_value=None)
+        connection.start()
+        self.addCleanup(connection.stop)
+
+        self.alice = User.objects.create_user('alice')
+        self.bob = User.objects.create_user('bob')
+        self.room, _ = ChatRoom.get_or_create_chat_room(self.alice, self.bob)
+
+    def send(self, sender, text='merhaba', room=None):
+        return Message.objects.create(chat_room=room or self.room, sender=sender, text=text)
+
+
+class UnreadCountTests(ChatTestCase):
+    def test_counts_follow_new_messages(self):
+        for _ in range(3):
+            self.send(self.alice)
+        self.send(self.bob)
+
+        self.assertEqual(get_room_unread_count(self.bob.id, self.room.id), 3)
+        self.assertEqual(get_room_unread_count(self.alice.id, self.room.id), 1)
+        self.assertEqual(get_unread_counts(self.bob.id), {self.room.id: 3})
+        self.assertEqual(get_unread_room_count(self.bob.id), 1)
+
+    def test_mark_read_resets_count(self):
+        self.send(self.alice)
+        self.send(self.alice)
+
+        self.assertEqual(self.room.mark_messages_as_read(self.bob), 2)
+        self.assertEqual(get_room_unread_count(self.bob.id, self.room.id), 0)
+        self.assertEqual(get_unread_room_count(self.bob.id), 0)
+
+        # Okunduktan sonra gelen mesajlar yeniden sayılır
+        self.send(self.alice)
+        self.assertEqual(get_room_unread_count(self.bob.id, self.room.id), 1)
+
+    def test_mark_read_up_to_keeps_later_messages_unread(self):
+        first = self.send(self.alice)
+        self.send(self.alice)
+        self.send(self.alice)
+
+        self.assertTrue(first.mark_as_read(self.bob))
+        self.assertEqual(get_room_unread_count(self.bob.id, self.room.id), 2)
+
+    def test_unknown_room_has_no_unread_messages(self):
+        self.assertEqual(get_room_unread_count(self.bob.id, self.room.id + 1000), 0)
+
+
+@skipUnless(fakeredis, 'fakeredis[lua] kurulu değil')
+class RedisUnreadCountTests(ChatTestCase):
+    def setUp(self):
+        super().setUp()
+        self.redis = fakeredis.FakeRedis()
+        connection = mock.patch.object(unread, 'redis_connection', return_value=self.redis)
+        connection.start()
+        self.addCleanup(connection.stop)
+
+    def send(self, sender, text='merhaba', room=None):
+        with self.captureOnCommitCallbacks(execute=True):
+            return super().send(sender, text, room)
+
+    def committed(self):
+        return self.captureOnCommitCallbacks(execute=True)
+
+    def counts(self, user):
+        return self.redis.hgetall(unread._unread_key(user.id))
+
+    def test_cold_counter_is_built_from_read_states(self):
+        self.send(self.alice)
+        self.send(self.alice)
+        self.assertEqual(self.counts(self.bob), {})
+
+        self.assertEqual(get_room_unread_count(self.bob.id, self.room.id), 2)
+        self.assertEqual(self.counts(self.bob), {b'+': b'1', str(self.room.id).encode(): b'2'})
+        self.assertEqual(get_unread_counts(self.alice.id), {})
+        self.assertEqual(get_unread_room_count(self.alice.id), 0)
+
+    def test_warm_counter_is_read_without_database(self):
+        get_unread_counts(self.bob.id)
+        for _ in range(3):
+            self.send(self.alice)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(get_room_unread_count(self.bob.id, self.room.id), 3)
+            self.assertEqual(get_unread_counts(self.bob.id), {self.room.id: 3})
+            self.assertEqual(get_unread_room_count(self.bob.id), 1)
+
+    def test_mark_read_and_delete_update_the_counter(self):
+        get_unread_counts(self.bob.id)
+        self.send(self.alice)
+        second = self.send(self.alice)
+        self.send(self.alice)
+
+        with self.committed():
+            self.room.remove_message(second)
+        self.assertEqual(get_room_unread_count(self.bob.id, self.room.id), 2)
+
+        with self.committed():
+            self.room.mark_messages_as_read(self.bob)
+        self.assertEqual(get_unread_counts(self.bob.id), {})
+        self.assertEqual(get_unread_room_count(self.bob.id), 0)
+
+        # Okuma işareti bir mesaja kadar ilerletilince hash yeniden oluşturulur
+        fourth = self.send(self.alice)
+        self.send(self.alice)
+        with self.committed():
+            self.room.mark_read_up_to(self.bob, fourth.id)
+        self.assertEqual(self.counts(self.bob), {})
+        self.assertEqual(get_room_unread_count(self.bob.id, self.room.id), 1)
+
+    def test_counter_stays_in_sync_with_read_state(self):
+        get_unread_counts(self.bob.id)
+        for _ in range(5):
+            self.send(self.alice)
+        self.send(self.bob)
+
+        state = ChatReadState.objects.get(chat_room=self.room, user=self.bob)
+        self.assertEqual(get_room_unread_count(self.bob.id, self.room.id), state.unread_count)
+
+        with self.committed():
+            self.room.clear_for_user(self.bob)
+        self.assertEqual(get_unread_room_count(self.bob.id), 0)
+
+
+class MessageDeletionTests(ChatTestCase):
+    def delete(self, user, message):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client.delete(f'/api/v1/chat/rooms/{self.room.id}/messages/{message.id}/')
+
+    def test_deleting_unread_message_decrements_recipient_count(self):
+        first = self.send(self.alice, 'bir')
+        second = self.send(self.alice, 'iki')
+        third = self.send(self.alice, 'üç')
+        first.mark_as_read(self.bob)
+        self.assertEqual(get_room_unread_count(self.bob.id, self.room.id), 2)
+
+        self.assertEqual(self.delete(self.alice, third).status_code, 204)
+
+        self.assertEqual(get_room_unread_count(self.bob.id, self.room.id), 1)
+        self.room.refresh_from_db()
+        self.assertEqual(self.room.last_message_id, second.id)
+        self.assertEqual(self.room.last_message_text, 'iki')
+
+    def test_deleting_read_message_keeps_counts(self):
+        first = self.send(self.alice, 'bir')
+        self.send(self.alice, 'iki')
+        first.mark_as_read(self.bob)
+
+        self.assertEqual(self.delete(self.alice, first).status_code, 204)
+        self.assertEqual(get_room_unread_count(self.bob.id, self.room.id), 1)
+
+    def test_sender_count_is_not_changed(self):
+        self.send(self.bob, 'selam')
+        own = self.send(self.alice, 'merhaba')
+
+        self.assertEqual(self.delete(self.alice, own).status_code, 204)
+        self.assertEqual(get_room_unread_count(self.alice.id, self.room.id), 1)
+        self.assertEqual(get_room_unread_count(self.bob.id, self.room.id), 0)
+
+
+class DirectRoomTests(ChatTestCase):
+    def test_existing_room_is_found_by_pair_key(self):
+        room, created = ChatRoom.get_or_create_chat_room(self.bob, self.alice)
+        self.assertFalse(created)
+        self.assertEqual(room, self.room)
+        self.assertEqual(room.pair_key, ChatRoom.make_pair_key(self.alice.id, self.bob.id))
+
+    def test_concurrently_created_room_is_returned(self):
+        carol = User.objects.create_user('carol')
+        existing, _ = ChatRoom.get_or_create_chat_room(self.alice, carol)
+
+        # Başka bir istek odayı arama ile oluşturma arasında oluşturmuş gibi: arama boş döner,
+        # oluşturma unique pair_key'e takılır
+        with mock.patch.object(ChatRoom.objects, 'filter', return_value=ChatRoom.objects.none()):
+            room, created = ChatRoom.get_or_create_chat_room(carol, self.alice)
+
+        self.assertFalse(created)
+        self.assertEqual(room, existing)
+        self.assertEqual(ChatRoom.objects.filter(pair_key=existing.pair_key).count(), 1)
+
+
+class PairKeyMigrationTests(TestCase):
+    migration = import_module('apps.chat.migrations.0012_chatroom_pair_key')
+
+    def make_room(self, *users):
+        room = ChatRoom.objects.create()
+        room.participants.add(*users)
+        return room
+
+    def test_duplicate_rooms_are_merged_into_oldest(self):
+        alice = User.objects.create_user('alice')
+        bob = User.objects.create_user('bob')
+        keeper = self.make_room(alice, bob)
+        duplicate = self.make_room(alice, bob)
+
+        first = Message.objects.create(chat_room=keeper, sender=alice, text='bir')
+        Message.objects.create(chat_room=duplicate, sender=alice, text='iki')
+        last = Message.objects.create(chat_room=duplicate, sender=bob, text='üç')
+        ChatReadState.objects.filter(chat_room=keeper, user=bob).update(last_read_message_id=first.id)
+        ChatReadState.objects.filter(chat_room=duplicate, user=bob).update(is_muted=True)
+        # Alice sohbetin sadece bir kopyasını silmiş
+        duplicate.deleted_by.add(alice)
+
+        self.migration.set_pair_keys(global_apps, None)
+
+        self.assertFalse(ChatRoom.objects.filter(pk=duplicate.pk).exists())
+        keeper.refresh_from_db()
+        self.assertEqual(keeper.pair_key, ChatRoom.make_pair_key(alice.id, bob.id))
+        self.assertEqual(keeper.messages.count(), 3)
+        self.assertEqual(keeper.last_message_id, last.id)
+        self.assertEqual(keeper.last_message_text, 'üç')
+        self.assertFalse(keeper.deleted_by.exists())
+
+        bob_state = ChatReadState.objects.get(chat_room=keeper, user=bob)
+        self.assertEqual(bob_state.last_read_message_id, first.id)
+        self.assertEqual(bob_state.unread_count, 1)
+        self.assertTrue(bob_state.is_muted)
+        self.assertEqual(ChatReadState.objects.get(chat_room=keeper, user=alice).unread_count, 1)
+
+    def test_group_rooms_get_no_pair_key(self):
+        users = [User.objects.create_user(name) for name in ('a', 'b', 'c')]
+        room = self.make_room(*users)
+
+        self.migration.set_pair_keys(global_apps, None)
+
+        room.refresh_from_db()
+        self.assertIsNone(room.pair_key)
+
+
+class RoomCleanupTests(ChatTestCase):
+    def setUp(self):
+        super().setUp()
+        self.carol = User.objects.create_user('carol')
+        self.other_room, _ = ChatRoom.get_or_create_chat_room(self.alice, self.carol)
+        for room, users in ((self.room, (self.alice, self.bob)), (self.other_room, (self.alice, self.carol))):
+            for _ in range(3):
+                self.send(users[0], room=room)
+            for user in users:
+                room.clear_for_user(user)
+
+    def post_message(self, user, room):
+        client = APIClient()
+        client.force_authenticate(user)
+        response = client.post(f'/api/v1/chat/rooms/{room.id}/messages/', {'text': 'geri döndüm'})
+        self.assertEqual(response.status_code, 201, response.content)
+
+    def test_fully_deleted_rooms_are_deleted_in_batches(self):
+        room_ids = list(ChatRoom.fully_deleted_room_ids())
+        self.assertCountEqual(room_ids, [self.room.id, self.other_room.id])
+
+        self.assertEqual(ChatRoom.delete_rooms(room_ids, chunk_size=1, batch_size=2), (2, 6))
+        self.assertFalse(ChatRoom.objects.filter(id__in=room_ids).exists())
+        self.assertFalse(Message.objects.exists())
+
+    def test_room_revived_after_selection_is_kept(self):
+        room_ids = list(ChatRoom.fully_deleted_room_ids())
+        # Seçim (ve onay) ile silme arasında bob yeni mesaj gönderiyor
+        self.post_message(self.bob, self.room)
+
+        self.assertEqual(ChatRoom.delete_rooms(room_ids), (1, 3))
+        self.assertTrue(ChatRoom.objects.filter(id=self.room.id).exists())
+        self.assertEqual(self.room.messages.count(), 4)
+        self.assertFalse(ChatRoom.objects.filter(id=self.other_room.id).exists())
+
+    def test_room_revived_between_chunks_is_kept(self):
+        room_ids = sorted(ChatRoom.fully_deleted_room_ids())
+        revived = ChatRoom.objects.get(id=room_ids[1])
+        sender = revived.participants.exclude(id=self.alice.id).get()
+
+        def progress(deleted_rooms, total_rooms, deleted_messages):
+            if deleted_rooms == 1:
+                self.post_message(sender, revived)
+
+        self.assertEqual(ChatRoom.delete_rooms(room_ids, chunk_size=1, progress=progress), (1, 3))
+        self.assertTrue(ChatRoom.objects.filter(id=revived.id).exists())
+        revived.refresh_from_db()
+        self.assertEqual(revived.last_message_text, 'geri döndüm')
+
+
+class ArchiveTests(ChatTestCase):
+    def setUp(self):
+        super().setUp()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        media = override_settings(MEDIA_ROOT=media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+
+        # Eskiden yeniye, zaman damgaları farklı beş mesaj; ilk üçü arşivlenir
+        self.messages = []
+        for index in range(5):
+            message = self.send(self.alice if index % 2 else self.bob, f'mesaj {index}')
+            message.timestamp = timezone.now() - timedelta(days=200 - index)
+            Message.objects.filter(pk=message.pk).update(timestamp=message.timestamp)
+            self.messages.append(message)
+        self.attachment = MessageAttachment.objects.create(
+            message=self.messages[0],
+            file=SimpleUploadedFile('not.txt', b'ek dosya'),
+            file_type='text/plain',
+        )
+        self.room.refresh_from_db()
+
+    def archive(self):
+        return archive_room(self.room, self.messages[2].pk, batch_size=2)
+
+    def list_messages(self, params):
+        client = APIClient()
+        client.force_authenticate(self.bob)
+        response = client.get(f'/api/v1/chat/rooms/{self.room.id}/messages/', params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.data
+
+    def test_archive_moves_messages_and_keeps_files(self):
+        self.assertEqual(self.archive(), 3)
+
+        self.assertEqual(list(self.room.messages.values_list('pk', flat=True).order_by('pk')),
+                         [message.pk for message in self.messages[3:]])
+        self.assertEqual(ArchivedMessage.objects.filter(chat_room=self.room).count(), 3)
+        archived = ArchivedMessage.objects.get(pk=self.messages[0].pk)
+        self.assertEqual(archived.attachment_files(), [self.attachment.file.name])
+        self.assertTrue(default_storage.exists(self.attachment.file.name))
+
+    def test_pages_continue_from_archive(self):
+        self.archive()
+        expected = [message.pk for message in reversed(self.messages)]
+
+        ids = []
+        for page in (1, 2, 3):
+            ids += [message['id'] for message in self.list_messages({'page': page, 'page_size': 2})['results']]
+        self.assertEqual(ids, expected)
+
+        ids, params = [], {'pagination': 'cursor', 'page_size': 2}
+        while True:
+            data = self.list_messages(params)
+            ids += [message['id'] for message in data['results']]
+            if not data['next']:
+                break
+            params = {key: values[0] for key, values in parse_qs(urlsplit(data['next']).query).items()}
+        self.assertEqual(ids, expected)
+
+    def test_deleting_room_purges_archive_and_files(self):
+        self.archive()
+        for user in (self.alice, self.bob):
+            self.room.clear_for_user(user)
+
+        self.assertEqual(ChatRoom.delete_rooms([self.room.id], batch_size=2), (1, 5))
+        self.assertFalse(ArchivedMessage.objects.exists())
+        self.assertFalse(default_storage.exists(self.attachment.file.name))
@@ -0,0 +1,184 @@
+"""
+Kullanıcı başına okunmamış mesaj sayaçları.
+
+Kalıcı sayaç ChatReadState.unread_count sütunudur; mesajla aynı transaction'da artırılır,
+oda okunduğunda / mesaj silindiğinde yine veritabanında güncellenir.
+
+Prod'da (django-redis) okumalar veritabanına inmeden her kullanıcı için tutulan
+`unread:{user_id}` Redis hash'inden ({oda_id: okunmamış sayısı}) yapılır; sadece okunmamış
+mesajı olan odalar yer alır. Hash sunucu tarafında atomik komutlarla güncellenir
+(commit sonrası):
+- Yeni mesaj: alıcıların sıcak hash'lerinde oda HINCRBY ile artırılır
+- Mesaj silindi: sayacı düşen alıcılarda oda bir azaltılır, sıfıra inen alan silinir
+- Oda okundu / sohbet silindi: oda alanı HDEL ile silinir; okuma işareti bir mesaja kadar
+  ilerletildiğinde ya da tüm odalar okunduğunda hash silinir
+Soğuk (olmayan) hash ilk okumada ChatReadState'ten tek sorguyla doldurulur. TTL eşzamanlı
+okuma/yazma sıralamasından kalabilecek sapmayı sınırlar. Diğer cache backend'lerinde
+(yerelde locmem) sayaçlar doğrudan ChatReadState'ten okunur.
+"""
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+
+from apps.common.utils.redis_scripts import redis_connection, redis_script
+
+logger = logging.getLogger(__name__)
+
+CHAT_UNREAD_TIMEOUT = getattr(settings, 'CHAT_UNREAD_TIMEOUT', 60 * 60)  # 1 saat
+
+# Hash hiç okunmamış oda olmadığında da var olsun diye her zaman bulunan alan
+READY_FIELD = '+'
+
+# Sıcak hash'lerde odanın sayacını ARGV[2] kadar değiştirir; sıfıra inen alan silinir
+INCREMENT_SCRIPT = """
+local changed = 0
+for i = 1, #KEYS do
+    if redis.call('EXISTS', KEYS[i]) == 1 then
+        if redis.call('HINCRBY', KEYS[i], ARGV[1], ARGV[2]) <= 0 then
+            redis.call('HDEL', KEYS[i], ARGV[1])
+        end
+        changed = changed + 1
+    end
+end
+return changed
+"""
+
+# Hash'i doldurur; bu arada başka bir istek doldurduysa dokunmaz (ARGV: timeout, alan, değer, ...)
+FILL_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    return 0
+end
+for i = 2, #ARGV, 2 do
+    redis.call('HSET', KEYS[1], ARGV[i], ARGV[i + 1])
+end
+redis.call('EXPIRE', KEYS[1], ARGV[1])
+return 1
+"""
+
+
+def _unread_key(user_id):
+    return cache.make_key(f"unread:{user_id}")
+
+
+def _query_counts(user_id):
+    from apps.chat.models import ChatReadState
+
+    return dict(
+        ChatReadState.objects.filter(
+            user_id=user_id, unread_count__gt=0
+        ).values_list('chat_room_id', 'unread_count')
+    )
+
+
+def build_unread_counts(connection, user_id):
+    """Oda bazlı okunmamış sayılarını ChatReadState'ten okur ve hash'e yazar"""
+    counts = _query_counts(user_id)
+    args = [CHAT_UNREAD_TIMEOUT, READY_FIELD, 1]
+    for room_id, count in counts.items():
+        args += [room_id, count]
+    redis_script(connection, FILL_SCRIPT)(keys=[_unread_key(user_id)], args=args)
+    return counts
+
+
+def _hash_counts(values):
+    return {
+        int(room_id): int(count)
+        for room_id, count in values.items()
+        if room_id.decode() != READY_FIELD
+    }
+
+
+def get_unread_counts(user_id):
+    """{oda_id: okunmamış sayısı}; sadece okunmamış mesajı olan odalar"""
+    connection = redis_connection()
+    if connection is None:
+        return _query_counts(user_id)
+
+    try:
+        values = connection.hgetall(_unread_key(user_id))
+        if not values:
+            return build_unread_counts(connection, user_id)
+        return _hash_counts(values)
+    except Exception as e:
+        logger.warning(f"Okunmamış sayaçları Redis'ten okunamadı (user {user_id}): {e}")
+        return _query_counts(user_id)
+
+
+def get_room_unread_count(user_id, room_id):
+    connection = redis_connection()
+    if connection is None:
+        from apps.chat.models import ChatReadState
+
+        return ChatReadState.objects.filter(
+            user_id=user_id, chat_room_id=room_id
+        ).values_list('unread_count', flat=True).first() or 0
+
+    try:
+        pipe = connection.pipeline(transaction=False)
+        pipe.exists(_unread_key(user_id))
+        pipe.hget(_unread_key(user_id), int(room_id))
+        exists, count = pipe.execute()
+        if not exists:
+            return build_unread_counts(connection, user_id).get(int(room_id), 0)
+        return int(count or 0)
+    except Exception as e:
+        logger.warning(f"Okunmamış sayaç Redis'ten okunamadı (user {user_id}): {e}")
+        return _query_counts(user_id).get(int(room_id), 0)
+
+
+def get_unread_room_count(user_id):
+    """Okunmamış mesajı olan oda sayısı"""
+    connection = redis_connection()
+    if connection is None:
+        from apps.chat.models import ChatReadState
+
+        return ChatReadState.objects.filter(user_id=user_id, unread_count__gt=0).count()
+
+    try:
+        fields = connection.hlen(_unread_key(user_id))
+        if not fields:
+            return len(build_unread_counts(connection, user_id))
+        return fields - 1
+    except Exception as e:
+        logger.warning(f"Okunmamış oda sayısı Redis'ten okunamadı (user {user_id}): {e}")
+        return len(_query_counts(user_id))
+
+
+def _update(update, user_ids):
+    """Hash güncellemesi; Redis hatasında hash'ler silinir, sonraki okumada yeniden oluşturulur"""
+    connection = redis_connection()
+    if connection is None or not user_ids:
+        return
+    try:
+        update(connection)
+    except Exception as e:
+        logger.warning(f"Okunmamış sayaçlar güncellenemedi (users {list(user_ids)}): {e}")
+        invalidate_unread(*user_ids)
+
+
+def increment_unread(room_id, user_ids, amount=1):
+    """Kullanıcıların sıcak hash'lerinde odanın sayacını amount kadar değiştirir"""
+    user_ids = list(user_ids)
+    _update(
+        lambda connection: redis_script(connection, INCREMENT_SCRIPT)(
+            keys=[_unread_key(user_id) for user_id in user_ids], args=[int(room_id), amount]
+        ),
+        user_ids,
+    )
+
+
+def reset_unread(user_id, room_id):
+    """Oda okundu: odanın alanını siler"""
+    _update(lambda connection: connection.hdel(_unread_key(user_id), int(room_id)), [user_id])
+
+
+def invalidate_unread(*user_ids):
+    """Hash'leri siler; bir sonraki okumada ChatReadState'ten yeniden oluşturulur"""
+    connection = redis_connection()
+    if connection is None or not user_ids:
+        return
+    try:
+        connection.delete(*[_unread_key(user_id) for user_id in user_ids])
+    except Exception as e:
+        logger.warning(f"Okunmamış sayaçlar silinemedi (users {list(user_ids)}): {e}")
@@ -3,15 +3,66 @@ from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib.auth import get_user_model
-from django.db.models import Q, Max, OuterRef, Subquery
+from django.db import transaction
+from django.db.models import Max, Prefetch
 from django.http import JsonResponse
-from django.utils import timezone
 import json
-from .models import ChatRoom, Message, ChatRoomDeletion, MessageAttachment
+from .models import ChatRoom, Message, MessageAttachment
 from .utils import can_message_user
+from apps.profiles.search import search_users
 
 User = get_user_model()
 
+
+def get_chat_list_data(user):
+    """
+    Sohbet listesi (sol panel) verisi. Son mesaj ve okunmamış sayısı odada ve kullanıcının
+    oda durumunda tutulur; liste tek sorgu + katılımcıların toplu yüklenmesiyle oluşur.
+    """
+    chat_rooms = ChatRoom.with_last_message_time(
+        ChatRoom.get_active_rooms_for_user(user)
+    ).prefetch_related(
+        Prefetch(
+            'participants',
+            queryset=User.objects.exclude(id=user.id).select_related('profile'),
+            to_attr='other_participants'
+        )
+    )
+
+    chat_data = []
+    for room in chat_rooms:
+        # Get the other participant
+        other_user = room.other_participants[0] if room.other_participants else None
+
+        if not other_user:
+            continue
+
+        # Get user avatar URL
+        avatar_url = None
+        if hasattr(other_user, 'profile') and other_user.profile.avatar:
+            avatar_url = other_user.profile.avatar.url
+
+        # Prepare data for template
+        chat_data.append({
+            'id': room.id,
+            'other_user': {
+                'id': other_user.id,
+                'username': other_user.username,
+                'first_name': other_user.first_name,
+                'last_name': other_user.last_name,
+                'full_name': f"{other_user.first_name} {other_user.last_name}".strip() or other_user.username,
+                'avatar': avatar_url,
+            },
+            'last_message': {
+                'text': room.last_message_text if room.last_message_id else None,
+                'timestamp': room.last_message_at,
+                'is_mine': room.last_message_sender_id == user.id if room.last_message_id else False,
+            },
+            'unread_count': room.unread_for_user,
+        })
+    return chat_data
+
+
 class ChatView(LoginRequiredMixin, View):
     """
     Main chat view displaying the chat interface with user's chat rooms
@@ -19,54 +70,8 @@ class ChatView(LoginRequiredMixin, View):
     def get(self, request):
         user = request.user
         
-        # Get the latest message for each chat room using subquery
-        latest_message_subquery = Message.objects.filter(
-            chat_room=OuterRef('pk')
-        ).order_by('-timestamp').values('timestamp')[:1]
-
-        # Get all active chat rooms for the user
-        chat_rooms = ChatRoom.get_active_rooms_for_user(user).annotate(
-            last_message_time=Subquery(latest_message_subquery)
-        ).order_by('-last_message_time')
-        
-        
-        # Process chat rooms to get data for rendering
-        chat_data = []
-        for room in chat_rooms:
-            # Get the other participant
-            other_user = room.participants.exclude(id=user.id).first()
-            
-            if not other_user:
-                continue
-                  # Get the last message
-            last_message = room.get_last_message()
-            
-            # Get unread count for this room
-            unread_count = room.get_unread_count(user)
-            
-            # Get user avatar URL
-            avatar_url = None
-            if hasattr(other_user, 'profile') and other_user.profile.avatar:
-                avatar_url = other_user.profile.avatar.url
-                
-            # Prepare data for template
-            chat_data.append({
-                'id': room.id,
-                'other_user': {
-                    'id': other_user.id,
-                    'username': other_user.username,
-                    'first_name': other_user.first_name,
-                    'last_name': other_user.last_name,
-                    'full_name': f"{other_user.first_name} {other_user.last_name}".strip() or other_user.username,
-                    'avatar': avatar_url,
-                },
-                'last_message': {
-                    'text': last_message.text if last_message else None,
-                    'timestamp': last_message.timestamp if last_message else None,
-                    'is_mine': last_message.sender == user if last_message else False,
-                },
-                'unread_count': unread_count,
-            })
+        # Get all active chat rooms for the user, ordered by their latest message
+        chat_data = get_chat_list_data(user)
 
         return render(request, 'chat/chat.html', {'chat_rooms': chat_data, 'page_title': 'Sohbetlerim'})
 
@@ -111,17 +116,9 @@ class ChatDetailView(LoginRequiredMixin, View):
                     message_status['reason'] = 'no_messages'
                 else:
                     message_status['reason'] = 'other'
-                      # Check for deletion record
-        deletion_record = ChatRoomDeletion.objects.filter(
-            chat_room=chat_room,
-            user=user
-        ).order_by('-deleted_at').first()
-        
+
         # Get messages, filtered by deletion, limited to last 20
-        if deletion_record:
-            messages = chat_room.messages.filter(timestamp__gt=deletion_record.deleted_at).order_by('-timestamp')[:20]
-        else:
-            messages = chat_room.messages.all().order_by('-timestamp')[:20]
+        messages = chat_room.visible_messages(user).order_by('-timestamp')[:20]
         
         # Convert to list and reverse to get chronological order (oldest first)
         messages = list(messages)
@@ -143,48 +140,8 @@ class ChatDetailView(LoginRequiredMixin, View):
             'university': other_user.profile.university if hasattr(other_user, 'profile') else None,
             'is_verified': other_user.profile.is_verified if hasattr(other_user, 'profile') else None,
         }
-          # Get chat rooms for sidebar just like in the main chat view
-        latest_message_subquery = Message.objects.filter(
-            chat_room=OuterRef('pk')
-        ).order_by('-timestamp').values('timestamp')[:1]
-        
-        # Get all active chat rooms for the user
-        chat_rooms = ChatRoom.get_active_rooms_for_user(user).annotate(
-            last_message_time=Subquery(latest_message_subquery)
-        ).order_by('-last_message_time')
-        
-        # Process chat rooms for sidebar
-        chat_data = []
-        for room in chat_rooms:
-            room_other_user = room.participants.exclude(id=user.id).first()
-            
-            if not room_other_user:
-                continue
-                
-            room_last_message = room.get_last_message()
-            room_unread_count = room.get_unread_count(user)
-            
-            room_avatar_url = None
-            if hasattr(room_other_user, 'profile') and room_other_user.profile.avatar:
-                room_avatar_url = room_other_user.profile.avatar.url
-                
-            chat_data.append({
-                'id': room.id,
-                'other_user': {
-                    'id': room_other_user.id,
-                    'username': room_other_user.username,
-                    'first_name': room_other_user.first_name,
-                    'last_name': room_other_user.last_name,
-                    'full_name': f"{room_other_user.first_name} {room_other_user.last_name}".strip() or room_other_user.username,
-                    'avatar': room_avatar_url,
-                },
-                'last_message': {
-                    'text': room_last_message.text if room_last_message else None,
-                    'timestamp': room_last_message.timestamp if room_last_message else None,
-                    'is_mine': room_last_message.sender == user if room_last_message else False,
-                },
-                'unread_count': room_unread_count,
-            })
+        # Get chat rooms for sidebar just like in the main chat view
+        chat_data = get_chat_list_data(user)
           # Return to chat list view with active chat room and all chat rooms for sidebar
         return render(request, 'chat/chat.html', {
             'active_chat_room': {
@@ -211,17 +168,8 @@ class MessageListView(LoginRequiredMixin, View):
         page_size = int(request.GET.get('page_size', 20))  # Default to 20 messages per page
         before_id = request.GET.get('before_id')  # For pagination, get messages before this ID
         
-        # Check for deletion record first
-        deletion_record = ChatRoomDeletion.objects.filter(
-            chat_room=chat_room,
-            user=user
-        ).order_by('-deleted_at').first()
-        
-        # If we have a deletion record, filter out messages before deletion
-        if deletion_record:
-            messages_query = chat_room.messages.filter(timestamp__gt=deletion_record.deleted_at)
-        else:
-            messages_query = chat_room.messages.all()
+        # Messages deleted by the user (up to the deletion watermark) are filtered out
+        messages_query = chat_room.visible_messages(user)
         
         # For pagination - if we have a before_id, get messages before that ID
         if before_id:
@@ -293,15 +241,8 @@ class ChatDeleteView(LoginRequiredMixin, View):
         user = request.user
         chat_room = get_object_or_404(ChatRoom, id=chat_room_id, participants=user)
         
-        # Mark as deleted for this user
-        chat_room.deleted_by.add(user)
-        
-        # Create or update deletion record with current timestamp
-        ChatRoomDeletion.objects.update_or_create(
-            chat_room=chat_room,
-            user=user,
-            defaults={'deleted_at': timezone.now()}
-        )
+        # Mark as deleted for this user (messages up to now stay hidden for the user)
+        chat_room.clear_for_user(user)
         
         # Check if all participants have deleted the chat
         all_participants = set(chat_room.participants.all().values_list('id', flat=True))
@@ -309,11 +250,8 @@ class ChatDeleteView(LoginRequiredMixin, View):
         
         # If all participants have deleted the chat, delete it permanently
         if all_participants == deleted_by_participants:
-            # First delete all messages to avoid foreign key constraints
-            Message.objects.filter(chat_room=chat_room).delete()
-            
-            # Then delete the chat room itself
-            chat_room.delete()
+            # Delete the messages in batches, then the chat room itself
+            ChatRoom.delete_rooms([chat_room.id])
             
             return JsonResponse({'status': 'Chat permanently deleted'})
         
@@ -326,12 +264,8 @@ class UserSearchView(LoginRequiredMixin, View):
         if not query or len(query) < 2:
             return JsonResponse({'users': []})
             
-        # Get users that match the search query, initially excluding current user
-        users = User.objects.filter(
-            Q(username__icontains=query) | 
-            Q(first_name__icontains=query) | 
-            Q(last_name__icontains=query)
-        ).exclude(id=request.user.id)
+        # Get users that match the search query (ranked, best matches first), excluding current user
+        users = search_users(query, exclude_user=request.user).select_related('profile')[:50]
         
         # Filter out blocked users and apply message privacy settings
         filtered_users = []
@@ -403,24 +337,13 @@ class ChatRoomCreateView(LoginRequiredMixin, View):
                     'privacy_error': True
                 }, status=403)
             
-            # Check if chat room already exists
-            # Find chat rooms where both users are participants
-            chat_rooms = ChatRoom.objects.filter(participants=request.user) \
-                .filter(participants=other_user)
-            
-            if chat_rooms.exists():
-                # Use existing chat room
-                chat_room = chat_rooms.first()
-                
-                # Important: We do NOT remove from deleted_by list here
-                # We also do NOT delete ChatRoomDeletion records
-                # This ensures old messages remain hidden when recreating a chat room
-                # The messages will only become visible when the user sends a new message
-                # This matches the behavior in the React Native app
-            else:
-                # Create new chat room
-                chat_room = ChatRoom.objects.create()
-                chat_room.participants.add(request.user, other_user)
+            # Get the existing chat room or create a new one
+            # Important: We do NOT remove from deleted_by list here
+            # We also do NOT clear the deletion watermark
+            # This ensures old messages remain hidden when recreating a chat room
+            # The messages will only become visible when the user sends a new message
+            # This matches the behavior in the React Native app
+            chat_room, created = ChatRoom.get_or_create_chat_room(request.user, other_user)
                 
             return JsonResponse({
                 'id': chat_room.id,
@@ -443,31 +366,28 @@ def upload_attachments(request):
             # Sohbet odasını kontrol et
             room = ChatRoom.objects.get(id=chat_room_id, participants=request.user)
             
-            # Yeni mesaj oluştur
-            message = Message.objects.create(
-                chat_room=room,
-                sender=request.user,
-                text=message_text,
-                is_read=False
-            )
-            
-            # Dosyaları işle
-            files = []
-            for key, file in request.FILES.items():
-                if key.startswith('image_'):
-                    attachment = MessageAttachment.objects.create(
-                        message=message,
-                        file=file,
-                        file_type=file.content_type
-                    )
-                    files.append({
-                        'id': attachment.id,
-                        'url': attachment.file.url,
-                        'file_type': attachment.file_type
-                    })
-            
-            # Chat room'u aktif olarak işaretle (ilk mesaj gönderildiğinde)
-            room.activate()
+            with transaction.atomic():
+                # Yeni mesaj oluştur; oda son mesaj bilgisiyle aktif olarak işaretlenir (record_message)
+                message = Message.objects.create(
+                    chat_room=room,
+                    sender=request.user,
+                    text=message_text
+                )
+                
+                # Dosyaları işle
+                files = []
+                for key, file in request.FILES.items():
+                    if key.startswith('image_'):
+                        attachment = MessageAttachment.objects.create(
+                            message=message,
+                            file=file,
+                            file_type=file.content_type
+                        )
+                        files.append({
+                            'id': attachment.id,
+                            'url': attachment.file.url,
+                            'file_type': attachment.file_type
+                        })
             
             return JsonResponse({
                 'success': True,
@@ -4,6 +4,7 @@ from django.contrib.contenttypes.models import ContentType
 from django.utils.module_loading import import_string
 
 from apps.comment.models import Comment, CommentImage
+from apps.common.utils.viewer_state import ViewerStateListSerializer, get_viewer_state
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -152,6 +153,19 @@ class RecursiveCommentSerializer(serializers.Serializer):
         return serializer.data
 
 
+class CommentListSerializer(ViewerStateListSerializer):
+    """
+    Yorum listeleri için: üst yorumlarla birlikte doğrudan yanıtların beğeni / yer imi
+    durumları da aynı sorgularla yüklenir.
+    """
+
+    def get_viewer_state_extra_ids(self, objects):
+        reply_ids = Comment.objects.filter(
+            parent_id__in=[obj.pk for obj in objects]
+        ).values_list('pk', flat=True)
+        return {Comment: list(reply_ids)}
+
+
 class CommentSerializer(serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
     replies = RecursiveCommentSerializer(many=True, read_only=True)
@@ -178,6 +192,7 @@ class CommentSerializer(serializers.ModelSerializer):
             'images_upload', 'like_count', 'is_liked', 'bookmark_count', 'is_bookmarked'
         ]
         read_only_fields = ['user', 'created_at', 'updated_at']
+        list_serializer_class = CommentListSerializer
 
     def get_comment_content_type_id(self, obj):
         """Comment modelinin ContentType ID'sini döndürür"""
@@ -191,12 +206,18 @@ class CommentSerializer(serializers.ModelSerializer):
         return obj.get_bookmark_count()
     
     def get_is_liked(self, obj):
+        state = get_viewer_state(self.context, obj, 'liked')
+        if state is not None:
+            return state
         request = self.context.get('request')
         if request and request.user.is_authenticated:
             return obj.is_liked_by(request.user)
         return False
     
     def get_is_bookmarked(self, obj):
+        state = get_viewer_state(self.context, obj, 'bookmarked')
+        if state is not None:
+            return state
         request = self.context.get('request')
         if request and request.user.is_authenticated:
             return obj.is_bookmarked_by(request.user)
@@ -5,6 +5,7 @@ from django.contrib.contenttypes.models import ContentType
 from django.shortcuts import get_object_or_404
 
 from apps.comment.models import Comment
+from apps.profiles.visibility import VisibilityService
 from .serializers import CommentSerializer
 
 
@@ -97,22 +98,17 @@ class CommentViewSet(viewsets.ModelViewSet):
             model_class = content_type.model_class()
             content_object = model_class.objects.get(pk=object_id)
             
-            # Check if the content is from a private profile that the user can't access
-            if hasattr(content_object, 'user') and hasattr(content_object.user, 'profile'):
-                if content_object.user.profile.is_private and content_object.user != request.user:
-                    from apps.profiles.models import Profile
-                    try:
-                        user_profile = Profile.objects.get(user=request.user)
-                        if content_object.user not in [user.user for user in user_profile.following.all()]:
-                            return Response(
-                                {"detail": "You cannot view comments on this content because the user's profile is private."},
-                                status=status.HTTP_403_FORBIDDEN
-                            )
-                    except Profile.DoesNotExist:
-                        return Response(
-                            {"detail": "You cannot view comments on this content because the user's profile is private."},
-                            status=status.HTTP_403_FORBIDDEN
-                        )
+            # Check if the content is from a private profile / blocked user that the user can't access
+            if hasattr(content_object, 'user_id') and not VisibilityService.for_request(request).can_view(content_object.user_id):
+                if hasattr(content_object.user, 'profile') and content_object.user.profile.is_private:
+                    return Response(
+                        {"detail": "You cannot view comments on this content because the user's profile is private."},
+                        status=status.HTTP_403_FORBIDDEN
+                    )
+                return Response(
+                    {"detail": "You cannot view comments on this content due to blocking settings."},
+                    status=status.HTTP_403_FORBIDDEN
+                )
             
             # Get only parent comments (top-level), we'll get replies through serializer
             comments = Comment.objects.filter(
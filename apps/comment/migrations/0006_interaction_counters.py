@@ -0,0 +1,56 @@
+# Generated by Django 5.2.1 on 2026-10-18 16:45
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_counters(apps, schema_editor):
+    """Mevcut beğeni / yorum / yer imi sayılarını sayaç alanlarına tek UPDATE ile yaz"""
+    ContentType = apps.get_model('contenttypes', 'ContentType')
+    Comment = apps.get_model('comment', 'Comment')
+
+    try:
+        content_type = ContentType.objects.get(app_label='comment', model='comment')
+    except ContentType.DoesNotExist:
+        return  # Yeni kurulum - sayılacak kayıt yok
+
+    sources = {
+        'like_count': ('like', 'Like', {}),
+        'bookmark_count': ('bookmark', 'Bookmark', {}),
+    }
+    updates = {}
+    for field, (app_label, model_name, extra) in sources.items():
+        source = apps.get_model(app_label, model_name)
+        counts = source.objects.filter(
+            content_type=content_type,
+            object_id=OuterRef('pk'),
+            **extra
+        ).order_by().values('object_id').annotate(total=Count('pk')).values('total')
+        updates[field] = Coalesce(Subquery(counts), Value(0))
+
+    Comment.objects.update(**updates)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('comment', '0005_commentimage_created_at_commentimage_file_size_and_more'),
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('like', '0003_remove_like_like_like_user_id_c1c775_idx_and_more'),
+        ('bookmark', '0007_remove_bookmark_bookmark_bo_user_id_096f45_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='bookmark_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Yer İmi Sayısı'),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='like_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Beğeni Sayısı'),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import models, transaction
 from django.conf import settings
 from django.contrib.contenttypes.fields import GenericForeignKey
 from django.contrib.contenttypes.models import ContentType
@@ -7,12 +7,13 @@ from datetime import datetime
 import os
 from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
-from django.core.files.storage import default_storage
 from apps.notifications.services import NotificationService
 from django.urls import reverse
 from django.contrib.contenttypes.fields import GenericRelation
 from apps.like.models import Like
 from apps.bookmark.models import Bookmark
+from apps.common.utils.counters import adjust_counter
+from apps.common.image_jobs import enqueue_image_job, image_job_handler
 
 def comment_image_upload_path(instance, filename):
     """Upload path for comment images organized by date and comment ID"""
@@ -46,6 +47,10 @@ class Comment(models.Model):
     is_active = models.BooleanField(default=True)
     likes = GenericRelation(Like)
     bookmarks = GenericRelation(Bookmark)
+    
+    # Denormalize sayaçlar (Like / Bookmark oluşturma ve silme yollarında güncellenir)
+    like_count = models.PositiveIntegerField(default=0, verbose_name="Beğeni Sayısı")
+    bookmark_count = models.PositiveIntegerField(default=0, verbose_name="Yer İmi Sayısı")
 
     class Meta:
         ordering = ['-created_at']
@@ -57,6 +62,19 @@ class Comment(models.Model):
         # return f"Comment by {self.user.username} on {self.content_object}"
         return f"Yorum: {self.body[:60]}"
         
+    def save(self, *args, **kwargs):
+        """Aktif yorum sayısı değiştiğinde içeriğin yorum sayacını aynı transaction içinde güncelle"""
+        if self.pk is None:
+            was_active = False
+        else:
+            was_active = Comment.objects.filter(pk=self.pk).values_list('is_active', flat=True).first()
+            was_active = bool(was_active)
+        
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if was_active != self.is_active:
+                adjust_counter(self.content_type_id, self.object_id, 'comment_count', 1 if self.is_active else -1)
+        
     def delete(self, *args, **kwargs):
         self.likes.all().delete()  # İlişkili beğenileri sil
         self.bookmarks.all().delete()  # İlişkili yer imlerini sil
@@ -76,9 +94,7 @@ class Comment(models.Model):
 
     def get_like_count(self):
         """Returns the number of likes this post has"""
-        from apps.like.models import Like
-        content_type = ContentType.objects.get_for_model(self)
-        return Like.objects.filter(content_type=content_type, object_id=self.pk).count()
+        return self.like_count
     
     def is_liked_by(self, user):
         """Checks if this post is liked by the given user"""
@@ -91,9 +107,7 @@ class Comment(models.Model):
 
     def get_bookmark_count(self):
         """Returns the number of bookmarks this post has"""
-        from apps.bookmark.models import Bookmark
-        content_type = ContentType.objects.get_for_model(self)
-        return Bookmark.objects.filter(content_type=content_type, object_id=self.pk).count()
+        return self.bookmark_count
 
     def is_bookmarked_by(self, user):
         """Checks if this post is bookmarked by the given user"""
@@ -175,70 +189,66 @@ class CommentImage(models.Model):
 
 @receiver(post_delete, sender=CommentImage)
 def delete_comment_image_files(sender, instance, **kwargs):
-    """Comment resmi silindiğinde tüm boyutları sil"""
-    for field_name in ['image', 'thumbnail', 'small']:
-        field = getattr(instance, field_name)
-        if field and default_storage.exists(field.name):
-            default_storage.delete(field.name)
+    """Comment resmi silindiğinde tüm boyutları sil (paylaşılan boyutlar son referansta silinir)"""
+    from apps.common.rendition_store import release_files
+
+    release_files(
+        getattr(instance, field_name).name
+        for field_name in ['image', 'thumbnail', 'small']
+    )
+
+
+@image_job_handler(CommentImage)
+def process_comment_image_renditions(instance):
+    """
+    Comment resminin boyutlarını oluştur (process_image_jobs worker'ı tarafından çalıştırılır)
+    """
+    if instance.processed or not instance.image:
+        return
+
+    from apps.common.rendition_store import get_renditions
+    from apps.common.utils.image_processor import ImageProcessor
+    from PIL import Image
+
+    processor = ImageProcessor()
+
+    # Image bilgilerini kaydet
+    with Image.open(instance.image.path) as img:
+        instance.original_width = img.width
+        instance.original_height = img.height
+        instance.file_size = instance.image.size
+        instance.format = 'WEBP' if processor.webp_supported else 'JPEG'
+
+    # Aynı resim daha önce yüklendiyse boyutları depodan paylaşılır, işlenmez
+    [(image_hash, saved_files)] = get_renditions(
+        [instance.image],
+        size_presets=['thumbnail', 'small'],
+        context='comment'
+    )
+    if not saved_files:
+        raise ValueError(f"Comment image {instance.pk} could not be processed")
+    instance.hash = image_hash
+
+    # Update model fields
+    if 'thumbnail' in saved_files:
+        instance.thumbnail.name = saved_files['thumbnail']
+    if 'small' in saved_files:
+        instance.small.name = saved_files['small']
+
+    instance.processed = True
+    instance.save(update_fields=[
+        'thumbnail', 'small', 'processed',
+        'original_width', 'original_height', 'file_size', 'format', 'hash'
+    ])
 
 
 @receiver(post_save, sender=CommentImage)
 def process_comment_image(sender, instance, created, **kwargs):
     """
-    Comment resmi kaydedildiğinde otomatik olarak işle
+    Comment resmi kaydedildiğinde işleme kuyruğuna ekle
     """
     if created and not instance.processed:
-        try:
-            from apps.common.utils.image_processor import ImageProcessor
-            from PIL import Image
-            
-            # Original image'ı aç
-            if instance.image:
-                processor = ImageProcessor()
-                
-                # Image bilgilerini kaydet
-                with Image.open(instance.image.path) as img:
-                    instance.original_width = img.width
-                    instance.original_height = img.height
-                    instance.file_size = instance.image.size
-                    instance.format = 'WEBP' if processor.webp_supported else 'JPEG'
-                
-                # Process image (comment için küçük boyutlar)
-                processed_images = processor.process_image(
-                    instance.image,
-                    size_presets=['thumbnail', 'small'],
-                    context='comment'
-                )
-                
-                # Save processed images to model fields - same date-based path as original
-                from datetime import datetime
-                now = datetime.now()
-                # Create same path structure as original: comments/2025/07/15/100/
-                date_path = f'comments/{now.year}/{now.month:02d}/{now.day:02d}/{instance.comment.pk}/'
-                
-                saved_files = processor.save_processed_images(
-                    processed_images,
-                    instance.image.name,
-                    date_path
-                )
-                
-                # Update model fields
-                if 'thumbnail' in saved_files:
-                    instance.thumbnail.name = saved_files['thumbnail']
-                if 'small' in saved_files:
-                    instance.small.name = saved_files['small']
-                
-                instance.processed = True
-                instance.save(update_fields=[
-                    'thumbnail', 'small', 'processed',
-                    'original_width', 'original_height', 'file_size', 'format'
-                ])
-                
-        except Exception as e:
-            import logging
-            logger = logging.getLogger(__name__)
-            logger.error(f"Comment image processing failed: {e}")
-            # İşleme başarısız olursa orijinal resmi kullan
+        enqueue_image_job(instance)
 
 @receiver(post_delete, sender=Comment)
 def delete_comment_notification(sender, instance, **kwargs):
@@ -246,4 +256,13 @@ def delete_comment_notification(sender, instance, **kwargs):
     Signal handler to delete notification when a comment is deleted
     """
     # Yorumla ilgili bildirimleri NotificationService aracılığıyla sil
-    NotificationService.delete_notification_by_object(instance)
\ No newline at end of file
+    NotificationService.delete_notification_by_object(instance)
+
+
+@receiver(post_delete, sender=Comment)
+def decrement_comment_count(sender, instance, **kwargs):
+    """
+    Aktif yorum silindiğinde içeriğin yorum sayacını azalt (silme transaction'ı içinde çalışır)
+    """
+    if instance.is_active:
+        adjust_counter(instance.content_type_id, instance.object_id, 'comment_count', -1)
\ No newline at end of file
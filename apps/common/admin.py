@@ -1,3 +1,18 @@
 from django.contrib import admin
+from .models import ImageProcessingJob, ImageRendition
 
-# Register your models here.
+
+@admin.register(ImageProcessingJob)
+class ImageProcessingJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'content_type', 'object_id', 'status', 'attempts', 'available_at', 'updated_at')
+    list_filter = ('status', 'content_type')
+    search_fields = ('last_error',)
+    readonly_fields = ('created_at', 'updated_at')
+
+
+@admin.register(ImageRendition)
+class ImageRenditionAdmin(admin.ModelAdmin):
+    list_display = ('id', 'hash', 'preset', 'width', 'height', 'file_size', 'ref_count', 'created_at')
+    list_filter = ('preset',)
+    search_fields = ('hash', 'path')
+    readonly_fields = ('created_at',)
@@ -0,0 +1,141 @@
+"""
+Arka plan resim işleme kuyruğu.
+
+post_save receiver'ları resmi istek içinde işlemek yerine `enqueue_image_job` ile
+veritabanına bir görev yazar; istemci orijinal resmi hemen alır, boyutlandırılmış
+versiyonlar worker (`python manage.py process_image_jobs`) işledikten sonra gelir.
+
+Her model için işleme fonksiyonu kendi models.py dosyasında `image_job_handler`
+dekoratörüyle kaydedilir. Başarısız görevler artan bekleme süresiyle tekrar denenir.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+IMAGE_JOB_MAX_ATTEMPTS = getattr(settings, 'IMAGE_JOB_MAX_ATTEMPTS', 3)
+IMAGE_JOB_RETRY_DELAY = 30  # saniye, her denemede katlanır
+IMAGE_JOB_LOCK_TIMEOUT = 600  # 10 dakika sonra kilitli kalan görev tekrar alınır
+
+_handlers = {}
+
+
+def image_job_handler(model_class):
+    """Model için resim işleme fonksiyonunu kaydeder"""
+    def decorator(func):
+        _handlers[model_class._meta.label_lower] = func
+        return func
+    return decorator
+
+
+def get_handler(model_class):
+    return _handlers.get(model_class._meta.label_lower)
+
+
+def enqueue_image_job(instance):
+    """
+    Nesne için bekleyen bir işleme görevi oluşturur (zaten varsa tekrar oluşturmaz).
+    IMAGE_PROCESSING_ASYNC kapalıysa işleme commit sonrası aynı süreçte yapılır.
+    """
+    from apps.common.models import ImageProcessingJob
+
+    if not getattr(settings, 'IMAGE_PROCESSING_ASYNC', True):
+        model_class, pk = type(instance), instance.pk
+        transaction.on_commit(lambda: run_handler(model_class, pk))
+        return None
+
+    content_type = ContentType.objects.get_for_model(instance)
+    job, created = ImageProcessingJob.objects.get_or_create(
+        content_type=content_type,
+        object_id=instance.pk,
+        status=ImageProcessingJob.STATUS_PENDING,
+    )
+    return job
+
+
+def run_handler(model_class, pk):
+    """Nesneyi yeniden yükleyip kayıtlı işleme fonksiyonunu çalıştırır"""
+    handler = get_handler(model_class)
+    if handler is None:
+        raise LookupError(f"{model_class._meta.label} için resim işleyici kayıtlı değil")
+
+    instance = model_class.objects.filter(pk=pk).first()
+    if instance is None:
+        # Nesne işlenmeden silinmiş
+        return False
+
+    handler(instance)
+    return True
+
+
+def claim_jobs(limit=10):
+    """
+    İşlenmeye hazır görevleri kilitleyip 'processing' durumuna alır.
+    PostgreSQL'de SKIP LOCKED sayesinde birden fazla worker aynı görevi almaz.
+    """
+    from apps.common.models import ImageProcessingJob
+
+    now = timezone.now()
+    stale = now - timedelta(seconds=IMAGE_JOB_LOCK_TIMEOUT)
+
+    with transaction.atomic():
+        ready = ImageProcessingJob.objects.select_for_update(skip_locked=True, of=('self',)).filter(
+            Q(status=ImageProcessingJob.STATUS_PENDING, available_at__lte=now) |
+            Q(status=ImageProcessingJob.STATUS_PROCESSING, locked_at__lt=stale)
+        ).select_related('content_type')
+        jobs = list(ready.order_by('available_at', 'id')[:limit])
+        if jobs:
+            ImageProcessingJob.objects.filter(pk__in=[job.pk for job in jobs]).update(
+                status=ImageProcessingJob.STATUS_PROCESSING,
+                locked_at=now,
+            )
+    return jobs
+
+
+def process_job(job):
+    """Tek bir görevi çalıştırır; hata durumunda tekrar denemeye alır"""
+    from apps.common.models import ImageProcessingJob
+
+    job.attempts += 1
+    try:
+        run_handler(job.content_type.model_class(), job.object_id)
+    except Exception as e:
+        logger.exception(f"Resim işleme görevi başarısız ({job}): {e}")
+        job.last_error = str(e)
+        if job.attempts >= IMAGE_JOB_MAX_ATTEMPTS:
+            job.status = ImageProcessingJob.STATUS_FAILED
+        else:
+            job.status = ImageProcessingJob.STATUS_PENDING
+            job.available_at = timezone.now() + timedelta(
+                seconds=IMAGE_JOB_RETRY_DELAY * 2 ** (job.attempts - 1)
+            )
+        job.locked_at = None
+        job.save(update_fields=['attempts', 'last_error', 'status', 'available_at', 'locked_at', 'updated_at'])
+        return False
+
+    job.status = ImageProcessingJob.STATUS_DONE
+    job.locked_at = None
+    job.save(update_fields=['attempts', 'status', 'locked_at', 'updated_at'])
+    return True
+
+
+def run_pending_jobs(limit=10):
+    """
+    Bekleyen görevlerden bir parti işler.
+
+    Returns:
+        tuple: (başarılı, başarısız) görev sayıları
+    """
+    succeeded = failed = 0
+    for job in claim_jobs(limit):
+        if process_job(job):
+            succeeded += 1
+        else:
+            failed += 1
+    return succeeded, failed
@@ -0,0 +1,68 @@
+"""
+Arka plan resim işleme worker'ı
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from apps.common.image_jobs import run_pending_jobs
+from apps.common.models import ImageProcessingJob
+
+
+class Command(BaseCommand):
+    help = 'Kuyruktaki resim işleme görevlerini (post, yorum, itiraf, avatar) işler'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Bekleyen görevleri bir kez işle ve çık (cron için)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=10,
+            help='Her turda alınacak görev sayısı (varsayılan: 10)',
+        )
+        parser.add_argument(
+            '--sleep',
+            type=float,
+            default=1.0,
+            help='Kuyruk boşken bekleme süresi, saniye (varsayılan: 1)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Sadece kuyruk durumunu göster, işleme yapma',
+        )
+
+    def handle(self, *args, **options):
+        if options['dry_run']:
+            for status, label in ImageProcessingJob.STATUS_CHOICES:
+                count = ImageProcessingJob.objects.filter(status=status).count()
+                self.stdout.write(f"{label}: {count}")
+            return
+
+        batch_size = options['batch_size']
+        self.stdout.write("Resim işleme worker'ı başladı")
+
+        try:
+            while True:
+                close_old_connections()
+                succeeded, failed = run_pending_jobs(batch_size)
+
+                if succeeded or failed:
+                    self.stdout.write(
+                        self.style.SUCCESS(f"✅ {succeeded} görev işlendi") +
+                        (self.style.ERROR(f", ❌ {failed} görev başarısız") if failed else '')
+                    )
+
+                if options['once']:
+                    if succeeded + failed < batch_size:
+                        break
+                    continue
+
+                if not succeeded and not failed:
+                    time.sleep(options['sleep'])
+        except KeyboardInterrupt:
+            self.stdout.write("Worker durduruldu")
@@ -0,0 +1,57 @@
+"""
+Denormalize beğeni / yorum / yer imi sayaçlarını yeniden hesaplama komutu
+"""
+from django.core.management.base import BaseCommand
+from apps.common.utils.counters import counter_fields, find_drifted, repair_counters
+from apps.post.models import Post
+from apps.confession.models import ConfessionModel
+from apps.comment.models import Comment
+
+
+class Command(BaseCommand):
+    help = 'Post, itiraf ve yorum sayaçlarını gerçek değerlerle karşılaştırır ve sapmaları toplu olarak düzeltir'
+
+    MODELS = {
+        'post': Post,
+        'confession': ConfessionModel,
+        'comment': Comment,
+    }
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Sadece sapmış kayıtları say, düzeltme yapma',
+        )
+        parser.add_argument(
+            '--model',
+            choices=list(self.MODELS.keys()),
+            help='Sadece belirtilen modeli kontrol et (varsayılan: hepsi)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Toplu güncelleme boyutu (varsayılan: 1000)',
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        batch_size = options['batch_size']
+
+        models = self.MODELS
+        if options['model']:
+            models = {options['model']: self.MODELS[options['model']]}
+
+        for name, model_class in models.items():
+            fields = ', '.join(counter_fields(model_class))
+
+            if dry_run:
+                drifted = find_drifted(model_class.objects.all()).count()
+                self.stdout.write(f"{name}: {drifted} kayıtta sapma var ({fields})")
+                continue
+
+            repaired = repair_counters(model_class, batch_size=batch_size)
+            self.stdout.write(
+                self.style.SUCCESS(f"✅ {name}: {repaired} kaydın sayaçları düzeltildi ({fields})")
+            )
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.1 on 2026-10-18 16:55
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImageProcessingJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('object_id', models.PositiveIntegerField(verbose_name='Nesne ID')),
+                ('status', models.CharField(choices=[('pending', 'Bekliyor'), ('processing', 'İşleniyor'), ('done', 'Tamamlandı'), ('failed', 'Başarısız')], default='pending', max_length=20, verbose_name='Durum')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='Deneme Sayısı')),
+                ('last_error', models.TextField(blank=True, default='', verbose_name='Son Hata')),
+                ('available_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='İşlenebilir Olduğu Zaman')),
+                ('locked_at', models.DateTimeField(blank=True, null=True, verbose_name='Kilitlenme Zamanı')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Oluşturulma Tarihi')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Güncellenme Tarihi')),
+                ('content_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='contenttypes.contenttype', verbose_name='İçerik Türü')),
+            ],
+            options={
+                'verbose_name': 'Resim İşleme Görevi',
+                'verbose_name_plural': 'Resim İşleme Görevleri',
+                'ordering': ['available_at', 'id'],
+                'indexes': [models.Index(fields=['status', 'available_at'], name='common_imag_status_fd8479_idx'), models.Index(fields=['content_type', 'object_id'], name='common_imag_content_fb5340_idx')],
+            },
+        ),
+    ]
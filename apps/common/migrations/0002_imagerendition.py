@@ -0,0 +1,32 @@
+# Generated by Django 5.2.1 on 2026-10-18 17:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('common', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImageRendition',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hash', models.CharField(max_length=32, verbose_name="Orijinal Resim Hash'i")),
+                ('preset', models.CharField(max_length=20, verbose_name='Boyut')),
+                ('path', models.CharField(max_length=255, unique=True, verbose_name='Dosya Yolu')),
+                ('width', models.PositiveIntegerField(default=0, verbose_name='Genişlik')),
+                ('height', models.PositiveIntegerField(default=0, verbose_name='Yükseklik')),
+                ('file_size', models.PositiveIntegerField(default=0, verbose_name='Dosya Boyutu')),
+                ('ref_count', models.PositiveIntegerField(default=0, verbose_name='Referans Sayısı')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Oluşturulma Tarihi')),
+            ],
+            options={
+                'verbose_name': 'İşlenmiş Resim Boyutu',
+                'verbose_name_plural': 'İşlenmiş Resim Boyutları',
+                'constraints': [models.UniqueConstraint(fields=('hash', 'preset'), name='unique_image_rendition')],
+            },
+        ),
+    ]
@@ -1,3 +1,82 @@
+from django.conf import settings
 from django.db import models
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.contrib.contenttypes.fields import GenericForeignKey
+from django.contrib.contenttypes.models import ContentType
+from django.utils import timezone
 
-# Create your models here.
+
+class ImageProcessingJob(models.Model):
+    """
+    Resim işleme kuyruğu (PostImage, CommentImage, ConfessionImage, Profile avatarı).
+    İstek içinde sadece kayıt oluşturulur; işleme `process_image_jobs` worker'ı tarafından yapılır.
+    """
+    STATUS_PENDING = 'pending'
+    STATUS_PROCESSING = 'processing'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Bekliyor'),
+        (STATUS_PROCESSING, 'İşleniyor'),
+        (STATUS_DONE, 'Tamamlandı'),
+        (STATUS_FAILED, 'Başarısız'),
+    ]
+
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE, verbose_name="İçerik Türü")
+    object_id = models.PositiveIntegerField(verbose_name="Nesne ID")
+    content_object = GenericForeignKey('content_type', 'object_id')
+
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING, verbose_name="Durum")
+    attempts = models.PositiveSmallIntegerField(default=0, verbose_name="Deneme Sayısı")
+    last_error = models.TextField(blank=True, default='', verbose_name="Son Hata")
+    available_at = models.DateTimeField(default=timezone.now, verbose_name="İşlenebilir Olduğu Zaman")
+    locked_at = models.DateTimeField(null=True, blank=True, verbose_name="Kilitlenme Zamanı")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Oluşturulma Tarihi")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Güncellenme Tarihi")
+
+    class Meta:
+        verbose_name = "Resim İşleme Görevi"
+        verbose_name_plural = "Resim İşleme Görevleri"
+        ordering = ['available_at', 'id']
+        indexes = [
+            models.Index(fields=['status', 'available_at']),  # Worker'ın bekleyen görevleri bulması için
+            models.Index(fields=['content_type', 'object_id']),
+        ]
+
+    def __str__(self):
+        return f"{self.content_type.model} #{self.object_id} ({self.get_status_display()})"
+
+
+class ImageRendition(models.Model):
+    """
+    İçerik adresli işlenmiş resim boyutu (hash + preset başına tek dosya).
+    Aynı resim tekrar yüklendiğinde dosya yeniden üretilmez, ref_count artırılır;
+    dosya son referans bırakıldığında silinir.
+    """
+    hash = models.CharField(max_length=32, verbose_name="Orijinal Resim Hash'i")
+    preset = models.CharField(max_length=20, verbose_name="Boyut")
+    path = models.CharField(max_length=255, unique=True, verbose_name="Dosya Yolu")
+    width = models.PositiveIntegerField(default=0, verbose_name="Genişlik")
+    height = models.PositiveIntegerField(default=0, verbose_name="Yükseklik")
+    file_size = models.PositiveIntegerField(default=0, verbose_name="Dosya Boyutu")
+    ref_count = models.PositiveIntegerField(default=0, verbose_name="Referans Sayısı")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Oluşturulma Tarihi")
+
+    class Meta:
+        verbose_name = "İşlenmiş Resim Boyutu"
+        verbose_name_plural = "İşlenmiş Resim Boyutları"
+        constraints = [
+            models.UniqueConstraint(fields=['hash', 'preset'], name='unique_image_rendition'),
+        ]
+
+    def __str__(self):
+        return f"{self.hash[:12]} {self.preset} ({self.ref_count})"
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def invalidate_websocket_user_cache(sender, instance, **kwargs):
+    """Kullanıcı değiştiğinde (ör. pasifleştirildiğinde) WebSocket kimlik cache'ini temizle"""
+    from apps.common.websocket_auth import invalidate_websocket_user
+    invalidate_websocket_user(instance.pk)
@@ -0,0 +1,126 @@
+"""
+Sonsuz kaydırma (infinite scroll) listeleri için isteğe bağlı keyset (cursor) sayfalama.
+
+Varsayılan davranış PageNumberPagination ile aynıdır. İstemci `?pagination=cursor`
+veya `?cursor=<token>` gönderdiğinde sayfalama (created_at, id) gibi bir anahtar çifti
+üzerinden yapılır:
+- OFFSET kullanılmaz, her sayfa indeksli bir aralık sorgusudur
+- COUNT(*) çalıştırılmaz
+- Araya yeni kayıt eklense bile sayfalar kaymaz (id eşitlik bozucudur)
+"""
+import base64
+import binascii
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    (zaman, id) anahtarına göre azalan sırada ileri yönlü keyset sayfalama.
+    """
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Geçersiz cursor.'
+
+    def __init__(self, ordering=('created_at', 'id'), page_size=20):
+        self.ordering = ordering
+        self.page_size = page_size
+
+    def encode_cursor(self, instance):
+        time_field, id_field = self.ordering
+        raw = f"{getattr(instance, time_field).isoformat()}|{getattr(instance, id_field)}"
+        return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+    def decode_cursor(self, token):
+        try:
+            raw = base64.urlsafe_b64decode(token.encode('ascii')).decode('utf-8')
+            timestamp, pk = raw.rsplit('|', 1)
+            position = parse_datetime(timestamp)
+            if position is None:
+                raise ValueError
+            return position, int(pk)
+        except (TypeError, ValueError, UnicodeError, binascii.Error):
+            raise NotFound(self.invalid_cursor_message)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        time_field, id_field = self.ordering
+
+        queryset = queryset.order_by(f'-{time_field}', f'-{id_field}')
+
+        token = request.query_params.get(self.cursor_query_param)
+        if token:
+            position, pk = self.decode_cursor(token)
+            queryset = queryset.filter(
+                Q(**{f'{time_field}__lt': position}) |
+                Q(**{time_field: position, f'{id_field}__lt': pk})
+            )
+
+        # Bir fazla kayıt çekilerek sonraki sayfanın varlığı COUNT olmadan anlaşılır
+        results = list(queryset[:self.page_size + 1])
+        self.has_next = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        return self.page
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, 'page')
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.page[-1]))
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': None,
+            'results': data,
+        })
+
+
+class OptInCursorPagination(PageNumberPagination):
+    """
+    Sayfa numaralı sayfalama + isteğe bağlı keyset modu.
+
+    Keyset modu yalnızca queryset zaten anahtar alanına göre (azalan) sıralıysa
+    kullanılır; farklı sıralanmış listeler (ör. trend) sayfa numarasıyla devam eder.
+    """
+    cursor_ordering = ('created_at', 'id')
+    mode_query_param = 'pagination'
+    cursor_query_param = 'cursor'
+    cursor_class = KeysetPagination
+
+    def use_cursor(self, queryset, request):
+        params = request.query_params
+        if params.get(self.mode_query_param) != 'cursor' and self.cursor_query_param not in params:
+            return False
+        ordering = list(queryset.query.order_by) or list(queryset.model._meta.ordering)
+        return bool(ordering) and ordering[0] == f'-{self.cursor_ordering[0]}'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        if self.use_cursor(queryset, request):
+            self.keyset = self.cursor_class(
+                ordering=self.cursor_ordering,
+                page_size=self.get_page_size(request) or self.page_size,
+            )
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def get_next_link(self):
+        if self.keyset is not None:
+            return self.keyset.get_next_link()
+        return super().get_next_link()
+
+    def get_previous_link(self):
+        if self.keyset is not None:
+            return None
+        return super().get_previous_link()
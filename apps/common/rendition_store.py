@@ -0,0 +1,191 @@
+"""
+İçerik adresli resim boyutu deposu.
+
+İşlenmiş boyutlar orijinal yüklemenin MD5 hash'i ve preset adıyla saklanır
+(`renditions/ab/abcdef..._thumbnail.webp`). Aynı resim tekrar yüklendiğinde
+(repost, iletilen resim) decode/encode yapılmaz; mevcut dosyalar `ImageRendition`
+kayıtlarının ref_count'u artırılarak paylaşılır. Silme receiver'ları dosyaları
+`release_files` ile bırakır; paylaşılan dosya son referansla birlikte silinir.
+
+Orijinal yükleme her nesnede ayrı kalır, sadece üretilen boyutlar paylaşılır.
+"""
+import hashlib
+import logging
+from io import BytesIO
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import F
+
+logger = logging.getLogger(__name__)
+
+RENDITION_UPLOAD_PATH = 'renditions/'
+
+
+def hash_image_data(data: bytes) -> str:
+    """Orijinal yüklemenin hash'i (ImageProcessor ile aynı MD5)"""
+    return hashlib.md5(data).hexdigest()
+
+
+def rendition_path(image_hash: str, preset: str, extension: str) -> str:
+    return f"{RENDITION_UPLOAD_PATH}{image_hash[:2]}/{image_hash}_{preset}{extension}"
+
+
+def acquire_renditions(image_hash: str, size_presets: List[str]) -> Optional[Dict[str, str]]:
+    """
+    Tüm presetler depoda varsa referanslarını artırıp yollarını döndürür.
+    Eksik preset ya da kayıp dosya varsa hiçbir referans alınmaz ve None döner.
+    """
+    from apps.common.models import ImageRendition
+
+    renditions = {
+        rendition.preset: rendition
+        for rendition in ImageRendition.objects.filter(hash=image_hash, preset__in=size_presets)
+    }
+    if len(renditions) != len(set(size_presets)):
+        return None
+    if not all(default_storage.exists(rendition.path) for rendition in renditions.values()):
+        return None
+
+    with transaction.atomic():
+        # ref_count 0 olan kayıt o anda silinmek üzere; ona referans eklenmez
+        acquired = ImageRendition.objects.filter(
+            pk__in=[rendition.pk for rendition in renditions.values()],
+            ref_count__gt=0,
+        ).update(ref_count=F('ref_count') + 1)
+        if acquired != len(renditions):
+            transaction.set_rollback(True)
+            return None
+
+    return {preset: renditions[preset].path for preset in size_presets}
+
+
+def store_renditions(image_hash: str, processed_images: Dict[str, Dict]) -> Dict[str, str]:
+    """
+    process_image sonuçlarını içerik adresli yollara kaydeder ve birer referans alır.
+    Aynı boyut bu arada başka bir worker tarafından kaydedildiyse onun dosyası kullanılır.
+
+    Returns:
+        Dict: Her preset için dosya yolu
+    """
+    from apps.common.models import ImageRendition
+
+    saved_files = {}
+    for preset, image_data in processed_images.items():
+        try:
+            saved_path = default_storage.save(
+                rendition_path(image_hash, preset, image_data['extension']),
+                ContentFile(image_data['image_data'].getvalue())
+            )
+        except Exception as e:
+            logger.error(f"Resim kaydetme hatası ({preset}): {e}")
+            continue
+
+        width, height = image_data['size']
+        defaults = {
+            'path': saved_path,
+            'width': width,
+            'height': height,
+            'file_size': image_data['file_size'],
+            'ref_count': 1,
+        }
+        rendition, created = ImageRendition.objects.get_or_create(
+            hash=image_hash, preset=preset, defaults=defaults
+        )
+        if not created:
+            shared = ImageRendition.objects.filter(pk=rendition.pk, ref_count__gt=0).update(
+                ref_count=F('ref_count') + 1
+            )
+            # Kayıp dosya aynı içerik adresli isimle yeniden yazılmış olur (yollar eşit);
+            # aksi halde bu yüklemenin kopyası silinip paylaşılan dosya kullanılır.
+            # Kayıt son referansıyla siliniyorsa bu dosya depoya girmeden kalır.
+            if shared and saved_path != rendition.path:
+                default_storage.delete(saved_path)
+                saved_path = rendition.path
+
+        saved_files[preset] = saved_path
+        logger.info(f"Resim kaydedildi: {saved_path}")
+
+    return saved_files
+
+
+def release_files(paths: Iterable[str]) -> None:
+    """
+    Dosya referanslarını bırakır. Depodaki paylaşılan boyutlar son referansta,
+    depoya ait olmayan dosyalar (orijinaller, eski işlenmiş boyutlar) hemen silinir.
+    """
+    from django.db.models.functions import Greatest
+    from apps.common.models import ImageRendition
+
+    paths = [path for path in paths if path]
+    if not paths:
+        return
+
+    shared = dict(ImageRendition.objects.filter(path__in=paths).values_list('path', 'pk'))
+    for path in paths:
+        pk = shared.get(path)
+        if pk is not None:
+            ImageRendition.objects.filter(pk=pk).update(ref_count=Greatest(F('ref_count') - 1, 0))
+            deleted, _ = ImageRendition.objects.filter(pk=pk, ref_count=0).delete()
+            if not deleted:
+                continue
+        if default_storage.exists(path):
+            default_storage.delete(path)
+
+
+def get_renditions(image_files: List, size_presets: List[str],
+                   context: str = 'general') -> List[Tuple[str, Dict[str, str]]]:
+    """
+    Resimlerin boyutlarını depodan alır; depoda olmayanları işleyip kaydeder.
+    Daha önce yüklenmiş bir resim için decode/encode yapılmaz.
+
+    Returns:
+        list: Giriş sırasıyla (hash, {preset: dosya yolu}) çiftleri.
+        İşlenemeyen resim için yol sözlüğü boştur.
+    """
+    from apps.common.utils.image_processor import ImageProcessor, process_images_parallel
+
+    results = []
+    missing = []
+    for index, image_file in enumerate(image_files):
+        image_file.seek(0)
+        data = image_file.read()
+        image_file.seek(0)
+
+        image_hash = hash_image_data(data)
+        saved_files = acquire_renditions(image_hash, size_presets)
+        if saved_files is None:
+            missing.append((index, data, getattr(image_file, 'name', None) or f'image_{index}'))
+            saved_files = {}
+        else:
+            logger.info(f"Resim boyutları depodan paylaşıldı: {image_hash}")
+        results.append((image_hash, saved_files))
+
+    if not missing:
+        return results
+
+    if len(missing) == 1:
+        # Tek resim: süreç havuzu yerine aynı süreçte kademeli işleme
+        index, data, name = missing[0]
+        image_file = BytesIO(data)
+        image_file.name = name
+        try:
+            processed_list = [ImageProcessor().process_image(image_file, size_presets=size_presets, context=context)]
+        except ValueError as e:
+            logger.error(f"Resim işlenemedi ({name}): {e}")
+            processed_list = [{}]
+    else:
+        sources = []
+        for index, data, name in missing:
+            image_file = BytesIO(data)
+            image_file.name = name
+            sources.append(image_file)
+        processed_list = process_images_parallel(sources, size_presets=size_presets, context=context)
+
+    for (index, data, name), processed_images in zip(missing, processed_list):
+        image_hash = results[index][0]
+        results[index] = (image_hash, store_renditions(image_hash, processed_images) if processed_images else {})
+
+    return results
@@ -1,3 +1,164 @@
-from django.test import TestCase
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import AnonymousUser, User
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apps.bookmark.models import Bookmark
+from apps.comment.models import Comment
+from apps.common import websocket_auth
+from apps.common.utils.counters import adjust_counter, find_drifted, repair_counters
+from apps.common.utils.image_processor import _get_parallel_settings
+from apps.like.models import Like
+from apps.notifications.registry import invalidate_notification_types
+from apps.post.models import Post
+
+
+class ParallelSettingsTests(TestCase):
+    @override_settings(IMAGE_PROCESSING_ASYNC=False, IMAGE_PROCESSING_WORKERS=4)
+    def test_sequential_when_processing_in_web_process(self):
+        self.assertEqual(_get_parallel_settings(None, 256), (1, 256))
+
+    @override_settings(IMAGE_PROCESSING_ASYNC=True, IMAGE_PROCESSING_WORKERS=3)
+    def test_worker_uses_configured_pool(self):
+        self.assertEqual(_get_parallel_settings(None, 256), (3, 256))
+
+
+@override_settings(CHANNEL_LAYERS={'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}})
+class CounterTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        invalidate_notification_types()
+        self.owner = User.objects.create_user('sahip')
+        self.users = [User.objects.create_user(name) for name in ('ali', 'ayse')]
+        self.post = Post.objects.create(user=self.owner, content='gönderi')
+        self.post_type = ContentType.objects.get_for_model(Post)
+
+    def target(self, user):
+        return {'user': user, 'content_type': self.post_type, 'object_id': self.post.pk}
+
+    def counts(self):
+        self.post.refresh_from_db()
+        return self.post.like_count, self.post.bookmark_count, self.post.comment_count
+
+    def test_like_and_unlike(self):
+        likes = [Like.objects.create(**self.target(user)) for user in self.users]
+        self.assertEqual(self.counts(), (2, 0, 0))
+
+        likes[0].delete()
+        self.assertEqual(self.counts(), (1, 0, 0))
+
+    def test_bookmark_and_remove(self):
+        bookmark = Bookmark.objects.create(**self.target(self.users[0]))
+        self.assertEqual(self.counts(), (0, 1, 0))
+
+        bookmark.delete()
+        self.assertEqual(self.counts(), (0, 0, 0))
+
+    def test_comment_deactivate_and_delete(self):
+        first = Comment.objects.create(body='bir', **self.target(self.users[0]))
+        second = Comment.objects.create(body='iki', **self.target(self.users[1]))
+        self.assertEqual(self.counts(), (0, 0, 2))
+
+        second.is_active = False
+        second.save()
+        self.assertEqual(self.counts(), (0, 0, 1))
+
+        # Pasif yorumun silinmesi sayacı tekrar düşürmez
+        second.delete()
+        self.assertEqual(self.counts(), (0, 0, 1))
+        first.delete()
+        self.assertEqual(self.counts(), (0, 0, 0))
+
+    def test_counter_does_not_go_below_zero(self):
+        adjust_counter(self.post_type.id, self.post.pk, 'like_count', -1)
+        self.assertEqual(self.counts(), (0, 0, 0))
+
+    def test_recount_repairs_drift(self):
+        Like.objects.create(**self.target(self.users[0]))
+        Comment.objects.create(body='yorum', **self.target(self.users[0]))
+        other = Post.objects.create(user=self.owner, content='doğru')
+        Post.objects.filter(pk=self.post.pk).update(like_count=5, comment_count=0, bookmark_count=2)
+
+        self.assertEqual(list(find_drifted(Post.objects.all())), [self.post])
+        self.assertEqual(repair_counters(Post), 1)
+        self.assertEqual(self.counts(), (1, 0, 1))
+        self.assertFalse(find_drifted(Post.objects.all()).exists())
+
+        Post.objects.filter(pk=other.pk).update(like_count=3)
+        call_command('recount_counters', '--model', 'post', stdout=StringIO())
+        other.refresh_from_db()
+        self.assertEqual(other.like_count, 0)
+
+
+class WebSocketAuthTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('baglanan')
+
+    def authenticate(self, token):
+        return async_to_sync(websocket_auth.get_user_for_token)(str(token))
+
+    def token(self, seconds):
+        token = AccessToken.for_user(self.user)
+        token.set_exp(lifetime=timedelta(seconds=seconds))
+        return token
+
+    def cached_user(self):
+        return cache.get(websocket_auth._user_key(self.user.pk))
+
+    def test_valid_token_caches_user(self):
+        self.assertEqual(self.authenticate(self.token(600)), self.user)
+        self.assertEqual(self.cached_user(), self.user)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.authenticate(self.token(600)), self.user)
+
+    def test_cache_timeout_capped_at_token_expiry(self):
+        with mock.patch.object(cache, 'aset', wraps=cache.aset) as aset:
+            self.authenticate(self.token(30))
+        timeout = aset.call_args.args[2]
+        self.assertGreater(timeout, 0)
+        self.assertLessEqual(timeout, 30)
+
+        cache.clear()
+        with mock.patch.object(cache, 'aset', wraps=cache.aset) as aset:
+            self.authenticate(self.token(60 * 60))
+        self.assertEqual(aset.call_args.args[2], websocket_auth.WS_AUTH_USER_TIMEOUT)
+
+    def test_expired_or_invalid_token_is_anonymous(self):
+        self.assertIsInstance(self.authenticate(self.token(-10)), AnonymousUser)
+        self.assertIsInstance(self.authenticate('gecersiz.token.degeri'), AnonymousUser)
+        self.assertIsNone(self.cached_user())
+
+    def test_inactive_user_is_anonymous(self):
+        self.user.is_active = False
+        self.user.save()
+        self.assertIsInstance(self.authenticate(self.token(600)), AnonymousUser)
+        self.assertIsNone(self.cached_user())
+
+    def test_deactivating_user_evicts_cache(self):
+        self.authenticate(self.token(600))
+        self.assertIsNotNone(self.cached_user())
+
+        self.user.is_active = False
+        self.user.save()
+        self.assertIsNone(self.cached_user())
+        self.assertIsInstance(self.authenticate(self.token(600)), AnonymousUser)
+
+    def test_saving_or_deleting_user_evicts_cache(self):
+        self.authenticate(self.token(600))
+        self.user.first_name = 'Yeni'
+        self.user.save()
+        self.assertIsNone(self.cached_user())
+
+        self.assertEqual(self.authenticate(self.token(600)).first_name, 'Yeni')
+        user_id = self.user.pk
+        self.user.delete()
+        self.assertIsNone(cache.get(websocket_auth._user_key(user_id)))
@@ -0,0 +1,108 @@
+"""
+İçerik modellerindeki (Post, ConfessionModel, Comment) denormalize sayaçlar için yardımcılar.
+
+Sayaçlar Like / Bookmark / Comment oluşturma ve silme yollarında aynı transaction
+içinde F() ifadeleriyle güncellenir. Zamanla oluşabilecek sapmalar
+`recount_counters` management komutu ile toplu olarak düzeltilir.
+"""
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import Count, F, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Sayaç alanı -> (app_label, model, ek filtre)
+COUNTER_SOURCES = {
+    'like_count': ('like', 'Like', {}),
+    'bookmark_count': ('bookmark', 'Bookmark', {}),
+    'comment_count': ('comment', 'Comment', {'is_active': True}),
+}
+
+
+def adjust_counter(content_type_id, object_id, field, delta):
+    """
+    Hedef içeriğin sayaç alanını atomik olarak artırır/azaltır.
+    Alanı olmayan içerik tipleri sessizce atlanır.
+    """
+    if not delta:
+        return
+
+    try:
+        model_class = ContentType.objects.get_for_id(content_type_id).model_class()
+    except ContentType.DoesNotExist:
+        return
+
+    if model_class is None or not has_counter(model_class, field):
+        return
+
+    model_class.objects.filter(pk=object_id).update(
+        **{field: Greatest(F(field) + delta, Value(0))}
+    )
+
+
+def has_counter(model_class, field):
+    return any(f.name == field for f in model_class._meta.concrete_fields)
+
+
+def counter_fields(model_class):
+    """Modelde bulunan sayaç alanlarını döndürür"""
+    return [field for field in COUNTER_SOURCES if has_counter(model_class, field)]
+
+
+def annotate_true_counts(queryset):
+    """
+    Queryset'e gerçek sayıları `<alan>_actual` olarak ekler (her sayaç için tek alt sorgu).
+    """
+    from django.apps import apps
+
+    content_type = ContentType.objects.get_for_model(queryset.model)
+    annotations = {}
+    for field in counter_fields(queryset.model):
+        app_label, model_name, extra = COUNTER_SOURCES[field]
+        source = apps.get_model(app_label, model_name)
+        counts = source.objects.filter(
+            content_type=content_type,
+            object_id=OuterRef('pk'),
+            **extra
+        ).order_by().values('object_id').annotate(total=Count('pk')).values('total')
+        annotations[f'{field}_actual'] = Coalesce(Subquery(counts), Value(0))
+    return queryset.annotate(**annotations)
+
+
+def find_drifted(queryset):
+    """Sayaçları gerçek değerlerden sapmış kayıtları döndürür"""
+    queryset = annotate_true_counts(queryset)
+    drift = Q()
+    for field in counter_fields(queryset.model):
+        drift |= ~Q(**{field: F(f'{field}_actual')})
+    return queryset.filter(drift) if drift else queryset.none()
+
+
+def repair_counters(model_class, batch_size=1000):
+    """
+    Sapmış sayaçları toplu olarak düzeltir.
+
+    Returns:
+        int: Düzeltilen kayıt sayısı
+    """
+    fields = counter_fields(model_class)
+    if not fields:
+        return 0
+
+    repaired = 0
+    batch = []
+    for obj in find_drifted(model_class.objects.all()).iterator(chunk_size=batch_size):
+        for field in fields:
+            setattr(obj, field, getattr(obj, f'{field}_actual'))
+        batch.append(obj)
+        if len(batch) >= batch_size:
+            model_class.objects.bulk_update(batch, fields)
+            repaired += len(batch)
+            batch = []
+
+    if batch:
+        model_class.objects.bulk_update(batch, fields)
+        repaired += len(batch)
+
+    return repaired
@@ -0,0 +1,148 @@
+"""
+ImageProcessor.process_image için CPU süresi ve tepe bellek ölçümü.
+
+Her ölçüm ayrı bir alt süreçte yapılır; böylece tepe RSS (ru_maxrss) sadece o
+yüklemenin maliyetini gösterir. Python tarafı ayırmalar ayrıca tracemalloc ile ölçülür.
+
+Kullanım:
+    python -m apps.common.utils.image_benchmark
+    python -m apps.common.utils.image_benchmark --sizes 1024x768 4000x3000 --repeat 3 --context post
+"""
+import argparse
+import multiprocessing
+import resource
+import sys
+import time
+import tracemalloc
+from io import BytesIO
+from typing import Dict, List, Tuple
+
+from PIL import Image
+
+DEFAULT_SIZES = [(1024, 768), (2048, 1536), (4000, 3000)]
+
+
+def make_test_image(size: Tuple[int, int], quality: int = 90) -> bytes:
+    """EXIF'li, gürültülü (gerçek fotoğrafa yakın sıkıştırma oranı) bir JPEG üretir"""
+    width, height = size
+    noise = Image.effect_noise((width, height), 40)
+    gradient = Image.linear_gradient('L').resize((width, height))
+    image = Image.merge('RGB', (noise, gradient, Image.blend(noise, gradient, 0.5)))
+
+    exif = Image.Exif()
+    exif[0x0110] = 'Benchmark Camera'  # Model
+    exif[0x0112] = 6  # Orientation: 90 derece döndürülmüş
+
+    buffer = BytesIO()
+    image.save(buffer, format='JPEG', quality=quality, exif=exif)
+    return buffer.getvalue()
+
+
+def _max_rss_bytes() -> int:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux'ta KB, macOS'ta byte döner
+    return rss if sys.platform == 'darwin' else rss * 1024
+
+
+def _measure(data: bytes, context: str) -> Dict:
+    from apps.common.utils.image_processor import ImageProcessor
+
+    processor = ImageProcessor()
+    image_file = BytesIO(data)
+    image_file.name = 'benchmark.jpg'
+
+    baseline_rss = _max_rss_bytes()
+    tracemalloc.start()
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+
+    results = processor.process_image(image_file, context=context)
+
+    cpu = time.process_time() - cpu_start
+    wall = time.perf_counter() - wall_start
+    _, python_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'cpu_seconds': cpu,
+        'wall_seconds': wall,
+        'peak_rss_bytes': max(_max_rss_bytes() - baseline_rss, 0),
+        'python_peak_bytes': python_peak,
+        'presets': {preset: info['file_size'] for preset, info in results.items()},
+    }
+
+
+def _child(data: bytes, context: str, queue) -> None:
+    queue.put(_measure(data, context))
+
+
+def measure_in_subprocess(data: bytes, context: str = 'post') -> Dict:
+    """Tek bir process_image çağrısını temiz bir alt süreçte ölçer"""
+    ctx = multiprocessing.get_context('spawn')
+    queue = ctx.Queue()
+    process = ctx.Process(target=_child, args=(data, context, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+def run_benchmark(sizes: List[Tuple[int, int]] = None, repeat: int = 3, context: str = 'post') -> List[Dict]:
+    """
+    Her boyut için process_image maliyetini ölçer.
+
+    Returns:
+        list: Her boyut için ortalama CPU / duvar süresi ve en yüksek bellek değerleri
+    """
+    rows = []
+    for size in sizes or DEFAULT_SIZES:
+        data = make_test_image(size)
+        runs = [measure_in_subprocess(data, context) for _ in range(repeat)]
+        rows.append({
+            'size': size,
+            'input_bytes': len(data),
+            'cpu_seconds': sum(run['cpu_seconds'] for run in runs) / repeat,
+            'wall_seconds': sum(run['wall_seconds'] for run in runs) / repeat,
+            'peak_rss_bytes': max(run['peak_rss_bytes'] for run in runs),
+            'python_peak_bytes': max(run['python_peak_bytes'] for run in runs),
+            'presets': runs[-1]['presets'],
+        })
+    return rows
+
+
+def format_report(rows: List[Dict]) -> str:
+    mb = 1024 * 1024
+    lines = [
+        f"{'boyut':>12} {'girdi':>9} {'cpu (s)':>9} {'duvar (s)':>10} {'tepe RSS':>10} {'python':>9}",
+    ]
+    for row in rows:
+        width, height = row['size']
+        lines.append(
+            f"{f'{width}x{height}':>12} "
+            f"{row['input_bytes'] / 1024:>7.0f}KB "
+            f"{row['cpu_seconds']:>9.3f} "
+            f"{row['wall_seconds']:>10.3f} "
+            f"{row['peak_rss_bytes'] / mb:>8.1f}MB "
+            f"{row['python_peak_bytes'] / mb:>7.1f}MB"
+        )
+    return "\n".join(lines)
+
+
+def _parse_size(value: str) -> Tuple[int, int]:
+    width, height = value.lower().split('x')
+    return int(width), int(height)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='ImageProcessor.process_image benchmark')
+    parser.add_argument('--sizes', nargs='+', type=_parse_size, default=DEFAULT_SIZES,
+                        help='Ölçülecek boyutlar, ör. 1024x768 4000x3000')
+    parser.add_argument('--repeat', type=int, default=3, help='Her boyut için tekrar sayısı')
+    parser.add_argument('--context', default='post', help="process_image konteksti ('post', 'profile', 'chat', 'comment')")
+    args = parser.parse_args(argv)
+
+    print(format_report(run_benchmark(args.sizes, args.repeat, args.context)))
+
+
+if __name__ == '__main__':
+    main()
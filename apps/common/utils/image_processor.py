@@ -74,6 +74,16 @@ class ImageProcessor:
         'original': 2 * 1024 * 1024  # 2MB
     }
 
+    # Metadata temizlenirken korunacak, render için gerekli info anahtarları
+    PRESERVED_INFO_KEYS = ('transparency',)
+
+    # 'original' preset'i için maksimum kenar uzunluğu (2K)
+    ORIGINAL_MAX_DIMENSION = 2048
+
+    # Dosya boyutu sınırı aşıldığında kalite araması
+    MIN_QUALITY = 30
+    QUALITY_SEARCH_STEPS = 3
+
     def __init__(self):
         """Image processor'ı başlat"""
         # WebP desteği kontrolü
@@ -98,12 +108,22 @@ class ImageProcessor:
         return hashlib.md5(image_data).hexdigest()
     
     def _clean_metadata(self, image: Image.Image) -> Image.Image:
-        """EXIF metadata'yı temizle (privacy ve boyut için)"""
+        """
+        EXIF metadata'yı temizle (privacy ve boyut için).
+
+        Pikseller Python'a taşınmaz: metadata (EXIF, XMP, ICC, yorumlar) resmin `info`
+        sözlüğünde tutulur, piksel buffer'ına dokunmadan sadece bu sözlük temizlenir.
+        EXIF ayrıca encode sırasında `exif=b''` ile boş yazılır (bkz. _encode).
+        Paletli resimlerin paleti ve şeffaflık bilgisi korunur. Resim yerinde değiştirilir;
+        process_image içinde zaten işlenen kopya üzerinde çalışılır.
+        """
         try:
-            # EXIF verilerini temizle
-            cleaned_image = Image.new(image.mode, image.size)
-            cleaned_image.putdata(list(image.getdata()))
-            return cleaned_image
+            image.load()
+            image.info = {
+                key: value for key, value in image.info.items()
+                if key in self.PRESERVED_INFO_KEYS
+            }
+            return image
         except Exception as e:
             logger.warning(f"Metadata temizleme hatası: {e}")
             return image
@@ -116,48 +136,110 @@ class ImageProcessor:
             logger.warning(f"Orientation düzeltme hatası: {e}")
             return image
     
-    def _resize_image(self, image: Image.Image, size_preset: str) -> Image.Image:
-        """Resmi belirtilen preset'e göre yeniden boyutlandır"""
+    def _preset_box(self, size_preset: str) -> Tuple[int, int]:
+        """Preset'in sığması gereken kutu boyutu"""
         if size_preset == 'original':
-            # Orijinal boyut için sadece max limit uygula
-            max_dimension = 2048  # 2K maksimum
-            if max(image.size) > max_dimension:
-                image.thumbnail((max_dimension, max_dimension), Image.Resampling.LANCZOS)
-            return image
-        
+            return (self.ORIGINAL_MAX_DIMENSION, self.ORIGINAL_MAX_DIMENSION)
+
         target_size = self.SIZE_PRESETS.get(size_preset)
         if not target_size:
             raise ValueError(f"Geçersiz size preset: {size_preset}")
-        
-        # Aspect ratio'yu koru
-        image.thumbnail(target_size, Image.Resampling.LANCZOS)
+        return target_size
+
+    def _preset_area(self, size_preset: str) -> int:
+        """Sıralama için preset alanı (geçersiz presetler için 0)"""
+        try:
+            width, height = self._preset_box(size_preset)
+        except ValueError:
+            return 0
+        return width * height
+
+    def _resize_image(self, image: Image.Image, size_preset: str) -> Image.Image:
+        """Resmi belirtilen preset'e göre yeniden boyutlandır (aspect ratio korunur, büyütme yapılmaz)"""
+        image.thumbnail(self._preset_box(size_preset), Image.Resampling.LANCZOS)
         return image
-    
-    def _convert_to_format(self, image: Image.Image, format_type: str, quality: int) -> BytesIO:
-        """Resmi belirtilen formata çevir"""
-        buffer = BytesIO()
-        
-        # RGB'ye çevir (WEBP ve JPEG için gerekli)
-        if image.mode in ('RGBA', 'P'):
-            # Transparent background'u beyaz yap
-            background = Image.new('RGB', image.size, (255, 255, 255))
-            if image.mode == 'P':
+
+    def _apply_draft(self, image: Image.Image, size_presets: List[str]) -> None:
+        """
+        JPEG'i en büyük preset için yeterli en küçük ölçekte (1/2, 1/4, 1/8) decode et.
+        Orientation henüz uygulanmadığı için kare kutu kullanılır; her iki yön de yeterli kalır.
+        """
+        if image.format != 'JPEG':
+            return
+
+        boxes = [self._preset_box(preset) for preset in size_presets if self._preset_area(preset)]
+        if not boxes:
+            return
+
+        largest = max(max(box) for box in boxes)
+        try:
+            image.draft('RGB', (largest, largest))
+        except Exception as e:
+            logger.warning(f"Draft decode uygulanamadı: {e}")
+
+    def _prepare_for_encoding(self, image: Image.Image) -> Image.Image:
+        """RGB'ye çevir (WEBP ve JPEG için gerekli), şeffaf arka planı beyaz yap"""
+        if image.mode in ('RGBA', 'LA', 'P'):
+            if image.mode != 'RGBA':
                 image = image.convert('RGBA')
-            background.paste(image, mask=image.split()[-1] if image.mode == 'RGBA' else None)
-            image = background
-        elif image.mode != 'RGB':
-            image = image.convert('RGB')
-        
-        # Format'a göre kaydet
+            background = Image.new('RGB', image.size, (255, 255, 255))
+            background.paste(image, mask=image.split()[-1])
+            return background
+        if image.mode != 'RGB':
+            return image.convert('RGB')
+        return image
+
+    def _encode(self, image: Image.Image, format_type: str, quality: int) -> BytesIO:
+        """RGB resmi belirtilen formatta, EXIF olmadan encode et"""
+        buffer = BytesIO()
         if format_type == 'WEBP' and self.webp_supported:
-            image.save(buffer, format='WEBP', quality=quality, optimize=True)
+            image.save(buffer, format='WEBP', quality=quality, optimize=True, exif=b'')
         else:
             # JPEG fallback
-            image.save(buffer, format='JPEG', quality=quality, optimize=True, progressive=True)
-        
+            image.save(buffer, format='JPEG', quality=quality, optimize=True, progressive=True, exif=b'')
         buffer.seek(0)
         return buffer
-    
+
+    def _convert_to_format(self, image: Image.Image, format_type: str, quality: int) -> BytesIO:
+        """Resmi belirtilen formata çevir"""
+        return self._encode(self._prepare_for_encoding(image), format_type, quality)
+
+    def _encode_within_size(self, image: Image.Image, format_type: str,
+                            quality: int, max_size: int) -> Tuple[BytesIO, int]:
+        """
+        Dosya boyutu sınırına sığan en yüksek kaliteyi bul.
+
+        Önce preset kalitesi denenir (çoğu resim ilk denemede sığar). Sığmazsa
+        [MIN_QUALITY, quality) aralığında ikili arama yapılır; en fazla
+        QUALITY_SEARCH_STEPS ek encode yapılır. Hiçbiri sığmazsa en küçük sonuç döner.
+        """
+        buffer = self._encode(image, format_type, quality)
+        if buffer.getbuffer().nbytes <= max_size:
+            return buffer, quality
+
+        best, best_quality = None, None
+        smallest, smallest_quality = buffer, quality
+        low, high = self.MIN_QUALITY, quality - 1
+
+        for _ in range(self.QUALITY_SEARCH_STEPS):
+            if low > high:
+                break
+            candidate_quality = (low + high + 1) // 2
+            candidate = self._encode(image, format_type, candidate_quality)
+            size = candidate.getbuffer().nbytes
+
+            if size <= max_size:
+                best, best_quality = candidate, candidate_quality
+                low = candidate_quality + 1
+            else:
+                if size < smallest.getbuffer().nbytes:
+                    smallest, smallest_quality = candidate, candidate_quality
+                high = candidate_quality - 1
+
+        if best is not None:
+            return best, best_quality
+        return smallest, smallest_quality
+
     def process_image(self, 
                      image_file, 
                      size_presets: Optional[List[str]] = None,
@@ -165,6 +247,10 @@ class ImageProcessor:
         """
         Ana resim işleme fonksiyonu
         
+        Resim tek sefer decode edilir (JPEG'de draft modunda, gereken en küçük ölçekte).
+        Presetler büyükten küçüğe sıralanıp her biri bir öncekinden küçültülür
+        (large -> medium -> thumbnail); aynı boyuttaki presetler tek resmi paylaşır.
+        
         Args:
             image_file: Django UploadedFile objesi
             size_presets: İşlenecek boyut presetleri ['thumbnail', 'medium', 'large']
@@ -184,66 +270,66 @@ class ImageProcessor:
             size_presets = context_presets.get(context, ['thumbnail', 'medium'])
         
         try:
-            # Orijinal resmi yükle
+            # Orijinal resmi yükle (pikseller henüz decode edilmez)
             original_image = Image.open(image_file)
             logger.info(f"Resim işleniyor: {image_file.name}, boyut: {original_image.size}, format: {original_image.format}")
             
+            # JPEG ise sadece gereken ölçekte decode et
+            self._apply_draft(original_image, size_presets)
+            
             # Orientation'ı düzelt
             original_image = self._optimize_orientation(original_image)
             
             # Metadata'yı temizle
             original_image = self._clean_metadata(original_image)
             
+            # Tek seferlik renk dönüşümü (şeffaflık -> beyaz arka plan)
+            current_image = self._prepare_for_encoding(original_image)
+            
             # Hash hesapla (duplicate detection için)
             image_file.seek(0)
             image_hash = self._get_image_hash(image_file.read())
             
-            results = {}
+            format_type = self.OUTPUT_FORMAT if self.webp_supported else self.FALLBACK_FORMAT
+            extension = '.webp' if format_type == 'WEBP' else '.jpg'
+            
+            # Büyükten küçüğe: her preset bir öncekinin çıktısından küçültülür
+            cascade = sorted(size_presets, key=self._preset_area, reverse=True)
             
-            # Her preset için işle
-            for preset in size_presets:
+            processed = {}
+            for preset in cascade:
                 try:
-                    # Resmi yeniden boyutlandır
-                    processed_image = self._resize_image(original_image.copy(), preset)
+                    # Resmi yeniden boyutlandır (bir önceki, daha büyük sonuçtan).
+                    # Önceki sonuç encode edildiği için kopya almadan yerinde küçültülür.
+                    processed_image = self._resize_image(current_image, preset)
                     
                     # Kalite ayarını al
                     quality = self.QUALITY_SETTINGS.get(preset, 85)
-                    
-                    # Format'a çevir
-                    format_type = self.OUTPUT_FORMAT if self.webp_supported else self.FALLBACK_FORMAT
-                    image_buffer = self._convert_to_format(processed_image, format_type, quality)
-                    
-                    # Dosya boyutunu kontrol et
                     max_size = self.MAX_FILE_SIZES.get(preset, 500 * 1024)
-                    if image_buffer.getbuffer().nbytes > max_size:
-                        # Kaliteyi düşür ve tekrar dene
-                        for reduced_quality in [quality - 10, quality - 20, quality - 30]:
-                            if reduced_quality < 30:
-                                break
-                            image_buffer = self._convert_to_format(processed_image, format_type, reduced_quality)
-                            if image_buffer.getbuffer().nbytes <= max_size:
-                                break
                     
-                    # Dosya extension'ını belirle
-                    extension = '.webp' if format_type == 'WEBP' else '.jpg'
+                    # Dosya boyutu sınırına göre kalite ara
+                    image_buffer, used_quality = self._encode_within_size(
+                        processed_image, format_type, quality, max_size
+                    )
                     
-                    results[preset] = {
+                    processed[preset] = {
                         'image_data': image_buffer,
                         'size': processed_image.size,
                         'file_size': image_buffer.getbuffer().nbytes,
                         'format': format_type,
-                        'quality': quality,
+                        'quality': used_quality,
                         'extension': extension,
                         'hash': image_hash
                     }
                     
-                    logger.info(f"Preset '{preset}' işlendi: {processed_image.size}, {image_buffer.getbuffer().nbytes} bytes")
+                    logger.info(f"Preset '{preset}' işlendi: {processed_image.size}, {image_buffer.getbuffer().nbytes} bytes, kalite {used_quality}")
                     
                 except Exception as e:
                     logger.error(f"Preset '{preset}' işlenirken hata: {e}")
                     continue
             
-            return results
+            # Sonuçları istenen preset sırasıyla döndür
+            return {preset: processed[preset] for preset in size_presets if preset in processed}
             
         except Exception as e:
             logger.error(f"Resim işleme hatası: {e}")
@@ -327,6 +413,150 @@ class ImageProcessor:
             raise ValueError(f"Geçersiz resim dosyası: {str(e)}")
 
 
+# Paralel işleme (çok resimli gönderiler için)
+#
+# (resim x preset) matrisi sınırlı bir process pool'a dağıtılır. Her görev resmi kendi
+# preset'inin draft ölçeğinde decode edip tek bir boyut üretir; sonuçlar giriş sırasıyla
+# birleştirilir. Worker süreçlerinin adres alanı IMAGE_PROCESSING_MEMORY_LIMIT_MB ile
+# sınırlanır; sınırı aşan görev MemoryError ile başarısız olur, diğerleri etkilenmez.
+
+_executor = None
+_executor_config = None
+
+
+def _get_parallel_settings(workers: Optional[int], memory_limit_mb: Optional[int]) -> Tuple[int, int]:
+    if workers is None:
+        workers = getattr(settings, 'IMAGE_PROCESSING_WORKERS', 0)
+        if not getattr(settings, 'IMAGE_PROCESSING_ASYNC', True):
+            # İşleme web sürecinde yapılıyor: orada süreç havuzu başlatılmaz
+            workers = 1
+    if not workers:
+        workers = min(4, os.cpu_count() or 1)
+    if memory_limit_mb is None:
+        memory_limit_mb = getattr(settings, 'IMAGE_PROCESSING_MEMORY_LIMIT_MB', 1024)
+    return workers, memory_limit_mb
+
+
+def _init_worker(memory_limit_bytes: int) -> None:
+    """Worker sürecinin bellek sınırını uygula"""
+    if not memory_limit_bytes:
+        return
+    try:
+        import resource
+        resource.setrlimit(resource.RLIMIT_AS, (memory_limit_bytes, memory_limit_bytes))
+    except (ImportError, ValueError, OSError) as e:
+        logger.warning(f"Worker bellek sınırı uygulanamadı: {e}")
+
+
+def _get_executor(workers: int, memory_limit_mb: int):
+    """Süreç başına tek, yeniden kullanılan process pool"""
+    global _executor, _executor_config
+    from concurrent.futures import ProcessPoolExecutor
+    import multiprocessing
+
+    config = (workers, memory_limit_mb)
+    if _executor is None or _executor_config != config:
+        if _executor is not None:
+            _executor.shutdown(wait=False)
+        _executor = ProcessPoolExecutor(
+            max_workers=workers,
+            # Worker'lar Django/DB durumunu miras almasın
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker,
+            initargs=(memory_limit_mb * 1024 * 1024,),
+        )
+        _executor_config = config
+    return _executor
+
+
+def _reset_executor() -> None:
+    global _executor, _executor_config
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+    _executor = _executor_config = None
+
+
+def _render_preset(task: Tuple[int, str, bytes, str, str]) -> Tuple[int, str, Optional[Dict]]:
+    """Worker görevi: tek resmin tek preset'ini üret"""
+    index, preset, data, name, context = task
+    image_file = BytesIO(data)
+    image_file.name = name
+    try:
+        result = ImageProcessor().process_image(image_file, size_presets=[preset], context=context)
+    except MemoryError:
+        logger.error(f"Preset '{preset}' bellek sınırını aştı: {name}")
+        return index, preset, None
+    except Exception as e:
+        logger.error(f"Preset '{preset}' işlenirken hata ({name}): {e}")
+        return index, preset, None
+    return index, preset, result.get(preset)
+
+
+def process_images_parallel(image_files: List,
+                            size_presets: List[str],
+                            context: str = 'general',
+                            workers: Optional[int] = None,
+                            memory_limit_mb: Optional[int] = None) -> List[Dict[str, Dict]]:
+    """
+    Birden fazla resmi paralel işle.
+
+    Args:
+        image_files: Okunabilir dosya objeleri (UploadedFile, FieldFile, BytesIO)
+        size_presets: Her resim için üretilecek presetler
+        context: Kullanım konteksti
+        workers: Worker sayısı (None: IMAGE_PROCESSING_WORKERS, 0: CPU sayısı, en fazla 4)
+        memory_limit_mb: Worker başına bellek sınırı (None: IMAGE_PROCESSING_MEMORY_LIMIT_MB)
+
+    Returns:
+        list: Giriş sırasıyla her resim için {preset: sonuç} sözlüğü.
+        Üretilemeyen presetler sözlükte yer almaz.
+    """
+    workers, memory_limit_mb = _get_parallel_settings(workers, memory_limit_mb)
+
+    sources = []
+    for index, image_file in enumerate(image_files):
+        image_file.seek(0)
+        sources.append((image_file.read(), getattr(image_file, 'name', None) or f'image_{index}'))
+        image_file.seek(0)
+
+    tasks = [
+        (index, preset, data, name, context)
+        for index, (data, name) in enumerate(sources)
+        for preset in size_presets
+    ]
+
+    if workers > 1 and len(tasks) > 1:
+        from concurrent.futures.process import BrokenProcessPool
+
+        results = [{} for _ in sources]
+        try:
+            executor = _get_executor(workers, memory_limit_mb)
+            for index, preset, result in executor.map(_render_preset, tasks):
+                if result is not None:
+                    results[index][preset] = result
+            # Preset sırasını istenen sıraya getir
+            return [
+                {preset: result[preset] for preset in size_presets if preset in result}
+                for result in results
+            ]
+        except BrokenProcessPool as e:
+            # Worker öldürüldüyse (ör. OOM) pool'u sıfırla ve sıralı işle
+            logger.error(f"Process pool bozuldu, sıralı işlemeye geçiliyor: {e}")
+            _reset_executor()
+
+    processor = ImageProcessor()
+    results = []
+    for data, name in sources:
+        image_file = BytesIO(data)
+        image_file.name = name
+        try:
+            results.append(processor.process_image(image_file, size_presets=size_presets, context=context))
+        except ValueError as e:
+            logger.error(f"Resim işlenemedi ({name}): {e}")
+            results.append({})
+    return results
+
+
 # Convenience functions
 def process_profile_image(image_file, user_id: Optional[int] = None):
     """Profil resmi için optimize edilmiş işleme"""
@@ -348,21 +578,22 @@ def process_profile_image(image_file, user_id: Optional[int] = None):
     return processor.save_processed_images(processed, clean_name, upload_path)
 
 def process_post_images(image_files: List, post_id: Optional[int] = None):
-    """Post resimleri için optimize edilmiş işleme"""
+    """Post resimleri için optimize edilmiş işleme (resimler x presetler paralel işlenir)"""
     processor = ImageProcessor()
-    results = []
+    processed_list = process_images_parallel(
+        image_files,
+        size_presets=['thumbnail', 'medium', 'large'],
+        context='post'
+    )
     
-    for i, image_file in enumerate(image_files):
-        processed = processor.process_image(
-            image_file,
-            size_presets=['thumbnail', 'medium', 'large'],
-            context='post'
-        )
-        
-        # Create date-based upload path with post ID folder (same as model)
-        from datetime import datetime
-        now = datetime.now()
-        upload_path = f'posts/{now.year}/{now.month:02d}/{now.day:02d}/{post_id}/'
+    # Create date-based upload path with post ID folder (same as model)
+    from datetime import datetime
+    now = datetime.now()
+    upload_path = f'posts/{now.year}/{now.month:02d}/{now.day:02d}/{post_id}/'
+    
+    # Sonuçlar giriş sırasıyla döner; kaydetme de aynı sırayla yapılır
+    results = []
+    for i, (image_file, processed) in enumerate(zip(image_files, processed_list)):
         saved_files = processor.save_processed_images(processed, f"post_{post_id}_{image_file.name}_{i}", upload_path)
         results.append(saved_files)
     
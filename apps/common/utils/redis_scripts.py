@@ -0,0 +1,29 @@
+"""
+Cache backend'i django-redis olduğunda ham Redis bağlantısı ve Lua script'leri.
+
+Sunucu tarafında atomik güncelleme gereken yapılar (ana sayfa zaman çizelgesi, okunmamış
+mesaj sayaçları) bunları kullanır; diğer cache backend'lerinde (yerelde locmem)
+bağlantı None döner ve çağıran kendi yedek yolunu kullanır.
+"""
+from functools import partial
+
+_scripts = {}
+
+
+def redis_connection():
+    """Cache backend'i django-redis ise ham Redis bağlantısı, değilse None"""
+    try:
+        from django_redis import get_redis_connection
+        return get_redis_connection('default')
+    except (ImportError, NotImplementedError):
+        return None
+
+
+def redis_script(connection, source):
+    """
+    Lua script'ini bir kez kaydeder (EVALSHA, gerekirse EVAL ile çalışır) ve verilen
+    bağlantıda çalıştıran çağrılabilir döndürür; pipeline için client= ile ezilebilir.
+    """
+    if source not in _scripts:
+        _scripts[source] = connection.register_script(source)
+    return partial(_scripts[source], client=connection)
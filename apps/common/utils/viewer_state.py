@@ -0,0 +1,117 @@
+"""
+Liste endpoint'lerinde görüntüleyen kullanıcıya özel alanlar (is_liked / is_bookmarked) için
+toplu yükleme yardımcıları.
+
+Serializer her nesne için ayrı ayrı `is_liked_by` / `is_bookmarked_by` sorgusu çalıştırmak
+yerine, sayfadaki tüm nesnelerin id'leri için ilişki başına tek sorgu çalıştırılır ve sonuç
+kümeleri serializer context'ine konur. Like ve Bookmark generic (ContentType) olduğundan
+bu iki uygulamanın desteklediği her içerik tipiyle çalışır.
+
+Context yapısı:
+    context['viewer_state'][content_type_id] = {
+        'ids': {yüklenen nesne id'leri},
+        'liked': {beğenilen nesne id'leri},
+        'bookmarked': {yer imine eklenen nesne id'leri},
+    }
+"""
+from django.apps import apps
+from django.contrib.contenttypes.models import ContentType
+from django.db import models
+from rest_framework import serializers
+
+VIEWER_STATE_CONTEXT_KEY = 'viewer_state'
+
+# İlişki adı -> (app_label, model)
+VIEWER_RELATIONS = {
+    'liked': ('like', 'Like'),
+    'bookmarked': ('bookmark', 'Bookmark'),
+}
+
+
+def _get_viewer(context):
+    request = context.get('request')
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated:
+        return None
+    return user
+
+
+def prefetch_viewer_state(context, objects, extra_ids=None):
+    """
+    Nesnelerin görüntüleyen kullanıcıya ait beğeni / yer imi durumlarını toplu olarak yükler.
+
+    Args:
+        context: Serializer context'i (sonuçlar buraya yazılır)
+        objects: Sayfadaki model örnekleri (farklı modeller karışık olabilir)
+        extra_ids: {model_class: [id, ...]} - nesnelerle birlikte yüklenecek ek id'ler
+            (ör. yorumların yanıtları)
+    """
+    user = _get_viewer(context)
+    if user is None:
+        return
+
+    ids_by_model = {}
+    for obj in objects:
+        if isinstance(obj, models.Model) and obj.pk is not None:
+            ids_by_model.setdefault(type(obj), set()).add(obj.pk)
+    for model_class, ids in (extra_ids or {}).items():
+        ids_by_model.setdefault(model_class, set()).update(ids)
+
+    state = context.setdefault(VIEWER_STATE_CONTEXT_KEY, {})
+    for model_class, ids in ids_by_model.items():
+        content_type = ContentType.objects.get_for_model(model_class)
+        entry = state.setdefault(content_type.id, {
+            'ids': set(),
+            **{relation: set() for relation in VIEWER_RELATIONS},
+        })
+
+        ids = ids - entry['ids']
+        if not ids:
+            continue
+
+        for relation, (app_label, model_name) in VIEWER_RELATIONS.items():
+            source = apps.get_model(app_label, model_name)
+            entry[relation].update(
+                source.objects.filter(
+                    user=user,
+                    content_type=content_type,
+                    object_id__in=ids,
+                ).values_list('object_id', flat=True)
+            )
+        entry['ids'].update(ids)
+
+
+def get_viewer_state(context, obj, relation):
+    """
+    Önceden yüklenmiş durumu döndürür.
+
+    Returns:
+        bool: Nesne yüklenmişse durum, None: yüklenmemişse (tekil sorguya düşülmeli)
+    """
+    state = context.get(VIEWER_STATE_CONTEXT_KEY)
+    if not state:
+        return None
+
+    content_type = ContentType.objects.get_for_model(obj)
+    entry = state.get(content_type.id)
+    if entry is None or obj.pk not in entry['ids']:
+        return None
+    return obj.pk in entry[relation]
+
+
+class ViewerStateListSerializer(serializers.ListSerializer):
+    """
+    many=True ile kullanıldığında sayfadaki nesnelerin is_liked / is_bookmarked durumlarını
+    tek seferde yükleyen liste serializer'ı.
+    """
+
+    def get_viewer_state_extra_ids(self, objects):
+        """Alt sınıflar nesnelerle birlikte yüklenecek ek id'leri döndürebilir"""
+        return None
+
+    def to_representation(self, data):
+        iterable = data.all() if isinstance(data, models.manager.BaseManager) else data
+        objects = list(iterable)
+        if objects and _get_viewer(self.context) is not None:
+            prefetch_viewer_state(self.context, objects, self.get_viewer_state_extra_ids(objects))
+        return super().to_representation(objects)
@@ -0,0 +1,102 @@
+"""
+WebSocket bağlantıları için JWT kimlik doğrulama middleware'i.
+
+Token (öncelik sırası) `Authorization: Bearer` header'ından, `?authorization=Bearer ...`
+ya da `?token=` parametresinden alınır ve simplejwt ile bir kez doğrulanır.
+Doğrulanan kullanıcı cache'de (prod'da Redis) kısa süre tutulur; süre token'ın
+bitiş zamanını aşmaz. Böylece deploy sonrası toplu yeniden bağlanmalarda her bağlantı
+için veritabanına gidilmez. Consumer'lar hazır `scope['user']` alır.
+
+Oturum (session) ile bağlanan web istemcileri için AuthMiddlewareStack önce çalışır;
+token sadece kullanıcı anonimse değerlendirilir.
+"""
+import logging
+import time
+from urllib.parse import parse_qs
+
+from channels.auth import AuthMiddlewareStack
+from channels.db import database_sync_to_async
+from channels.middleware import BaseMiddleware
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+WS_AUTH_USER_TIMEOUT = getattr(settings, 'WS_AUTH_USER_TIMEOUT', 60 * 5)  # 5 dakika
+
+
+def _user_key(user_id):
+    return f"ws_auth_user_{user_id}"
+
+
+def get_token_from_scope(scope):
+    """Bağlantı header'ları veya query string'inden JWT'yi alır"""
+    headers = dict(scope.get('headers', []))
+    auth_header = headers.get(b'authorization', b'').decode('utf-8')
+    if auth_header.startswith('Bearer '):
+        return auth_header.split(' ', 1)[1]
+
+    query_string = parse_qs(scope.get('query_string', b'').decode())
+    query_auth_header = query_string.get('authorization', [''])[0]
+    if query_auth_header.startswith('Bearer '):
+        return query_auth_header.split(' ', 1)[1]
+
+    return query_string.get('token', [None])[0]
+
+
+def _load_user(user_id):
+    from django.contrib.auth import get_user_model
+
+    return get_user_model().objects.filter(pk=user_id, is_active=True).first()
+
+
+async def get_user_for_token(raw_token):
+    """Token'ı doğrular ve kullanıcıyı döndürür; geçersizse AnonymousUser"""
+    from rest_framework_simplejwt.exceptions import TokenError
+    from rest_framework_simplejwt.settings import api_settings
+    from rest_framework_simplejwt.tokens import UntypedToken
+
+    try:
+        # İmza ve süre kontrolü dahil tek seferlik çözümleme
+        token = UntypedToken(raw_token)
+    except TokenError as e:
+        logger.info(f"WebSocket token doğrulama hatası: {e}")
+        return AnonymousUser()
+
+    user_id = token.payload.get(api_settings.USER_ID_CLAIM)
+    if user_id is None:
+        return AnonymousUser()
+
+    user = await cache.aget(_user_key(user_id))
+    if user is None:
+        user = await database_sync_to_async(_load_user)(user_id)
+        if user is None:
+            return AnonymousUser()
+
+        timeout = min(WS_AUTH_USER_TIMEOUT, int(token.payload.get('exp', 0) - time.time()))
+        if timeout > 0:
+            await cache.aset(_user_key(user_id), user, timeout)
+
+    return user
+
+
+def invalidate_websocket_user(user_id):
+    cache.delete(_user_key(user_id))
+
+
+class JWTAuthMiddleware(BaseMiddleware):
+    """Anonim WebSocket bağlantılarında JWT ile scope['user']'ı doldurur"""
+
+    async def __call__(self, scope, receive, send):
+        user = scope.get('user')
+        if user is None or not user.is_authenticated:
+            raw_token = get_token_from_scope(scope)
+            if raw_token:
+                scope = dict(scope, user=await get_user_for_token(raw_token))
+        return await super().__call__(scope, receive, send)
+
+
+def JWTAuthMiddlewareStack(inner):
+    """Session (AuthMiddlewareStack) + JWT kimlik doğrulaması"""
+    return AuthMiddlewareStack(JWTAuthMiddleware(inner))
@@ -49,13 +49,6 @@ class ConfessionModelAdmin(admin.ModelAdmin):
         return obj.content[:100] + '...' if len(obj.content) > 100 else obj.content
     content_preview.short_description = 'İçerik Önizleme'
     
-    def like_count(self, obj):
-        return obj.likes.count()
-    like_count.short_description = 'Beğeni Sayısı'
-    
-    def comment_count(self, obj):
-        return obj.comments.count()
-    comment_count.short_description = 'Yorum Sayısı'
 
 @admin.register(ConfessionImage)
 class ConfessionImageAdmin(admin.ModelAdmin):
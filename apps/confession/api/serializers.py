@@ -2,6 +2,7 @@ from rest_framework import serializers
 from django.contrib.auth.models import User
 from apps.confession.models import ConfessionModel, ConfessionCategory, ConfessionImage, ConfessionFilter
 from apps.dataset.models import University
+from apps.common.utils.viewer_state import ViewerStateListSerializer, get_viewer_state
 from django.urls import reverse
 import logging
 
@@ -254,6 +255,7 @@ class ConfessionSerializer(serializers.ModelSerializer):
             'is_liked', 'is_bookmarked', 'is_owner', 'url', 'privacy_type'
         ]
         read_only_fields = ['user', 'created_at', 'updated_at', 'is_active']
+        list_serializer_class = ViewerStateListSerializer
     
     def get_user(self, obj):
         """Return user info with privacy handling"""
@@ -291,12 +293,18 @@ class ConfessionSerializer(serializers.ModelSerializer):
         return obj.get_bookmark_count()
     
     def get_is_liked(self, obj):
+        state = get_viewer_state(self.context, obj, 'liked')
+        if state is not None:
+            return state
         request = self.context.get('request')
         if request and request.user.is_authenticated:
             return obj.is_liked_by(request.user)
         return False
     
     def get_is_bookmarked(self, obj):
+        state = get_viewer_state(self.context, obj, 'bookmarked')
+        if state is not None:
+            return state
         request = self.context.get('request')
         if request and request.user.is_authenticated:
             return obj.is_bookmarked_by(request.user)
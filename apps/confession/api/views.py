@@ -12,6 +12,8 @@ from datetime import timedelta
 from apps.confession.models import ConfessionModel, ConfessionCategory, ConfessionFilter
 from apps.confession.filters import ConfessionFilterSet
 from apps.profiles.models import Profile
+from apps.profiles.visibility import VisibilityService
+from apps.common.pagination import OptInCursorPagination
 from apps.dataset.models import University
 from .serializers import (
     ConfessionSerializer, ConfessionDetailSerializer, ConfessionCategorySerializer,
@@ -48,6 +50,7 @@ class ConfessionViewSet(viewsets.ModelViewSet):
     """
     serializer_class = ConfessionSerializer
     permission_classes = [permissions.IsAuthenticated, IsOwnerOrReadOnly, IsActiveConfession]
+    pagination_class = OptInCursorPagination
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_class = ConfessionFilterSet
     search_fields = ['content']
@@ -66,7 +69,7 @@ class ConfessionViewSet(viewsets.ModelViewSet):
         
         # Apply performance optimizations
         queryset = queryset.select_related('user', 'category', 'university')
-        queryset = queryset.prefetch_related('images', 'likes', 'comments', 'bookmarks')
+        queryset = queryset.prefetch_related('images')
         
         return queryset.order_by('-created_at')
 
@@ -74,38 +77,9 @@ class ConfessionViewSet(viewsets.ModelViewSet):
         """
         Apply privacy and blocking filters to queryset
         """
-        try:
-            profile = Profile.objects.get(user=self.request.user)
-            
-            # Exclude confessions from blocked users
-            blocked_users = [user.user for user in profile.blocked.all()]
-            
-            # Also exclude confessions from users who blocked the current user
-            # (reverse relationship lookup)
-            blocked_by_users = []
-            try:
-                blocked_by_profiles = Profile.objects.filter(blocked=profile)
-                blocked_by_users = [p.user for p in blocked_by_profiles]
-            except:
-                pass  # If relation doesn't exist, continue
-            
-            all_blocked = list(set(blocked_users + blocked_by_users))
-            
-            if all_blocked:
-                queryset = queryset.exclude(user__in=all_blocked)
-            
-            # Exclude confessions from users with private profiles who the current user doesn't follow
-            private_profiles = Profile.objects.filter(is_private=True).exclude(user=self.request.user)
-            following_users = [user.user for user in profile.following.all()]
-            private_users_not_following = [p.user for p in private_profiles if p.user not in following_users]
-            
-            if private_users_not_following:
-                queryset = queryset.exclude(user__in=private_users_not_following)
-                
-        except Profile.DoesNotExist:
-            pass
-            
-        return queryset
+        # Exclude confessions from blocked users, users who blocked the current user
+        # and private profiles the current user doesn't follow
+        return VisibilityService.for_request(self.request).filter_queryset(queryset)
 
     def get_serializer_class(self):
         """
@@ -213,8 +187,6 @@ class ConfessionViewSet(viewsets.ModelViewSet):
         
         trending_confessions = self.get_queryset().filter(
             created_at__gte=last_24h
-        ).annotate(
-            like_count=Count('likes')
         ).order_by('-like_count')[:20]
         
         serializer = self.get_serializer(trending_confessions, many=True)
@@ -283,7 +255,7 @@ class ConfessionViewSet(viewsets.ModelViewSet):
         confessions = ConfessionModel.objects.filter(
             user=request.user,
             is_active=True
-        ).select_related('category', 'university').prefetch_related('images', 'likes', 'comments', 'bookmarks').order_by('-created_at')
+        ).select_related('category', 'university').prefetch_related('images').order_by('-created_at')
         
         # Check if the requested page exists
         try:
@@ -336,7 +308,7 @@ class ConfessionViewSet(viewsets.ModelViewSet):
         confessions = ConfessionModel.objects.filter(
             user=target_user,
             is_active=True
-        ).select_related('category', 'university').prefetch_related('images', 'likes', 'comments', 'bookmarks')
+        ).select_related('category', 'university').prefetch_related('images')
         
         # If viewing other user's confessions, only show non-private ones
         if target_user != request.user:
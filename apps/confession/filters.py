@@ -1,6 +1,6 @@
 import django_filters
 from django import forms
-from django.db.models import Q, Count
+from django.db.models import Q
 from django.contrib.auth.models import User
 
 from .models import ConfessionModel, ConfessionCategory, ConfessionFilter
@@ -142,15 +142,7 @@ class ConfessionFilterSet(django_filters.FilterSet):
         # Add select_related for performance
         queryset = queryset.select_related('user', 'category', 'university')
         
-        # Add prefetch_related for generic relations
-        queryset = queryset.prefetch_related('likes', 'comments', 'bookmarks', 'images')
-        
-        # Add annotations for sorting
-        if self.data and 'sort_by' in self.data:
-            sort_value = self.data['sort_by']
-            if 'like_count' in sort_value:
-                queryset = queryset.annotate(like_count=Count('likes'))
-            if 'comment_count' in sort_value:
-                queryset = queryset.annotate(comment_count=Count('comments'))
+        # Add prefetch_related for images (counts come from the denormalized counter columns)
+        queryset = queryset.prefetch_related('images')
         
         return queryset
\ No newline at end of file
@@ -3,11 +3,11 @@ from django.contrib.auth.models import User
 from django.contrib.contenttypes.fields import GenericRelation
 from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
-from django.core.files.storage import default_storage
 from apps.dataset.models import University
 from apps.comment.models import Comment
 from apps.like.models import Like
 from apps.bookmark.models import Bookmark
+from apps.common.image_jobs import enqueue_image_job, image_job_handler
 from datetime import datetime
 import os
 
@@ -166,6 +166,11 @@ class ConfessionModel(models.Model):
     updated_at = models.DateTimeField(auto_now=True, verbose_name="Güncellenme Tarihi")
     is_active = models.BooleanField(default=True, verbose_name="Aktif")
     is_privacy = models.BooleanField(default=True, verbose_name="Gizlilik")
+    
+    # Denormalize sayaçlar (Like / Comment / Bookmark oluşturma ve silme yollarında güncellenir)
+    like_count = models.PositiveIntegerField(default=0, verbose_name="Beğeni Sayısı")
+    comment_count = models.PositiveIntegerField(default=0, verbose_name="Yorum Sayısı")
+    bookmark_count = models.PositiveIntegerField(default=0, verbose_name="Yer İmi Sayısı")
 
     class Meta:
         verbose_name = "İtiraf"
@@ -205,7 +210,7 @@ class ConfessionModel(models.Model):
     
     def get_like_count(self):
         """Returns the number of likes this confession has"""
-        return self.likes.count()
+        return self.like_count
     
     def is_liked_by(self, user):
         """Checks if this confession is liked by the given user"""
@@ -215,7 +220,7 @@ class ConfessionModel(models.Model):
     
     def get_bookmark_count(self):
         """Returns the number of bookmarks this confession has"""
-        return self.bookmarks.count()
+        return self.bookmark_count
 
     def is_bookmarked_by(self, user):
         """Checks if this confession is bookmarked by the given user"""
@@ -224,8 +229,8 @@ class ConfessionModel(models.Model):
         return self.bookmarks.filter(user=user).exists()
     
     def get_comment_count(self):
-        """Returns the number of comments this confession has"""
-        return self.comments.count()
+        """Returns the number of active comments this confession has"""
+        return self.comment_count
     
     def is_visible_to_user(self, user):
         """Checks if this confession is visible to the given user"""
@@ -299,14 +304,11 @@ class ConfessionModel(models.Model):
     def get_trending_confessions(cls, limit=10):
         """Returns confessions with most likes in the last 24 hours"""
         from django.utils import timezone
-        from django.db.models import Count
         
         last_24h = timezone.now() - timezone.timedelta(hours=24)
         return cls.objects.filter(
             created_at__gte=last_24h,
             is_active=True
-        ).annotate(
-            like_count=Count('likes')
         ).order_by('-like_count')[:limit]
     
     @classmethod
@@ -353,70 +355,65 @@ class ConfessionFilter(models.Model):
 
 @receiver(post_delete, sender=ConfessionImage)
 def delete_confession_image_files(sender, instance, **kwargs):
-    """Confession resmi silindiğinde tüm boyutları sil"""
-    for field_name in ['image', 'thumbnail', 'medium', 'large']:
-        field = getattr(instance, field_name)
-        if field and default_storage.exists(field.name):
-            default_storage.delete(field.name)
+    """Confession resmi silindiğinde tüm boyutları sil (paylaşılan boyutlar son referansta silinir)"""
+    from apps.common.rendition_store import release_files
+
+    release_files(
+        getattr(instance, field_name).name
+        for field_name in ['image', 'thumbnail', 'medium', 'large']
+    )
+
+
+@image_job_handler(ConfessionImage)
+def process_confession_image_renditions(instance):
+    """
+    Confession resminin boyutlarını oluştur (process_image_jobs worker'ı tarafından çalıştırılır)
+    """
+    if instance.processed or not instance.image:
+        return
+
+    from apps.common.rendition_store import get_renditions
+    from apps.common.utils.image_processor import ImageProcessor
+    from PIL import Image
+
+    processor = ImageProcessor()
+
+    # Image bilgilerini kaydet
+    with Image.open(instance.image.path) as img:
+        instance.original_width = img.width
+        instance.original_height = img.height
+        instance.file_size = instance.image.size
+        instance.format = 'WEBP' if processor.webp_supported else 'JPEG'
+
+    # Aynı resim daha önce yüklendiyse boyutları depodan paylaşılır, işlenmez
+    [(image_hash, saved_files)] = get_renditions(
+        [instance.image],
+        size_presets=['thumbnail', 'medium', 'large'],
+        context='confession'
+    )
+    if not saved_files:
+        raise ValueError(f"Confession image {instance.pk} could not be processed")
+    instance.hash = image_hash
+
+    # Update model fields
+    if 'thumbnail' in saved_files:
+        instance.thumbnail.name = saved_files['thumbnail']
+    if 'medium' in saved_files:
+        instance.medium.name = saved_files['medium']
+    if 'large' in saved_files:
+        instance.large.name = saved_files['large']
+
+    instance.processed = True
+    instance.save(update_fields=[
+        'thumbnail', 'medium', 'large', 'processed',
+        'original_width', 'original_height', 'file_size', 'format', 'hash'
+    ])
 
 
 @receiver(post_save, sender=ConfessionImage)
 def process_confession_image(sender, instance, created, **kwargs):
     """
-    Confession resmi kaydedildiğinde otomatik olarak işle
+    Confession resmi kaydedildiğinde işleme kuyruğuna ekle
     """
     if created and not instance.processed:
-        # Asenkron işleme için Celery task'i çağırabilir
-        # Şimdilik basit synchronous işleme yapıyoruz
-        try:
-            from apps.common.utils.image_processor import ImageProcessor
-            from PIL import Image
-            
-            # Original image'ı aç
-            if instance.image:
-                processor = ImageProcessor()
-                
-                # Image bilgilerini kaydet
-                with Image.open(instance.image.path) as img:
-                    instance.original_width = img.width
-                    instance.original_height = img.height
-                    instance.file_size = instance.image.size
-                    instance.format = 'WEBP' if processor.webp_supported else 'JPEG'
-                
-                # Process image
-                processed_images = processor.process_image(
-                    instance.image,
-                    size_presets=['thumbnail', 'medium', 'large'],
-                    context='confession'
-                )
-                
-                # Save processed images to model fields
-                from datetime import datetime
-                now = datetime.now()
-                date_path = f'confessions/{now.year}/{now.month:02d}/{now.day:02d}/{instance.confession.pk}/'
-                
-                saved_files = processor.save_processed_images(
-                    processed_images,
-                    instance.image.name,
-                    date_path
-                )
-                
-                # Update model fields
-                if 'thumbnail' in saved_files:
-                    instance.thumbnail.name = saved_files['thumbnail']
-                if 'medium' in saved_files:
-                    instance.medium.name = saved_files['medium']
-                if 'large' in saved_files:
-                    instance.large.name = saved_files['large']
-                
-                instance.processed = True
-                instance.save(update_fields=[
-                    'thumbnail', 'medium', 'large', 'processed',
-                    'original_width', 'original_height', 'file_size', 'format'
-                ])
-                
-        except Exception as e:
-            import logging
-            logger = logging.getLogger(__name__)
-            logger.error(f"Confession image processing failed: {e}")
-            # İşleme başarısız olursa orijinal resmi kullan
\ No newline at end of file
+        enqueue_image_job(instance)
@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import User
 from django.contrib.contenttypes.fields import GenericForeignKey
 from django.contrib.contenttypes.models import ContentType
@@ -6,6 +6,7 @@ from django.utils import timezone
 from django.db.models.signals import post_delete
 from django.dispatch import receiver
 from apps.notifications.services import NotificationService
+from apps.common.utils.counters import adjust_counter
 
 class Like(models.Model):
     """Generic like model that can be used for any object"""
@@ -32,8 +33,11 @@ class Like(models.Model):
         # Check if this is a new like (not an update)
         is_new = self.pk is None
         
-        # Save the like
-        super().save(*args, **kwargs)
+        # Save the like and bump the content's like counter in the same transaction
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if is_new:
+                adjust_counter(self.content_type_id, self.object_id, 'like_count', 1)
         
         # Send notification only if this is a new like and not from the content owner
         if is_new:
@@ -51,3 +55,11 @@ def delete_like_notification(sender, instance, **kwargs):
     """
     # NotificationService kullanarak bildirim sil
     NotificationService.delete_notification_by_object(instance)
+
+
+@receiver(post_delete, sender=Like)
+def decrement_like_count(sender, instance, **kwargs):
+    """
+    Beğeni silindiğinde içeriğin beğeni sayacını azalt (silme transaction'ı içinde çalışır)
+    """
+    adjust_counter(instance.content_type_id, instance.object_id, 'like_count', -1)
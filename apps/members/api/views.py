@@ -4,10 +4,11 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Q
 from django.contrib.auth.models import User
 
 from apps.profiles.models import Profile
+from apps.profiles.search import apply_people_search
+from apps.profiles.visibility import VisibilityService
 from apps.dataset.models import University, Department, GraduationStatus
 from ..models import UserMemberFilter
 from .serializers import (
@@ -35,26 +36,11 @@ class MemberListAPIView(generics.ListAPIView):
             'user', 'university', 'department', 'graduation_status'
         )
         
-        # Engellediğim ve beni engelleyen kullanıcıları filtreleme (düzeltilmiş)
-        try:
-            if self.request.user.is_authenticated:
-                user_profile = self.request.user.profile
-                
-                # Benim engellediğim kullanıcıları filtrele (Daha verimli sorgu)
-                blocked_users_ids = user_profile.blocked.values_list('user_id', flat=True)
-                queryset = queryset.exclude(user_id__in=blocked_users_ids)
-                
-                # Beni engelleyen kullanıcıları filtrele (Daha verimli sorgu)
-                blocked_by_users_ids = Profile.objects.filter(
-                    blocked=user_profile
-                ).values_list('user_id', flat=True)
-                queryset = queryset.exclude(user_id__in=blocked_by_users_ids).exclude(user_id=self.request.user.id)
-                
-                # Distinct kullanarak olası duplikasyonları önle
-                queryset = queryset.distinct()
-                
-        except Profile.DoesNotExist:
-            pass
+        # Engellediğim ve beni engelleyen kullanıcıları filtrele (gizli profiller listelenir)
+        if self.request.user.is_authenticated:
+            queryset = VisibilityService.for_request(self.request).filter_queryset(
+                queryset, exclude_private=False
+            ).exclude(user_id=self.request.user.id)
         
         # URL parametrelerinden filtreleme
         first_name = self.request.query_params.get('first_name')
@@ -67,23 +53,9 @@ class MemberListAPIView(generics.ListAPIView):
         if last_name:
             queryset = queryset.filter(user__last_name__icontains=last_name)
         
-        if name:
-            # Ad ve soyad birleşik arama
-            parts = name.split()
-            if len(parts) == 1:
-                # Tek kelime girildiyse hem ad hem soyad içinde ara
-                queryset = queryset.filter(
-                    Q(user__first_name__icontains=parts[0]) | 
-                    Q(user__last_name__icontains=parts[0])
-                )
-            else:
-                # İlk kelime ad, diğer kelimeler soyad olarak düşün
-                first_name = parts[0]
-                last_name = ' '.join(parts[1:])
-                queryset = queryset.filter(
-                    Q(user__first_name__icontains=first_name) & 
-                    Q(user__last_name__icontains=last_name)
-                )
+        if name and name.strip():
+            # Ad ve soyad birleşik arama (kişi arama index'i, en iyi eşleşmeler önce)
+            queryset = apply_people_search(queryset, name, user_field='user__')
         
         return queryset
     
@@ -3,6 +3,7 @@ import django_filters
 from apps.profiles.models import Profile
 from django.contrib.auth.models import User
 from apps.dataset.models import University, Department, GraduationStatus
+from apps.profiles.search import apply_people_search
 from .models import UserMemberFilter
 
 class MemberFilter(django_filters.FilterSet):
@@ -55,25 +56,11 @@ class MemberFilter(django_filters.FilterSet):
     
     def filter_by_name(self, queryset, name, value):
         """
-        Ad veya soyada göre filtreleme metodu
+        Ad veya soyada göre filtreleme metodu (kişi arama index'i, en iyi eşleşmeler önce)
         """
-        if value:
-            parts = value.split()
-            if len(parts) == 1:
-                # Sadece tek kelime girilmişse hem ad hem soyad içinde ara
-                return queryset.filter(
-                    user__first_name__icontains=parts[0]
-                ) | queryset.filter(
-                    user__last_name__icontains=parts[0]
-                )
-            else:
-                # Birden fazla kelime girilmişse ilk kelimeyi ad, kalanları soyad olarak düşün
-                first_name = parts[0]
-                last_name = ' '.join(parts[1:])
-                return queryset.filter(
-                    user__first_name__icontains=first_name,
-                    user__last_name__icontains=last_name
-                )
+        if value and value.strip():
+            # Her kelime ad, soyad ya da kullanıcı adında geçmeli (Türkçe karakter duyarsız)
+            return apply_people_search(queryset, value, user_field='user__')
         return queryset
     
     def save_preferences(self, user):
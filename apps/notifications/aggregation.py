@@ -0,0 +1,176 @@
+"""
+Aynı hedefe gelen aynı türdeki bildirimlerin birleştirilmesi.
+
+Popüler bir gönderiye gelen her beğeni için ayrı satır, WebSocket olayı ve push
+üretmek yerine, alıcının aynı hedef (gönderi, itiraf, yorum) için açık bir
+bildirim penceresi (NOTIFICATION_AGGREGATE_WINDOW) varken gelen yeni bildirim
+mevcut satıra eklenir: "ali ve 41 kişi daha gönderinizi beğendi".
+
+- Pencere bildirimi oluşturan işlemle (ör. beğeni) açılır; bildirim okunursa yeni
+  bildirim yeni bir satır (ve pencere) başlatır
+- Kişi sayısı artırılıp azaltılmaz, her seferinde penceredeki işlemlerden (hedefi
+  beğenen farklı kişiler) hesaplanır: geri alıp tekrar beğenmek sayıyı değiştirmez,
+  bildirimin göstermediği bir beğeninin silinmesi sayıyı düşürür
+- Push sadece pencereyi açan bildirim için gönderilir
+- Gerçek zamanlı güncelleme olayı en fazla NOTIFICATION_EMIT_INTERVAL saniyede bir gönderilir
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+NOTIFICATION_AGGREGATE_CODES = getattr(
+    settings, 'NOTIFICATION_AGGREGATE_CODES',
+    ('post_like', 'confession_like', 'comment_like', 'reply_like')
+)
+NOTIFICATION_AGGREGATE_WINDOW = getattr(settings, 'NOTIFICATION_AGGREGATE_WINDOW', 60 * 60)  # 1 saat
+NOTIFICATION_EMIT_INTERVAL = getattr(settings, 'NOTIFICATION_EMIT_INTERVAL', 30)  # saniye
+
+
+def _emit_key(notification_id):
+    return f"notification_emit_{notification_id}"
+
+
+def is_aggregatable(code):
+    return code in NOTIFICATION_AGGREGATE_CODES
+
+
+def window_end(start=None):
+    """Pencerenin sonu; start verilmezse pencere şimdi açılır"""
+    return (start or timezone.now()) + timedelta(seconds=NOTIFICATION_AGGREGATE_WINDOW)
+
+
+def window_start(notification):
+    return notification.aggregate_until - timedelta(seconds=NOTIFICATION_AGGREGATE_WINDOW)
+
+
+def window_actions(notification):
+    """Bildirimin penceresinde hedefe yapılan işlemler (ör. beğeniler); alıcının kendi işlemleri hariç"""
+    return notification.content_type.model_class().objects.filter(
+        content_type_id=notification.parent_content_type_id,
+        object_id=notification.parent_object_id,
+        created_at__gte=window_start(notification),
+        created_at__lt=notification.aggregate_until,
+    ).exclude(user_id=notification.recipient_id)
+
+
+def count_actors(actions):
+    """İşlemleri yapan farklı kişi sayısı"""
+    return actions.order_by().values('user_id').distinct().count()
+
+
+def aggregated_text(text, sender, actor_count):
+    """'ali gönderinizi beğendi.' -> 'ali ve 41 kişi daha gönderinizi beğendi.'"""
+    if actor_count <= 1:
+        return text
+    return text.replace(sender.username, f"{sender.username} ve {actor_count - 1} kişi daha", 1)
+
+
+def mark_emitted(notification):
+    """Gerçek zamanlı olay gönderildi; sonraki güncellemeler aralık dolana kadar bekler"""
+    cache.set(_emit_key(notification.pk), True, NOTIFICATION_EMIT_INTERVAL)
+
+
+def emit_update(notification):
+    """Birleştirilen bildirimin güncel halini hız sınırıyla WebSocket'e gönderir"""
+    if cache.add(_emit_key(notification.pk), True, NOTIFICATION_EMIT_INTERVAL):
+        notification.send_notification()
+
+
+def aggregate_notification(sender, recipient, notification_type, text, url,
+                           content_type, object_id, parent_content_type, parent_object_id,
+                           content_object=None, parent_content_object=None):
+    """
+    Alıcının aynı hedef için açık penceresi varsa bildirimi oraya ekler.
+
+    Returns:
+        Notification: Güncellenen bildirim; açık pencere yoksa None
+    """
+    from .models import Notification
+
+    if parent_content_type is None or parent_object_id is None:
+        return None
+
+    with transaction.atomic():
+        notification = Notification.objects.select_for_update().filter(
+            recipient=recipient,
+            notification_type=notification_type,
+            parent_content_type=parent_content_type,
+            parent_object_id=parent_object_id,
+            is_read=False,
+            aggregate_until__gt=timezone.now(),
+        ).order_by('-id').first()
+        if notification is None:
+            return None
+
+        notification.notification_type = notification_type
+        notification.sender = sender
+        notification.content_type = content_type
+        notification.object_id = object_id
+        # Yeni işlem zaten kaydedildi; sayıya dahildir
+        notification.actor_count = max(1, count_actors(window_actions(notification)))
+        notification.text = aggregated_text(text, sender, notification.actor_count)
+        notification.url = url
+        notification.created_at = timezone.now()  # Listede en üste çıkar
+        notification.payload = notification.build_payload(content_object, parent_content_object)
+        notification.save(update_fields=[
+            'actor_count', 'sender', 'content_type', 'object_id', 'text', 'url', 'created_at',
+            'payload', 'updated_at'
+        ])
+
+    emit_update(notification)
+    return notification
+
+
+def counted_notifications(removed_object):
+    """
+    Silinen işlemin (ör. beğeni) sayıldığı birleştirilmiş bildirimler: işlemi gösteren
+    bildirim ve penceresi işlemin zamanını kapsayan, aynı hedefe ait bildirimler
+    """
+    from .models import Notification
+
+    content_type = ContentType.objects.get_for_model(removed_object)
+    counted = Q(content_type=content_type, object_id=removed_object.pk)
+    created_at = getattr(removed_object, 'created_at', None)
+    if created_at and getattr(removed_object, 'content_type_id', None):
+        counted |= Q(
+            content_type=content_type,
+            parent_content_type_id=removed_object.content_type_id,
+            parent_object_id=removed_object.object_id,
+            aggregate_until__gt=created_at,
+            aggregate_until__lte=window_end(created_at),
+        )
+    return Notification.objects.filter(counted, aggregate_until__isnull=False)
+
+
+def remove_actor(notification, removed_object):
+    """
+    Birleştirilmiş bildirimin saydığı bir işlem (ör. beğeni) silindi: sayı penceredeki kalan
+    işlemlerden yeniden hesaplanır. Bildirim silinen işlemi gösteriyorsa penceredeki bir
+    önceki işleme ve sahibine taşınır. Pencerede işlem kalmadıysa bildirim silinir.
+    """
+    from .models import get_defaults_by_code
+
+    actions = window_actions(notification).exclude(pk=removed_object.pk)
+    latest = actions.select_related('user').order_by('-pk').first()
+    if latest is None:
+        notification.delete()
+        return
+
+    update_fields = ['actor_count', 'text', 'updated_at']
+    notification.actor_count = max(1, count_actors(actions))
+    if notification.object_id != latest.pk:
+        notification.sender = latest.user
+        notification.object_id = latest.pk
+        notification.payload = notification.build_payload(latest)
+        update_fields += ['sender', 'object_id', 'payload']
+    notification.text = aggregated_text(
+        get_defaults_by_code(notification.notification_type.code, notification.sender)['text'],
+        notification.sender,
+        notification.actor_count,
+    )
+    notification.save(update_fields=update_fields)
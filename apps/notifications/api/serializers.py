@@ -1,6 +1,8 @@
 from rest_framework import serializers
 from django.contrib.auth.models import User
+from django.contrib.contenttypes.models import ContentType
 from apps.notifications.models import Notification, NotificationType
+from apps.notifications.registry import get_notification_type_by_id
 
 
 class UserMinimalSerializer(serializers.ModelSerializer):
@@ -31,7 +33,7 @@ class NotificationTypeSerializer(serializers.ModelSerializer):
 class NotificationSerializer(serializers.ModelSerializer):
     """Serializer for notifications"""
     sender = UserMinimalSerializer(read_only=True)
-    notification_type = NotificationTypeSerializer(read_only=True)
+    notification_type = serializers.SerializerMethodField()
     content_type_name = serializers.SerializerMethodField()
     parent_content_type_name = serializers.SerializerMethodField()
     # Add origin content fields to track the root content (usually a post)
@@ -53,6 +55,7 @@ class NotificationSerializer(serializers.ModelSerializer):
             'is_read', 
             'read_at', 
             'created_at',
+            'actor_count',
             'content_type',
             'object_id',
             'content_type_name',
@@ -65,25 +68,35 @@ class NotificationSerializer(serializers.ModelSerializer):
             'reply_parent_id'
         )
     
+    def _notification_type(self, obj):
+        # Bildirim türleri süreç içi kayıttan okunur (satır başına sorgu yok)
+        return get_notification_type_by_id(obj.notification_type_id)
+
+    def get_notification_type(self, obj):
+        return NotificationTypeSerializer(self._notification_type(obj)).data
+
     def get_content_type_name(self, obj):
         """Nesnenin model adını döndürür (ör: 'comment', 'like')"""
-        if obj.content_type:
-            return obj.content_type.model
+        if obj.content_type_id:
+            return ContentType.objects.get_for_id(obj.content_type_id).model
         return None
         
     def get_parent_content_type_name(self, obj):
         """Ana nesnenin model adını döndürür (ör: 'post', 'event')"""
-        if obj.parent_content_type:
-            return obj.parent_content_type.model
+        if obj.parent_content_type_id:
+            return ContentType.objects.get_for_id(obj.parent_content_type_id).model
         return None
         
     def get_origin_content_type(self, obj):
         """Orijinal içeriğin (genellikle post) content type ID'sini döndürür"""
         # For comment likes, we need to determine what post the comment belongs to
-        if obj.notification_type and obj.notification_type.code in ['comment_like', 'reply_like']:
-            from django.contrib.contenttypes.models import ContentType
+        if self._notification_type(obj).code in ['comment_like', 'reply_like']:
             from apps.comment.models import Comment
             
+            # Bildirim oluşturulurken hesaplanmış veri
+            if 'origin_content_type' in obj.payload:
+                return obj.payload['origin_content_type']
+            
             # If the parent is a comment
             if obj.parent_content_type and obj.parent_content_type.model == 'comment':
                 try:
@@ -96,14 +109,18 @@ class NotificationSerializer(serializers.ModelSerializer):
                     pass
         
         # For notifications already having the right parent content (like post_like, comment)
-        return obj.parent_content_type.id if obj.parent_content_type else None
+        return obj.parent_content_type_id
     
     def get_origin_object_id(self, obj):
         """Orijinal içeriğin (genellikle post) ID'sini döndürür"""
         # For comment likes, get the post ID the comment belongs to
-        if obj.notification_type and obj.notification_type.code in ['comment_like', 'reply_like']:
+        if self._notification_type(obj).code in ['comment_like', 'reply_like']:
             from apps.comment.models import Comment
             
+            # Bildirim oluşturulurken hesaplanmış veri
+            if 'origin_object_id' in obj.payload:
+                return obj.payload['origin_object_id']
+            
             # If the parent is a comment
             if obj.parent_content_type and obj.parent_content_type.model == 'comment':
                 try:
@@ -121,9 +138,8 @@ class NotificationSerializer(serializers.ModelSerializer):
         """Orijinal içeriğin (genellikle post) model adını döndürür"""
         origin_type_id = self.get_origin_content_type(obj)
         if origin_type_id:
-            from django.contrib.contenttypes.models import ContentType
             try:
-                content_type = ContentType.objects.get(id=origin_type_id)
+                content_type = ContentType.objects.get_for_id(origin_type_id)
                 return content_type.model
             except ContentType.DoesNotExist:
                 pass
@@ -131,8 +147,12 @@ class NotificationSerializer(serializers.ModelSerializer):
         
     def get_reply_parent_id(self, obj):
         """Yanıt beğenisinde, beğenilen yanıtın bağlı olduğu ana yorumun ID'sini döndürür"""
+        # Bildirim oluşturulurken hesaplanmış veri
+        if 'reply_parent_id' in obj.payload:
+            return obj.payload['reply_parent_id']
+        
         # Sadece reply_like bildirimleri için bu işlemi yap
-        if obj.notification_type.code == 'reply_like':
+        if self._notification_type(obj).code == 'reply_like':
             try:
                 from apps.like.models import Like
                 from apps.comment.models import Comment
@@ -150,7 +170,7 @@ class NotificationSerializer(serializers.ModelSerializer):
                         return reply.parent_id
             except Exception as e:
                 print(f"Reply parent ID alınırken hata: {e}")
-        elif obj.notification_type.code == 'comment_reply':
+        elif self._notification_type(obj).code == 'comment_reply':
             from apps.comment.models import Comment
 
             try:
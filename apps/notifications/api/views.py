@@ -5,6 +5,7 @@ from django.utils import timezone
 from apps.notifications.models import Notification, NotificationType
 from .serializers import NotificationSerializer, NotificationTypeSerializer
 from apps.notifications.services import NotificationService
+from apps.common.pagination import OptInCursorPagination
 from rest_framework.exceptions import NotFound
 
 
@@ -12,6 +13,7 @@ class NotificationViewSet(viewsets.ReadOnlyModelViewSet):
     """Viewset for handling notification operations"""
     serializer_class = NotificationSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = OptInCursorPagination
     
     def get_queryset(self):
         """Return notifications belonging to the current user"""
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.1 on 2026-10-18 17:19
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('notifications', '0005_notification_notificatio_recipie_e86c4c_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notification',
+            name='actor_count',
+            field=models.PositiveIntegerField(default=1, verbose_name='Kişi Sayısı'),
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='aggregate_until',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Birleştirme Penceresi Sonu'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['recipient', 'parent_content_type', 'parent_object_id', 'notification_type'], name='notificatio_recipie_75ac13_idx'),
+        ),
+    ]
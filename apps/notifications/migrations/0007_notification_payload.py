@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-18 17:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0006_notification_aggregation'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notification',
+            name='payload',
+            field=models.JSONField(blank=True, default=dict, verbose_name='Bildirim Verisi'),
+        ),
+    ]
@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import User
 from django.contrib.contenttypes.fields import GenericForeignKey
 from django.contrib.contenttypes.models import ContentType
@@ -6,6 +6,10 @@ from django.utils import timezone
 from asgiref.sync import async_to_sync
 from channels.layers import get_channel_layer
 import json
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .aggregation import aggregate_notification, is_aggregatable, mark_emitted, window_end
+from .registry import get_notification_type, invalidate_notification_types
 
 class NotificationType(models.Model):
     """Bildirim türlerini tanımlayan model"""
@@ -21,6 +25,13 @@ class NotificationType(models.Model):
         verbose_name = "Bildirim Türü"
         verbose_name_plural = "Bildirim Türleri"
 
+
+@receiver(post_save, sender=NotificationType)
+@receiver(post_delete, sender=NotificationType)
+def invalidate_notification_type_registry(sender, **kwargs):
+    """Bildirim türü eklendi/düzenlendi/silindi: süreç içi kaydı temizle"""
+    invalidate_notification_types()
+
 class Notification(models.Model):
     """Kullanıcı bildirimlerini saklayan ana model"""
     # Bildirimi alan kullanıcı
@@ -50,6 +61,13 @@ class Notification(models.Model):
     # Bildirim URL'i (tıklandığında yönlendirilecek sayfa)
     url = models.CharField(max_length=255, blank=True, null=True, verbose_name="URL")
     
+    # Birleştirilmiş bildirimler ("ali ve 41 kişi daha ...")
+    actor_count = models.PositiveIntegerField(default=1, verbose_name="Kişi Sayısı")
+    aggregate_until = models.DateTimeField(null=True, blank=True, verbose_name="Birleştirme Penceresi Sonu")
+    
+    # Gerçek zamanlı bildirim verisi (oluşturulurken bir kez hesaplanır, id ve created_at hariç)
+    payload = models.JSONField(default=dict, blank=True, verbose_name="Bildirim Verisi")
+    
     # Bildirim durumu
     is_read = models.BooleanField(default=False, verbose_name="Okundu mu?")
     read_at = models.DateTimeField(null=True, blank=True, verbose_name="Okunma Zamanı")
@@ -71,142 +89,149 @@ class Notification(models.Model):
     def save(self, *args, **kwargs):
         """Bildirim kaydedildiğinde WebSocket üzerinden bildirim gönder"""
         is_new = self.pk is None
-        super().save(*args, **kwargs)
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if is_new:
+                # Push, bildirimle aynı transaction içinde outbox'a yazılır
+                self.send_push_notification()
         
         if is_new:  # Yeni bildirim oluşturulduğunda
             self.send_notification()
     
-    def send_notification(self):
-        """WebSocket üzerinden bildirim gönder"""
-        if self.sender.profile.avatar:
-            avatar_url = self.sender.profile.avatar.url
-        else:
-            avatar_url = None
-        channel_layer = get_channel_layer()
-        
-        # Django'daki timezone ayarlarını kullanarak oluşturma zamanını alıyoruz
-        # Bu created_at değeri zaten Django ayarlarınızdaki TIME_ZONE='Europe/Istanbul' ayarını kullanıyor
-        # ancak isoformat() metodu UTC olarak çevirebiliyor, bu yüzden astimezone() kullanıyoruz
-        localized_datetime = timezone.localtime(self.created_at)
+    def _get_comment(self, comment_id, loaded=None):
+        """Yorumu elimizdeki nesneden alır, yoksa veritabanından yükler"""
+        from apps.comment.models import Comment
 
-        notification_data = {
-            'id': self.id,
+        if isinstance(loaded, Comment) and loaded.pk == comment_id:
+            return loaded
+        return Comment.objects.filter(id=comment_id).first()
+    
+    def build_payload(self, content_object=None, parent_content_object=None):
+        """
+        WebSocket'e gönderilen bildirim verisini (id ve created_at hariç) hesaplar.
+        Bildirim oluşturulurken elimizdeki içerik nesneleri verilir; böylece tür bazlı
+        ek alanlar için tekrar sorgu yapılmaz. Sonuç `payload` alanında saklanır.
+        """
+        sender = self.sender
+        profile = getattr(sender, 'profile', None) if sender else None
+        notification_type = self.notification_type
+        code = notification_type.code if notification_type else None
+        parent_content_type_name = (
+            ContentType.objects.get_for_id(self.parent_content_type_id).model
+            if self.parent_content_type_id else None
+        )
+
+        payload = {
             'title': self.title,
             'text': self.text,
             'url': self.url,
-            'sender': {'id': self.sender.id if self.sender else None,
-                       'username': self.sender.username if self.sender else None},
-            'icon_class': self.notification_type.icon_class,
-            'created_at': localized_datetime.isoformat(),  # Yerel saat dilimindeki ISO formatını kullan
-            'avatar': avatar_url,
+            'sender': {'id': sender.id if sender else None,
+                       'username': sender.username if sender else None},
+            'icon_class': notification_type.icon_class if notification_type else None,
+            'avatar': profile.avatar.url if profile and profile.avatar else None,
             'notification_type': {
-                    'code': self.notification_type.code if self.notification_type else None,
-                    'name': self.notification_type.name if self.notification_type else None,
-                },
-            'code': self.notification_type.code if self.notification_type else None,
+                'code': code,
+                'name': notification_type.name if notification_type else None,
+            },
+            'code': code,
+            'actor_count': self.actor_count,
         }
 
-        if self.notification_type.code == "comment":
-            data = {
-                'parent_content_type_name' : self.parent_content_type.model if self.parent_content_type else None,
-                'parent_object_id' : self.parent_object_id,
-                'object_id' : self.object_id,
-            }
-            notification_data.update(data)
+        if code == "comment":
+            payload.update({
+                'parent_content_type_name': parent_content_type_name,
+                'parent_object_id': self.parent_object_id,
+                'object_id': self.object_id,
+            })
 
-        elif self.notification_type.code == "comment_reply":
-            from apps.comment.models import Comment
-            reply = Comment.objects.get(id=self.object_id)
+        elif code == "comment_reply":
+            reply = self._get_comment(self.object_id, content_object)
+            payload.update({
+                'object_id': self.object_id,
+                'reply_parent_id': reply.parent_id if reply else None,
+                'origin_object_id': reply.object_id if reply else None,
+                'content_type': self.content_type_id,
+                'origin_content_type': reply.content_type_id if reply else None,
+            })
 
-            data = {
-                'object_id' : self.object_id,
-                'reply_parent_id' : reply.parent_id if reply else None,
-                'origin_object_id' : reply.object_id if reply else None,
-                'content_type' : self.content_type.id if self.content_type else None,
-                'origin_content_type' : reply.content_type.id if reply else None,
-            }
-            notification_data.update(data)
+        elif code in ("post_like", "confession_like"):
+            payload.update({
+                'parent_content_type_name': parent_content_type_name,
+                'parent_object_id': self.parent_object_id,
+            })
 
-        elif self.notification_type.code == "post_like":
-            data = {
-                'parent_content_type_name' : self.parent_content_type.model if self.parent_content_type else None,
-                'parent_object_id' : self.parent_object_id,
-            }
-            notification_data.update(data)
+        elif code == "comment_like":
+            comment = self._get_comment(self.parent_object_id, parent_content_object)
+            payload.update({
+                'origin_content_type': comment.content_type_id if comment else None,
+                'origin_content_type_name': ContentType.objects.get_for_id(comment.content_type_id).model if comment else None,
+                'origin_object_id': comment.object_id if comment else None,
+                'parent_object_id': self.parent_object_id,
+            })
 
-        elif self.notification_type.code == "confession_like":
-            data = {
-                'parent_content_type_name' : self.parent_content_type.model if self.parent_content_type else None,
-                'parent_object_id' : self.parent_object_id,
-            }
-            notification_data.update(data)
+        elif code == "reply_like":
+            reply = self._get_comment(self.parent_object_id, parent_content_object)
+            payload.update({
+                'parent_object_id': self.parent_object_id,
+                'reply_parent_id': reply.parent_id if reply else None,
+                'origin_object_id': reply.object_id if reply else None,
+                'parent_content_type': self.content_type_id,
+                'origin_content_type': reply.content_type_id if reply else None,
+                'origin_content_type_name': ContentType.objects.get_for_id(reply.content_type_id).model if reply else None,
+            })
 
-        elif self.notification_type.code == "comment_like":
-            from apps.comment.models import Comment
-            comment = Comment.objects.get(id=self.parent_object_id)
+        return payload
+    
+    def send_notification(self):
+        """WebSocket üzerinden bildirim gönder"""
+        channel_layer = get_channel_layer()
+        
+        # Django'daki timezone ayarlarını kullanarak oluşturma zamanını alıyoruz
+        # Bu created_at değeri zaten Django ayarlarınızdaki TIME_ZONE='Europe/Istanbul' ayarını kullanıyor
+        # ancak isoformat() metodu UTC olarak çevirebiliyor, bu yüzden astimezone() kullanıyoruz
+        localized_datetime = timezone.localtime(self.created_at)
 
-            data = {
-                'origin_content_type_name' : comment.content_type.model if comment.content_type else None,
-                'origin_object_id' : comment.object_id,
-                'parent_object_id' : comment.id,
-            }
-            notification_data.update(data)
+        notification_data = {
+            'id': self.id,
+            **(self.payload or self.build_payload()),
+            'created_at': localized_datetime.isoformat(),  # Yerel saat dilimindeki ISO formatını kullan
+        }
 
-        elif self.notification_type.code == "reply_like":
-            from apps.comment.models import Comment
-            reply = Comment.objects.get(id=self.parent_object_id)
-            print('deneme', reply.content_type.model)
-            data = {
-                'parent_object_id' : reply.id,
-                'reply_parent_id' : reply.parent_id if reply else None,
-                'origin_object_id' : reply.object_id if reply else None,
-                'parent_content_type' : self.content_type.id if self.content_type else None,
-                'origin_content_type' : reply.content_type.id if reply else None,
-                'origin_content_type_name' : reply.content_type.model if reply else None,
-            }
-            notification_data.update(data)        # Alıcı kullanıcının bildirim kanalına mesaj gönder
+        # Alıcı kullanıcının bildirim kanalına mesaj gönder
         async_to_sync(channel_layer.group_send)(
-            f"user_{self.recipient.id}_notifications",
+            f"user_{self.recipient_id}_notifications",
             {
                 'type': 'notification_message',
                 'message': notification_data
             }
         )
-        
-        # Push notification gönder (uygulama kapalıyken için)
-        self.send_push_notification()
     
     def send_push_notification(self):
-        """Push notification gönder"""
-        try:
-            from apps.push_notifications.services import firebase_service
-            
-            # Kullanıcıya push notification gönder
-            success = firebase_service.send_notification(
-                user_id=self.recipient.id,
-                title=self.title,
-                body=self.text,
-                data={
-                    'type': 'notification',
-                    'notification_id': self.id,
-                    'code': self.notification_type.code if self.notification_type else None,
-                    'url': self.url,
-                    'sender_id': self.sender.id if self.sender else None
-                }
-            )
-            
-            if success:
-                print(f"Push notification sent successfully to user {self.recipient.id}")
-            else:
-                print(f"Failed to send push notification to user {self.recipient.id}")
-                
-        except Exception as e:
-            print(f"Error sending push notification: {str(e)}")
+        """Push notification'ı outbox'a yazar; worker commit sonrası gönderir"""
+        from apps.push_notifications.outbox import enqueue_push
+
+        enqueue_push(
+            [self.recipient_id],
+            title=self.title,
+            body=self.text,
+            data={
+                'type': 'notification',
+                'notification_id': self.id,
+                'code': self.notification_type.code if self.notification_type else None,
+                'url': self.url,
+                'sender_id': self.sender_id
+            }
+        )
     
     class Meta:
         ordering = ['-created_at']
         verbose_name = "Bildirim"
         verbose_name_plural = "Bildirimler"
+        indexes = [
+            models.Index(fields=['recipient', '-created_at', '-id']),  # Keyset (cursor) sayfalama için
+            # Açık birleştirme penceresinin bulunması için
+            models.Index(fields=['recipient', 'parent_content_type', 'parent_object_id', 'notification_type']),
+        ]
 
 def get_defaults_by_code(code, sender):
     if "follow" == code:
@@ -319,10 +344,7 @@ def create_notifications(sender, recipient, code, content_object=None, parent_co
     """
     notification_info = get_defaults_by_code(code, sender)
 
-    notification_type, _ = NotificationType.objects.get_or_create(
-        code=code,
-        defaults= notification_info['defaults']
-    )
+    notification_type = get_notification_type(code, defaults=notification_info['defaults'])
     
     # URL yolunu bildirim türüne göre belirle
     url_path = f"/profile/{sender.username}/" 
@@ -414,6 +436,7 @@ def create_notifications(sender, recipient, code, content_object=None, parent_co
     
     # Ana içeriği bildirime bağla
     if parent_content_object:
+        parent_content = parent_content_object
         parent_content_type = ContentType.objects.get_for_model(parent_content_object)
         parent_content_type = parent_content_type
         parent_object_id = parent_content_object.id
@@ -427,17 +450,41 @@ def create_notifications(sender, recipient, code, content_object=None, parent_co
             parent_content_type = parent_content_type
             parent_object_id = parent_content.id
     
-    notification = Notification.objects.create(
+    content_type = content_type if content_object else None
+    object_id = object_id if content_object else None
+    parent_content_type = parent_content_type if parent_content else None
+    parent_object_id = parent_object_id if parent_content else None
+    
+    # Aynı hedefe gelen beğeniler açık penceredeki bildirimle birleştirilir
+    aggregatable = is_aggregatable(code)
+    if aggregatable:
+        notification = aggregate_notification(
+            sender, recipient, notification_type, notification_info['text'], url_path,
+            content_type, object_id, parent_content_type, parent_object_id,
+            content_object=content_object, parent_content_object=parent_content
+        )
+        if notification is not None:
+            return notification
+    
+    notification = Notification(
         recipient=recipient,
         sender=sender,
         notification_type=notification_type,
         title=notification_info['title'],
         text=notification_info['text'],
         url=url_path,
-        content_type=content_type if content_object else None,
-        object_id=object_id if content_object else None,
-        parent_content_type=parent_content_type if parent_content else None,
-        parent_object_id=parent_object_id if parent_content else None
+        content_type=content_type,
+        object_id=object_id,
+        parent_content_type=parent_content_type,
+        parent_object_id=parent_object_id,
+        # Pencere bildirimi oluşturan işlemin (ör. beğeni) zamanıyla açılır; sayım bu zamandan başlar
+        aggregate_until=(
+            window_end(getattr(content_object, 'created_at', None)) if aggregatable and parent_object_id else None
+        )
     )
+    notification.payload = notification.build_payload(content_object, parent_content)
+    notification.save()
+    if notification.aggregate_until:
+        mark_emitted(notification)
     return notification
 
@@ -0,0 +1,68 @@
+"""
+Süreç içi bildirim türü kaydı.
+
+Bildirim türleri (NotificationType) neredeyse hiç değişmez ama her bildirim
+oluşturma, silme ve serileştirmede kod ya da id ile okunuyordu. Tablo ilk
+erişimde tek sorguyla tamamen belleğe alınır; kod ve id ile aramalar sorgusuz yapılır.
+
+- Bilinmeyen kod ilk kullanımda varsayılanlarla oluşturulup kayda eklenir
+- Admin'den yapılan değişiklikler (post_save/post_delete) bu süreçteki kaydı temizler
+- Diğer süreçler (worker'lar, diğer uvicorn/daphne süreçleri) değişikliği en geç
+  NOTIFICATION_TYPE_REGISTRY_TIMEOUT saniye sonra görür
+"""
+import threading
+import time
+
+from django.conf import settings
+
+NOTIFICATION_TYPE_REGISTRY_TIMEOUT = getattr(settings, 'NOTIFICATION_TYPE_REGISTRY_TIMEOUT', 60 * 5)  # 5 dakika
+
+_lock = threading.Lock()
+_by_code = None
+_by_id = None
+_loaded_at = 0.0
+
+
+def _registry():
+    global _by_code, _by_id, _loaded_at
+    if _by_code is None or time.monotonic() - _loaded_at > NOTIFICATION_TYPE_REGISTRY_TIMEOUT:
+        from .models import NotificationType
+
+        with _lock:
+            types = list(NotificationType.objects.all())
+            _by_code = {notification_type.code: notification_type for notification_type in types}
+            _by_id = {notification_type.pk: notification_type for notification_type in types}
+            _loaded_at = time.monotonic()
+    return _by_code, _by_id
+
+
+def get_notification_type(code, defaults=None):
+    """
+    Koda göre bildirim türü. defaults verilmişse tür yoksa oluşturulur,
+    verilmemişse None döner.
+    """
+    by_code, by_id = _registry()
+    notification_type = by_code.get(code)
+    if notification_type is None and defaults is not None:
+        from .models import NotificationType
+
+        notification_type, _ = NotificationType.objects.get_or_create(code=code, defaults=defaults)
+        with _lock:
+            by_code[code] = notification_type
+            by_id[notification_type.pk] = notification_type
+    return notification_type
+
+
+def get_notification_type_by_id(pk):
+    """Id'ye göre bildirim türü (bilinmeyen id'de kayıt bir kez yenilenir)"""
+    notification_type = _registry()[1].get(pk)
+    if notification_type is None and pk is not None:
+        invalidate_notification_types()
+        notification_type = _registry()[1].get(pk)
+    return notification_type
+
+
+def invalidate_notification_types():
+    global _by_code, _by_id
+    with _lock:
+        _by_code = _by_id = None
@@ -1,6 +1,8 @@
 from django.contrib.auth.models import User
 from django.contrib.contenttypes.models import ContentType
+from .aggregation import counted_notifications, remove_actor
 from .models import Notification, create_notifications
+from .registry import get_notification_type
 
 
 class NotificationService:
@@ -38,16 +40,7 @@ class NotificationService:
         if sender == recipient:
             return None
 
-        notification = create_notifications(sender, recipient, code, content_object)
-
-        # Eğer parent_content_object verildiyse, bildirime ekle
-        if notification and parent_content_object:
-            parent_content_type = ContentType.objects.get_for_model(parent_content_object)
-            notification.parent_content_type = parent_content_type
-            notification.parent_object_id = parent_content_object.id
-            notification.save()
-        
-        return notification
+        return create_notifications(sender, recipient, code, content_object, parent_content_object)
     
     @staticmethod
     def create_follow_notification(follower, followed_user):
@@ -202,8 +195,7 @@ class NotificationService:
         
         # Eğer bildirim kodu belirtilmişse, o türdeki bildirimleri filtrele
         if code:
-            from .models import NotificationType
-            notification_type = NotificationType.objects.filter(code=code).first()
+            notification_type = get_notification_type(code)
             if notification_type:
                 notifications = notifications.filter(notification_type=notification_type)
         
@@ -233,9 +225,19 @@ class NotificationService:
             content_type=content_type,
             object_id=content_object.id
         )
+        
+        # Birleştirilmiş bildirimlerin sayısı kalan işlemlerden yeniden hesaplanır
+        # (nesneyi göstermeyen ama onu sayan bildirimler dahil); işlem kalmadıysa silinirler
+        aggregated = list(
+            counted_notifications(content_object).select_related('notification_type', 'sender', 'content_type')
+        )
+        for notification in aggregated:
+            remove_actor(notification, content_object)
+        
+        notifications = notifications.exclude(pk__in=[notification.pk for notification in aggregated])
         count = notifications.count()
         notifications.delete()
-        return count
+        return count + len(aggregated)
     
     @staticmethod
     def mark_as_read(notification_id, user):
@@ -1,3 +1,81 @@
-from django.test import TestCase
+from django.contrib.auth.models import User
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.test import TestCase, override_settings
 
-# Create your tests here.
+from apps.like.models import Like
+from apps.notifications.models import Notification
+from apps.notifications.registry import invalidate_notification_types
+from apps.post.models import Post
+
+
+@override_settings(CHANNEL_LAYERS={'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}})
+class LikeAggregationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        invalidate_notification_types()
+        self.owner = User.objects.create_user('sahip')
+        self.likers = {name: User.objects.create_user(name) for name in ('ali', 'ayse', 'can')}
+        self.post = Post.objects.create(user=self.owner, content='gönderi')
+        self.post_type = ContentType.objects.get_for_model(Post)
+
+    def like(self, name):
+        return Like.objects.create(user=self.likers[name], content_type=self.post_type, object_id=self.post.pk)
+
+    def unlike(self, name):
+        Like.objects.get(user=self.likers[name], content_type=self.post_type, object_id=self.post.pk).delete()
+
+    def notifications(self):
+        return list(Notification.objects.filter(recipient=self.owner).select_related('sender'))
+
+    def assert_single(self, actor_count, sender):
+        notifications = self.notifications()
+        self.assertEqual(len(notifications), 1)
+        self.assertEqual(notifications[0].actor_count, actor_count)
+        self.assertEqual(notifications[0].sender, self.likers[sender])
+        return notifications[0]
+
+    def test_likes_are_coalesced(self):
+        for name in ('ali', 'ayse', 'can'):
+            self.like(name)
+
+        notification = self.assert_single(3, 'can')
+        self.assertIn('can ve 2 kişi daha', notification.text)
+
+    def test_relike_is_not_counted_twice(self):
+        self.like('ali')
+        self.like('ayse')
+        self.unlike('ali')
+        self.like('ali')
+
+        self.assert_single(2, 'ali')
+
+    def test_removing_a_like_not_shown_by_the_notification_decrements(self):
+        for name in ('ali', 'ayse', 'can'):
+            self.like(name)
+
+        self.unlike('ali')
+        notification = self.assert_single(2, 'can')
+        self.assertIn('can ve 1 kişi daha', notification.text)
+
+    def test_removing_the_shown_like_moves_to_previous_liker(self):
+        for name in ('ali', 'ayse', 'can'):
+            self.like(name)
+
+        self.unlike('can')
+        self.assert_single(2, 'ayse')
+
+        self.unlike('ayse')
+        notification = self.assert_single(1, 'ali')
+        self.assertNotIn('kişi daha', notification.text)
+
+        self.unlike('ali')
+        self.assertEqual(self.notifications(), [])
+
+    def test_read_notification_starts_a_new_row(self):
+        self.like('ali')
+        Notification.objects.filter(recipient=self.owner).update(is_read=True)
+        self.like('ayse')
+
+        counts = sorted(notification.actor_count for notification in self.notifications())
+        self.assertEqual(counts, [1, 1])
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Post, PostImage, UserPostFilter
+from .models import Post, PostImage, TimelineFanout, UserPostFilter
 
 class PostImageInline(admin.TabularInline):
     model = PostImage
@@ -31,4 +31,11 @@ class PostImageAdmin(admin.ModelAdmin):
 class UserPostFilterAdmin(admin.ModelAdmin):
     list_display = ('user', 'posts_type', 'university', 'department')
     list_filter = ('posts_type', 'university', 'department')
-    search_fields = ('user__username',)
\ No newline at end of file
+    search_fields = ('user__username',)
+
+@admin.register(TimelineFanout)
+class TimelineFanoutAdmin(admin.ModelAdmin):
+    list_display = ('id', 'post_id', 'author_id', 'action', 'status', 'attempts', 'available_at', 'updated_at')
+    list_filter = ('status', 'action')
+    search_fields = ('last_error',)
+    readonly_fields = ('created_at', 'updated_at')
@@ -2,6 +2,7 @@ from rest_framework import serializers
 from django.contrib.auth.models import User
 from apps.post.models import Post, PostImage, Hashtag, UserPostFilter
 from apps.dataset.models import University, Department
+from apps.common.utils.viewer_state import ViewerStateListSerializer, get_viewer_state
 from django.urls import reverse
 
 
@@ -185,6 +186,7 @@ class PostSerializer(serializers.ModelSerializer):
             'comment_count', 'bookmark_count', 'is_liked', 'is_bookmarked', 'url'
         ]
         read_only_fields = ['user', 'created_at', 'updated_at']
+        list_serializer_class = ViewerStateListSerializer
 
     def get_post_content_type_id(self, obj):
         """Post modelinin ContentType ID'sini döndürür"""
@@ -195,21 +197,24 @@ class PostSerializer(serializers.ModelSerializer):
         return obj.get_like_count()
     
     def get_comment_count(self, obj):
-        from apps.comment.models import Comment
-        from django.contrib.contenttypes.models import ContentType
-        content_type = ContentType.objects.get_for_model(Post)
-        return Comment.objects.filter(content_type=content_type, object_id=obj.id, is_active=True).count()
+        return obj.get_comment_count()
 
     def get_bookmark_count(self, obj):
         return obj.get_bookmark_count()
 
     def get_is_liked(self, obj):
+        state = get_viewer_state(self.context, obj, 'liked')
+        if state is not None:
+            return state
         request = self.context.get('request')
         if request and request.user.is_authenticated:
             return obj.is_liked_by(request.user)
         return False
 
     def get_is_bookmarked(self, obj):
+        state = get_viewer_state(self.context, obj, 'bookmarked')
+        if state is not None:
+            return state
         request = self.context.get('request')
         if request and request.user.is_authenticated:
             return obj.is_bookmarked_by(request.user)
@@ -10,6 +10,9 @@ from django_filters.rest_framework import DjangoFilterBackend
 from apps.post.models import Post, Hashtag, UserPostFilter
 from apps.post.filters import PostFilter
 from apps.profiles.models import Profile
+from apps.profiles.visibility import VisibilityService
+from apps.post.timeline import HomeTimeline
+from apps.common.pagination import OptInCursorPagination
 from apps.dataset.models import University, Department
 from .serializers import (
     PostSerializer, PostDetailSerializer, HashtagSerializer, 
@@ -37,6 +40,7 @@ class PostViewSet(viewsets.ModelViewSet):
     """
     serializer_class = PostSerializer
     permission_classes = [permissions.IsAuthenticated, IsOwnerOrReadOnly]
+    pagination_class = OptInCursorPagination
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
     search_fields = ['content']
     ordering_fields = ['created_at', 'updated_at']
@@ -54,21 +58,9 @@ class PostViewSet(viewsets.ModelViewSet):
         try:
             profile = Profile.objects.get(user=self.request.user)
             
-            # Exclude posts from blocked users and users who blocked the current user
-            blocked_users = [user.user for user in profile.blocked.all()]
-            blocked_by_users = [user.user for user in profile.blocked_by.all()]
-            all_blocked = list(set(blocked_users + blocked_by_users))
-            
-            if all_blocked:
-                queryset = queryset.exclude(user__in=all_blocked)
-            
-            # Exclude posts from users with private profiles who the current user doesn't follow
-            private_profiles = Profile.objects.filter(is_private=True).exclude(user=self.request.user)
-            following_users = [user.user for user in profile.following.all()]
-            private_users_not_following = [p.user for p in private_profiles if p.user not in following_users]
-            
-            if private_users_not_following:
-                queryset = queryset.exclude(user__in=private_users_not_following)
+            # Exclude posts from blocked users, users who blocked the current user
+            # and private profiles the current user doesn't follow
+            queryset = VisibilityService.for_request(self.request).filter_queryset(queryset)
                 
             # Check if the user has any query parameters for filtering
             filter_data = self.request.query_params
@@ -80,9 +72,7 @@ class PostViewSet(viewsets.ModelViewSet):
                     
                     # Apply saved preferences
                     if user_filter.posts_type == 'following':
-                        following_users = [user.user for user in profile.following.all()]
-                        following_users.append(self.request.user)
-                        queryset = queryset.filter(user__in=following_users)
+                        queryset = HomeTimeline(self.request.user).filter_queryset(queryset)
                     elif user_filter.posts_type == 'verified':
                         verified_profiles = Profile.objects.filter(is_verified=True)
                         verified_users = [profile.user for profile in verified_profiles]
@@ -107,9 +97,7 @@ class PostViewSet(viewsets.ModelViewSet):
                 department_id = self.request.query_params.get('department')
                 
                 if posts_type == 'following':
-                    following_users = [user.user for user in profile.following.all()]
-                    following_users.append(self.request.user)
-                    queryset = queryset.filter(user__in=following_users)
+                    queryset = HomeTimeline(self.request.user).filter_queryset(queryset)
                 elif posts_type == 'verified':
                     verified_profiles = Profile.objects.filter(is_verified=True)
                     verified_users = [profile.user for profile in verified_profiles]
@@ -173,38 +161,19 @@ class PostViewSet(viewsets.ModelViewSet):
         """
         try:
             # Get the post directly by ID
-            instance = Post.objects.get(pk=kwargs['pk'])
+            instance = Post.objects.select_related('user__profile').get(pk=kwargs['pk'])
             
-            # Check if the post is from a private profile and the user is not following
-            if hasattr(instance.user, 'profile') and instance.user.profile.is_private and request.user != instance.user:
-                # Get the current user's profile
-                try:
-                    profile = Profile.objects.get(user=request.user)
-                    # Check if the user follows the post creator
-                    if instance.user not in [user.user for user in profile.following.all()]:
-                        return Response(
-                            {"detail": "This post is from a private profile. You need to follow this user to see their posts."},
-                            status=status.HTTP_403_FORBIDDEN
-                        )
-                except Profile.DoesNotExist:
+            # Check private profile / blocking settings of the post creator
+            if not VisibilityService.for_request(request).can_view(instance.user_id):
+                if hasattr(instance.user, 'profile') and instance.user.profile.is_private:
                     return Response(
                         {"detail": "This post is from a private profile. You need to follow this user to see their posts."},
                         status=status.HTTP_403_FORBIDDEN
                     )
-                    
-            # Check if the user is blocked or has blocked the post creator
-            try:
-                profile = Profile.objects.get(user=request.user)
-                blocked_users = [user.user for user in profile.blocked.all()]
-                blocked_by_users = [user.user for user in profile.blocked_by.all()]
-                
-                if instance.user in blocked_users or instance.user in blocked_by_users:
-                    return Response(
-                        {"detail": "You cannot view this post due to blocking settings."},
-                        status=status.HTTP_403_FORBIDDEN
-                    )
-            except Profile.DoesNotExist:
-                pass
+                return Response(
+                    {"detail": "You cannot view this post due to blocking settings."},
+                    status=status.HTTP_403_FORBIDDEN
+                )
                 
             # Serialize and return the post
             serializer = self.get_serializer(instance)
@@ -0,0 +1,129 @@
+"""
+Ana sayfa zaman çizelgesi dağıtım kuyruğu.
+
+Gönderi oluşturulduğunda / silindiğinde post_save / post_delete receiver'ları
+`enqueue_fanout` ile çağıranın transaction'ı içinde TimelineFanout kaydı yazar; takipçilerin
+zaman çizelgelerine ekleme / çıkarma (apps.post.timeline) `python manage.py
+dispatch_timeline_fanout` worker'ı tarafından yapılır. Kuyruk resim işleme kuyruğundan
+ayrıdır: dağıtım, CPU yoğun resim görevlerinin arkasında beklemez.
+- Hazır kayıtlar SKIP LOCKED ile kilitlenir (birden fazla worker çalışabilir)
+- Ekleme ve çıkarma tekrar edilebilir (idempotent) işlemlerdir; hatalı kayıtlar artan
+  bekleme süresiyle TIMELINE_FANOUT_MAX_ATTEMPTS kez denenir
+
+HOME_TIMELINE_FANOUT_ASYNC kapalıysa (worker'sız geliştirme) dağıtım commit sonrası aynı
+süreçte yapılır.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+TIMELINE_FANOUT_MAX_ATTEMPTS = getattr(settings, 'TIMELINE_FANOUT_MAX_ATTEMPTS', 5)
+TIMELINE_FANOUT_RETRY_DELAY = 10  # saniye, her denemede katlanır
+TIMELINE_FANOUT_LOCK_TIMEOUT = 300  # 5 dakika sonra kilitli kalan kayıt tekrar alınır
+TIMELINE_FANOUT_RETENTION_DAYS = getattr(settings, 'TIMELINE_FANOUT_RETENTION_DAYS', 2)
+
+
+def enqueue_fanout(post_id, author_id, action):
+    """Gönderi için dağıtım kaydı oluşturur (çağıranın transaction'ı içinde)"""
+    from apps.post.models import TimelineFanout
+
+    if not getattr(settings, 'HOME_TIMELINE_FANOUT_ASYNC', True):
+        transaction.on_commit(lambda: apply_fanout(post_id, author_id, action))
+        return None
+
+    return TimelineFanout.objects.create(post_id=post_id, author_id=author_id, action=action)
+
+
+def apply_fanout(post_id, author_id, action):
+    """Gönderiyi takipçilerin sıcak zaman çizelgelerine ekler ya da onlardan çıkarır"""
+    from apps.post import timeline
+    from apps.post.models import TimelineFanout
+
+    if action == TimelineFanout.ACTION_REMOVE:
+        timeline.remove_post(post_id, author_id)
+    else:
+        timeline.push_post(post_id, author_id)
+
+
+def claim_fanouts(limit=50):
+    """
+    İşlenmeye hazır kayıtları kilitleyip 'processing' durumuna alır.
+    PostgreSQL'de SKIP LOCKED sayesinde birden fazla worker aynı kaydı almaz.
+    """
+    from apps.post.models import TimelineFanout
+
+    now = timezone.now()
+    stale = now - timedelta(seconds=TIMELINE_FANOUT_LOCK_TIMEOUT)
+
+    with transaction.atomic():
+        ready = TimelineFanout.objects.select_for_update(skip_locked=True).filter(
+            Q(status=TimelineFanout.STATUS_PENDING, available_at__lte=now) |
+            Q(status=TimelineFanout.STATUS_PROCESSING, locked_at__lt=stale)
+        )
+        fanouts = list(ready.order_by('available_at', 'id')[:limit])
+        if fanouts:
+            TimelineFanout.objects.filter(pk__in=[fanout.pk for fanout in fanouts]).update(
+                status=TimelineFanout.STATUS_PROCESSING,
+                locked_at=now,
+            )
+    return fanouts
+
+
+def process_fanout(fanout):
+    """Tek bir kaydı işler; hata durumunda tekrar denemeye alır"""
+    from apps.post.models import TimelineFanout
+
+    fanout.attempts += 1
+    try:
+        apply_fanout(fanout.post_id, fanout.author_id, fanout.action)
+    except Exception as e:
+        logger.exception(f"Zaman çizelgesi dağıtımı başarısız ({fanout}): {e}")
+        fanout.last_error = str(e)
+        if fanout.attempts >= TIMELINE_FANOUT_MAX_ATTEMPTS:
+            fanout.status = TimelineFanout.STATUS_FAILED
+        else:
+            fanout.status = TimelineFanout.STATUS_PENDING
+            fanout.available_at = timezone.now() + timedelta(
+                seconds=TIMELINE_FANOUT_RETRY_DELAY * 2 ** (fanout.attempts - 1)
+            )
+        fanout.locked_at = None
+        fanout.save(update_fields=['attempts', 'last_error', 'status', 'available_at', 'locked_at', 'updated_at'])
+        return False
+
+    fanout.status = TimelineFanout.STATUS_DONE
+    fanout.locked_at = None
+    fanout.save(update_fields=['attempts', 'status', 'locked_at', 'updated_at'])
+    return True
+
+
+def run_pending_fanouts(limit=50):
+    """
+    Bekleyen kayıtlardan bir parti işler.
+
+    Returns:
+        tuple: (başarılı, başarısız) kayıt sayıları
+    """
+    succeeded = failed = 0
+    for fanout in claim_fanouts(limit):
+        if process_fanout(fanout):
+            succeeded += 1
+        else:
+            failed += 1
+    return succeeded, failed
+
+
+def purge_fanouts(days=TIMELINE_FANOUT_RETENTION_DAYS):
+    """Tamamlanmış eski kayıtları siler (başarısızlar incelenmek üzere kalır)"""
+    from apps.post.models import TimelineFanout
+
+    deleted, _ = TimelineFanout.objects.filter(
+        status=TimelineFanout.STATUS_DONE,
+        updated_at__lt=timezone.now() - timedelta(days=days),
+    ).delete()
+    return deleted
@@ -0,0 +1,71 @@
+"""
+Ana sayfa zaman çizelgesi dağıtım worker'ı
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from apps.post.fanout import purge_fanouts, run_pending_fanouts
+from apps.post.models import TimelineFanout
+
+
+class Command(BaseCommand):
+    help = 'Yeni ve silinen gönderileri takipçilerin ana sayfa zaman çizelgelerine dağıtır'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Bekleyen kayıtları bir kez işle ve çık (cron için)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=50,
+            help='Her turda alınacak kayıt sayısı (varsayılan: 50)',
+        )
+        parser.add_argument(
+            '--sleep',
+            type=float,
+            default=0.5,
+            help='Kuyruk boşken bekleme süresi, saniye (varsayılan: 0.5)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Sadece kuyruk durumunu göster, dağıtım yapma',
+        )
+
+    def handle(self, *args, **options):
+        if options['dry_run']:
+            for status, label in TimelineFanout.STATUS_CHOICES:
+                count = TimelineFanout.objects.filter(status=status).count()
+                self.stdout.write(f"{label}: {count}")
+            return
+
+        batch_size = options['batch_size']
+        purged = purge_fanouts()
+        if purged:
+            self.stdout.write(f"🗑️ {purged} eski dağıtım kaydı silindi")
+        self.stdout.write("Zaman çizelgesi dağıtım worker'ı başladı")
+
+        try:
+            while True:
+                close_old_connections()
+                succeeded, failed = run_pending_fanouts(batch_size)
+
+                if succeeded or failed:
+                    self.stdout.write(
+                        self.style.SUCCESS(f"✅ {succeeded} gönderi dağıtıldı") +
+                        (self.style.ERROR(f", ❌ {failed} dağıtım başarısız") if failed else '')
+                    )
+
+                if options['once']:
+                    if succeeded + failed < batch_size:
+                        break
+                    continue
+
+                if not succeeded and not failed:
+                    time.sleep(options['sleep'])
+        except KeyboardInterrupt:
+            self.stdout.write("Worker durduruldu")
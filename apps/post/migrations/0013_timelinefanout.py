@@ -0,0 +1,59 @@
+# Generated by Django 5.2.1 on 2026-10-18 18:09
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def move_post_image_jobs(apps, schema_editor):
+    """Resim kuyruğunda bekleyen gönderi dağıtım görevlerini yeni kuyruğa taşı"""
+    ContentType = apps.get_model('contenttypes', 'ContentType')
+    ImageProcessingJob = apps.get_model('common', 'ImageProcessingJob')
+    Post = apps.get_model('post', 'Post')
+    TimelineFanout = apps.get_model('post', 'TimelineFanout')
+
+    content_type = ContentType.objects.filter(app_label='post', model='post').first()
+    if content_type is None:
+        return
+    jobs = ImageProcessingJob.objects.filter(content_type=content_type, status__in=['pending', 'processing'])
+    authors = dict(
+        Post.objects.filter(pk__in=jobs.values('object_id')).values_list('pk', 'user_id')
+    )
+    TimelineFanout.objects.bulk_create([
+        TimelineFanout(post_id=post_id, author_id=author_id) for post_id, author_id in authors.items()
+    ])
+    jobs.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('post', '0012_post_post_post_created_e7346e_idx'),
+        ('common', '0002_imagerendition'),
+        ('contenttypes', '0002_remove_content_type_name'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TimelineFanout',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('post_id', models.PositiveIntegerField(verbose_name='Gönderi ID')),
+                ('author_id', models.PositiveIntegerField(verbose_name='Yazar ID')),
+                ('action', models.CharField(choices=[('push', 'Ekle'), ('remove', 'Çıkar')], default='push', max_length=10, verbose_name='İşlem')),
+                ('status', models.CharField(choices=[('pending', 'Bekliyor'), ('processing', 'İşleniyor'), ('done', 'Tamamlandı'), ('failed', 'Başarısız')], default='pending', max_length=20, verbose_name='Durum')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='Deneme Sayısı')),
+                ('last_error', models.TextField(blank=True, default='', verbose_name='Son Hata')),
+                ('available_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='İşlenebilir Olduğu Zaman')),
+                ('locked_at', models.DateTimeField(blank=True, null=True, verbose_name='Kilitlenme Zamanı')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Oluşturulma Tarihi')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Güncellenme Tarihi')),
+            ],
+            options={
+                'verbose_name': 'Zaman Çizelgesi Dağıtımı',
+                'verbose_name_plural': 'Zaman Çizelgesi Dağıtımları',
+                'ordering': ['available_at', 'id'],
+                'indexes': [models.Index(fields=['status', 'available_at'], name='post_timeli_status_07cbc6_idx')],
+            },
+        ),
+        migrations.RunPython(move_post_image_jobs, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-18 18:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('post', '0013_timelinefanout'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='postimage',
+            name='processing_started_at',
+            field=models.DateTimeField(blank=True, help_text="Resmi işlemek üzere alan worker'ın alma zamanı", null=True, verbose_name='İşleme Başlangıcı'),
+        ),
+    ]
@@ -1,19 +1,20 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import User
 from django.urls import reverse
 import os
-from datetime import datetime
+from datetime import datetime, timedelta
 import re
+from django.db.models import Q
 from django.utils import timezone
 from apps.dataset.models import University, Department
 from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
-from django.core.files.storage import default_storage
 from django.contrib.contenttypes.models import ContentType
 from django.contrib.contenttypes.fields import GenericRelation
 from apps.comment.models import Comment
 from apps.like.models import Like
 from apps.bookmark.models import Bookmark
+from apps.common.image_jobs import enqueue_image_job, image_job_handler
 
 def post_image_upload_path(instance, filename):
     """Upload path for post images organized by date and post ID"""
@@ -104,11 +105,19 @@ class Post(models.Model):
     comments = GenericRelation(Comment)
     likes = GenericRelation(Like)
     bookmarks = GenericRelation(Bookmark)
+    
+    # Denormalize sayaçlar (Like / Comment / Bookmark oluşturma ve silme yollarında güncellenir)
+    like_count = models.PositiveIntegerField(default=0, verbose_name="Beğeni Sayısı")
+    comment_count = models.PositiveIntegerField(default=0, verbose_name="Yorum Sayısı")
+    bookmark_count = models.PositiveIntegerField(default=0, verbose_name="Yer İmi Sayısı")
 
     class Meta:
         verbose_name = "Gönderi"
         verbose_name_plural = "Gönderiler"
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at', '-id']),  # Keyset (cursor) sayfalama için
+        ]
     
     def __str__(self):
         # return f"{self.user.username}: {self.content[:50]}..."
@@ -134,9 +143,11 @@ class Post(models.Model):
     
     def get_like_count(self):
         """Returns the number of likes this post has"""
-        from apps.like.models import Like
-        content_type = ContentType.objects.get_for_model(self)
-        return Like.objects.filter(content_type=content_type, object_id=self.id).count()
+        return self.like_count
+    
+    def get_comment_count(self):
+        """Returns the number of active comments this post has"""
+        return self.comment_count
     
     def is_liked_by(self, user):
         """Checks if this post is liked by the given user"""
@@ -149,9 +160,7 @@ class Post(models.Model):
     
     def get_bookmark_count(self):
         """Returns the number of bookmarks this post has"""
-        from apps.bookmark.models import Bookmark
-        content_type = ContentType.objects.get_for_model(self)
-        return Bookmark.objects.filter(content_type=content_type, object_id=self.id).count()
+        return self.bookmark_count
 
     def is_bookmarked_by(self, user):
         """Checks if this post is bookmarked by the given user"""
@@ -199,6 +208,7 @@ class PostImage(models.Model):
     
     order = models.PositiveSmallIntegerField(default=0, verbose_name="Sıralama")
     processed = models.BooleanField(default=False, verbose_name="İşlenmiş", help_text="Resim backend tarafından işlendi mi?")
+    processing_started_at = models.DateTimeField(null=True, blank=True, verbose_name="İşleme Başlangıcı", help_text="Resmi işlemek üzere alan worker'ın alma zamanı")
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Oluşturulma Tarihi")
     
     class Meta:
@@ -254,76 +264,137 @@ class PostImage(models.Model):
         return sizes
 
 
+@receiver(post_save, sender=Post)
+def fan_out_post_to_timelines(sender, instance, created, **kwargs):
+    """Yeni gönderiyi takipçilerin ana sayfa zaman çizelgelerine dağıtmak için kuyruğa ekle"""
+    if created:
+        from apps.post.fanout import enqueue_fanout
+        enqueue_fanout(instance.pk, instance.user_id, TimelineFanout.ACTION_PUSH)
+
+
+@receiver(post_delete, sender=Post)
+def remove_post_from_timelines(sender, instance, **kwargs):
+    """Silinen gönderiyi takipçilerin sıcak zaman çizelgelerinden çıkarmak için kuyruğa ekle"""
+    from apps.post.fanout import enqueue_fanout
+    enqueue_fanout(instance.pk, instance.user_id, TimelineFanout.ACTION_REMOVE)
+
+
 @receiver(post_delete, sender=PostImage)
 def delete_post_image_files(sender, instance, **kwargs):
-    """Post resmi silindiğinde tüm boyutları sil"""
-    for field_name in ['image', 'thumbnail', 'medium', 'large']:
-        field = getattr(instance, field_name)
-        if field and default_storage.exists(field.name):
-            default_storage.delete(field.name)
+    """Post resmi silindiğinde tüm boyutları sil (paylaşılan boyutlar son referansta silinir)"""
+    from apps.common.rendition_store import release_files
+
+    release_files(
+        getattr(instance, field_name).name
+        for field_name in ['image', 'thumbnail', 'medium', 'large']
+    )
+
+
+def claim_post_images(post_id):
+    """
+    Gönderinin işlenmemiş ve başka bir worker'ca alınmamış resimlerini kısa bir transaction'da
+    işlemek üzere alır (SKIP LOCKED + processing_started_at). Uzun süre alınmış kalan
+    (worker'ı çökmüş) resimler yeniden alınabilir.
+    """
+    from apps.common.image_jobs import IMAGE_JOB_LOCK_TIMEOUT
+
+    now = timezone.now()
+    stale = now - timedelta(seconds=IMAGE_JOB_LOCK_TIMEOUT)
+    with transaction.atomic():
+        claimed = [
+            post_image for post_image in PostImage.objects.select_for_update(skip_locked=True).filter(
+                Q(processing_started_at__isnull=True) | Q(processing_started_at__lt=stale),
+                post_id=post_id, processed=False
+            )
+            if post_image.image
+        ]
+        PostImage.objects.filter(pk__in=[post_image.pk for post_image in claimed]).update(processing_started_at=now)
+    return sorted(claimed, key=lambda post_image: post_image.order)
+
+
+@image_job_handler(PostImage)
+def process_post_image_renditions(instance):
+    """
+    Post resminin boyutlarını oluştur (process_image_jobs worker'ı tarafından çalıştırılır).
+    Gönderinin işlenmemiş resimleri birlikte, paralel olarak işlenir:
+    - Resimler kısa bir transaction'da alınır (claim_post_images); işleme (decode, boyutlandırma,
+      dosya yazma) transaction ve satır kilidi dışında yapılır
+    - Sonuçlar ikinci kısa transaction'da, resim hâlâ işlenmemişse yazılır
+    Görevin kendi resmi başka bir worker'da işleniyorsa görev daha sonra tekrar denenir.
+    """
+    from apps.common.rendition_store import get_renditions, release_files
+    from apps.common.utils.image_processor import ImageProcessor
+    from PIL import Image
+
+    pending = claim_post_images(instance.post_id)
+    if not pending:
+        _check_processed_elsewhere(instance)
+        return
+
+    results, failed = [], []
+    try:
+        processor = ImageProcessor()
+
+        # Daha önce yüklenmiş resimlerin boyutları depodan paylaşılır;
+        # kalanlar resimler x presetler paralel işlenir, sonuçlar sırayla döner
+        renditions = get_renditions(
+            [post_image.image for post_image in pending],
+            size_presets=['thumbnail', 'medium', 'large'],
+            context='post'
+        )
+
+        for post_image, (image_hash, saved_files) in zip(pending, renditions):
+            if not saved_files:
+                failed.append(post_image.pk)
+                continue
+
+            # Image bilgileri
+            with Image.open(post_image.image.path) as img:
+                fields = {
+                    'original_width': img.width,
+                    'original_height': img.height,
+                    'file_size': post_image.image.size,
+                    'format': 'WEBP' if processor.webp_supported else 'JPEG',
+                    'hash': image_hash,
+                }
+            for size in ('thumbnail', 'medium', 'large'):
+                if size in saved_files:
+                    fields[size] = saved_files[size]
+            results.append((post_image, fields, saved_files))
+    finally:
+        with transaction.atomic():
+            for post_image, fields, saved_files in results:
+                written = PostImage.objects.filter(pk=post_image.pk, processed=False).update(
+                    processed=True, processing_started_at=None, **fields
+                )
+                if not written:
+                    # Resim bu arada silinmiş ya da başka bir worker tarafından işlenmiş
+                    release_files(saved_files.values())
+            rendered_ids = {post_image.pk for post_image, _, _ in results}
+            PostImage.objects.filter(
+                pk__in=[post_image.pk for post_image in pending if post_image.pk not in rendered_ids]
+            ).update(processing_started_at=None)
+
+    if instance.pk in failed:
+        # Görev tekrar denensin (işlenen kardeşler yukarıda kaydedildi)
+        raise ValueError(f"Post image {instance.pk} could not be processed")
+    _check_processed_elsewhere(instance)
+
+
+def _check_processed_elsewhere(instance):
+    """Görevin resmi başka bir worker'da işleniyorsa görev daha sonra tekrar denensin"""
+    if instance.image and PostImage.objects.filter(pk=instance.pk, processed=False).exists():
+        raise RuntimeError(f"Post image {instance.pk} is being processed by another worker")
 
 
 @receiver(post_save, sender=PostImage)
 def process_post_image(sender, instance, created, **kwargs):
     """
-    Post resmi kaydedildiğinde otomatik olarak işle
+    Post resmi kaydedildiğinde işleme kuyruğuna ekle.
+    İstemci orijinal resmi hemen alır; boyutlar worker tarafından oluşturulur.
     """
     if created and not instance.processed:
-        # Asenkron işleme için Celery task'i çağırabilir
-        # Şimdilik basit synchronous işleme yapıyoruz
-        try:
-            from apps.common.utils.image_processor import ImageProcessor
-            from PIL import Image
-            
-            # Original image'ı aç
-            if instance.image:
-                processor = ImageProcessor()
-                
-                # Image bilgilerini kaydet
-                with Image.open(instance.image.path) as img:
-                    instance.original_width = img.width
-                    instance.original_height = img.height
-                    instance.file_size = instance.image.size
-                    instance.format = 'WEBP' if processor.webp_supported else 'JPEG'
-                
-                # Process image
-                processed_images = processor.process_image(
-                    instance.image,
-                    size_presets=['thumbnail', 'medium', 'large'],
-                    context='post'
-                )
-                
-                # Save processed images to model fields - same date-based path as original
-                from datetime import datetime
-                now = datetime.now()
-                # Create same path structure as original: posts/2025/07/15/post_100/
-                date_path = f'posts/{now.year}/{now.month:02d}/{now.day:02d}/{instance.post.pk}/'
-                
-                saved_files = processor.save_processed_images(
-                    processed_images,
-                    instance.image.name,
-                    date_path
-                )
-                
-                # Update model fields
-                if 'thumbnail' in saved_files:
-                    instance.thumbnail.name = saved_files['thumbnail']
-                if 'medium' in saved_files:
-                    instance.medium.name = saved_files['medium']
-                if 'large' in saved_files:
-                    instance.large.name = saved_files['large']
-                
-                instance.processed = True
-                instance.save(update_fields=[
-                    'thumbnail', 'medium', 'large', 'processed',
-                    'original_width', 'original_height', 'file_size', 'format'
-                ])
-                
-        except Exception as e:
-            import logging
-            logger = logging.getLogger(__name__)
-            logger.error(f"Post image processing failed: {e}")
-            # İşleme başarısız olursa orijinal resmi kullan
+        enqueue_image_job(instance)
 
 
 class UserPostFilter(models.Model):
@@ -346,3 +417,50 @@ class UserPostFilter(models.Model):
     
     def __str__(self):
         return f"{self.user.username}'s Post Filter"
+
+
+class TimelineFanout(models.Model):
+    """
+    Ana sayfa zaman çizelgesi dağıtım kuyruğu (apps.post.fanout).
+    Gönderi oluşturulduğunda / silindiğinde istek içinde sadece kayıt yazılır; takipçilerin
+    zaman çizelgelerine ekleme / çıkarma `dispatch_timeline_fanout` worker'ı tarafından yapılır.
+    Gönderi silinmiş olabileceği için id'ler ilişki değil, düz alan olarak tutulur.
+    """
+    ACTION_PUSH = 'push'
+    ACTION_REMOVE = 'remove'
+    ACTION_CHOICES = [
+        (ACTION_PUSH, 'Ekle'),
+        (ACTION_REMOVE, 'Çıkar'),
+    ]
+    STATUS_PENDING = 'pending'
+    STATUS_PROCESSING = 'processing'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Bekliyor'),
+        (STATUS_PROCESSING, 'İşleniyor'),
+        (STATUS_DONE, 'Tamamlandı'),
+        (STATUS_FAILED, 'Başarısız'),
+    ]
+
+    post_id = models.PositiveIntegerField(verbose_name="Gönderi ID")
+    author_id = models.PositiveIntegerField(verbose_name="Yazar ID")
+    action = models.CharField(max_length=10, choices=ACTION_CHOICES, default=ACTION_PUSH, verbose_name="İşlem")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING, verbose_name="Durum")
+    attempts = models.PositiveSmallIntegerField(default=0, verbose_name="Deneme Sayısı")
+    last_error = models.TextField(blank=True, default='', verbose_name="Son Hata")
+    available_at = models.DateTimeField(default=timezone.now, verbose_name="İşlenebilir Olduğu Zaman")
+    locked_at = models.DateTimeField(null=True, blank=True, verbose_name="Kilitlenme Zamanı")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Oluşturulma Tarihi")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Güncellenme Tarihi")
+
+    class Meta:
+        verbose_name = "Zaman Çizelgesi Dağıtımı"
+        verbose_name_plural = "Zaman Çizelgesi Dağıtımları"
+        ordering = ['available_at', 'id']
+        indexes = [
+            models.Index(fields=['status', 'available_at']),  # Worker'ın bekleyen kayıtları bulması için
+        ]
+
+    def __str__(self):
+        return f"{self.get_action_display()} gönderi #{self.post_id} ({self.get_status_display()})"
@@ -1,3 +1,302 @@
-from django.test import TestCase
+import shutil
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from io import BytesIO
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from PIL import Image
+
+from apps.common.image_jobs import run_pending_jobs
+from apps.common.models import ImageProcessingJob
+from apps.post import timeline
+from apps.post.fanout import run_pending_fanouts
+from apps.post.models import Post, PostImage, TimelineFanout
+from apps.profiles.models import Profile
+
+try:
+    import fakeredis
+except ImportError:
+    fakeredis = None
+
+
+def make_jpeg(name, color):
+    buffer = BytesIO()
+    Image.new('RGB', (640, 480), color).save(buffer, format='JPEG')
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/jpeg')
+
+
+class TimelineTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user('author')
+        self.other = User.objects.create_user('other')
+        self.follower = User.objects.create_user('follower')
+        for user in (self.author, self.other, self.follower):
+            Profile.objects.get_or_create(user=user)
+        self.follower.profile.following.add(self.author.profile, self.other.profile)
+
+
+@override_settings(HOME_TIMELINE_FANOUT_ASYNC=True)
+class HomeTimelineTests(TimelineTestCase):
+    def setUp(self):
+        super().setUp()
+        # Redis dışı (kilitli) yol; Redis sorted set yolu RedisHomeTimelineTests'te
+        connection = mock.patch.object(timeline, 'redis_connection', return_value=None)
+        connection.start()
+        self.addCleanup(connection.stop)
+
+    def test_cold_timeline_is_not_created_by_fan_out(self):
+        Post.objects.create(user=self.author, content='ilk')
+        run_pending_fanouts()
+        self.assertIsNone(timeline.get_timeline(self.follower.id))
+
+    def test_new_post_is_pushed_by_worker(self):
+        timeline.build_timeline(self.follower.id)
+        post = Post.objects.create(user=self.author, content='yeni')
+
+        # Dağıtım istek içinde değil, kendi kuyruğundan yapılır
+        self.assertEqual(timeline.get_timeline(self.follower.id), [])
+        self.assertFalse(ImageProcessingJob.objects.exists())
+        self.assertEqual(run_pending_fanouts(), (1, 0))
+        self.assertEqual(timeline.get_timeline(self.follower.id), [(post.pk, self.author.id)])
+
+    def test_deleted_post_is_removed_by_worker(self):
+        kept = Post.objects.create(user=self.other, content='kalan')
+        deleted = Post.objects.create(user=self.author, content='silinen')
+        timeline.build_timeline(self.follower.id)
+        run_pending_fanouts()
+
+        deleted_pk = deleted.pk
+        deleted.delete()
+        self.assertEqual(run_pending_fanouts(), (1, 0))
+        self.assertEqual(timeline.get_timeline(self.follower.id), [(kept.pk, self.other.id)])
+        self.assertEqual(
+            TimelineFanout.objects.get(post_id=deleted_pk, action=TimelineFanout.ACTION_REMOVE).status,
+            TimelineFanout.STATUS_DONE,
+        )
+
+    def test_failed_fan_out_is_retried(self):
+        Post.objects.create(user=self.author, content='yeni')
+
+        with mock.patch.object(timeline, 'push_post', side_effect=RuntimeError('bağlantı yok')):
+            self.assertEqual(run_pending_fanouts(), (0, 1))
+        fanout = TimelineFanout.objects.get()
+        self.assertEqual(fanout.status, TimelineFanout.STATUS_PENDING)
+        self.assertEqual(fanout.attempts, 1)
+        self.assertIn('bağlantı yok', fanout.last_error)
+
+    def test_push_waits_for_concurrent_writer(self):
+        timeline.build_timeline(self.follower.id)
+        key = timeline._timeline_key(self.follower.id)
+        followers = mock.patch.object(timeline, '_follower_user_ids', return_value=[self.follower.id])
+        followers.start()
+        self.addCleanup(followers.stop)
+        timeline.celebrity_author_ids()  # Thread'de veritabanına inilmesin
+
+        # Başka bir yazar listeyi kilit altında okuyup yazarken ikinci dağıtım gelir
+        with timeline._timeline_lock(self.follower.id) as locked:
+            self.assertTrue(locked)
+            pusher = threading.Thread(target=timeline.push_post, args=(2, self.other.id))
+            pusher.start()
+            entries = cache.get(key)
+            time.sleep(timeline.TIMELINE_LOCK_WAIT * 2)
+            cache.set(key, [(1, self.author.id)] + entries)
+        pusher.join()
+
+        # İkinci dağıtım kilidi bekledi, ilk yazarın güncellemesi kaybolmadı
+        self.assertEqual(timeline.get_timeline(self.follower.id), [(2, self.other.id), (1, self.author.id)])
+
+    def test_remove_authors(self):
+        Post.objects.create(user=self.author, content='a')
+        other_post = Post.objects.create(user=self.other, content='b')
+        timeline.build_timeline(self.follower.id)
+
+        timeline.remove_authors(self.follower.id, self.author.id)
+        self.assertEqual(timeline.get_timeline(self.follower.id), [(other_post.pk, self.other.id)])
+
+    def test_locked_timeline_is_invalidated_instead_of_losing_update(self):
+        timeline.build_timeline(self.follower.id)
+        cache.add(f"{timeline._timeline_key(self.follower.id)}_lock", 1, timeline.TIMELINE_LOCK_TIMEOUT)
+
+        with mock.patch.object(timeline, 'TIMELINE_LOCK_RETRIES', 1):
+            timeline.push_post(12345, self.author.id)
+        self.assertIsNone(timeline.get_timeline(self.follower.id))
+
+
+@skipUnless(fakeredis, 'fakeredis[lua] kurulu değil')
+class RedisHomeTimelineTests(TimelineTestCase):
+    def setUp(self):
+        super().setUp()
+        self.redis = fakeredis.FakeRedis()
+        connection = mock.patch.object(timeline, 'redis_connection', return_value=self.redis)
+        connection.start()
+        self.addCleanup(connection.stop)
+        self.key = timeline._redis_key(self.follower.id)
+
+    def members(self):
+        return {member.decode(): score for member, score in self.redis.zrange(self.key, 0, -1, withscores=True)}
+
+    def test_build_marks_timeline_ready(self):
+        post = Post.objects.create(user=self.author, content='a')
+
+        self.assertIsNone(timeline.get_timeline(self.follower.id))
+        self.assertEqual(timeline.build_timeline(self.follower.id), [(post.pk, self.author.id)])
+        self.assertEqual(self.members(), {f'{post.pk}:{self.author.id}': post.pk, '+': float('inf')})
+        self.assertEqual(timeline.get_timeline(self.follower.id), [(post.pk, self.author.id)])
+        self.assertGreater(self.redis.ttl(self.key), 0)
+
+    def test_timeline_being_built_reads_as_cold(self):
+        self.redis.zadd(self.key, {timeline.READY_MEMBER: '+inf', timeline.BUILDING_MEMBER: '+inf'})
+        self.assertIsNone(timeline.get_timeline(self.follower.id))
+
+    def test_push_skips_cold_and_trims_warm_timelines(self):
+        timeline.push_post(1, self.author.id)
+        self.assertFalse(self.redis.exists(self.key))
+
+        timeline.build_timeline(self.follower.id)
+        with mock.patch.object(timeline, 'HOME_TIMELINE_MAX_LENGTH', 2):
+            for post_id in (3, 1, 2, 4):
+                timeline.push_post(post_id, self.author.id)
+
+        self.assertEqual(timeline.get_timeline(self.follower.id), [(4, self.author.id), (3, self.author.id)])
+        self.assertIn('+', self.members())
+
+    def test_remove_post_and_authors(self):
+        timeline.build_timeline(self.follower.id)
+        for post_id, author in ((1, self.author), (2, self.other), (3, self.author)):
+            timeline.push_post(post_id, author.id)
+
+        timeline.remove_post(3, self.author.id)
+        self.assertEqual(timeline.get_timeline(self.follower.id), [(2, self.other.id), (1, self.author.id)])
+
+        timeline.remove_authors(self.follower.id, self.author.id)
+        self.assertEqual(timeline.get_timeline(self.follower.id), [(2, self.other.id)])
+        self.assertIn('+', self.members())
+
+    def test_removing_from_cold_timeline_does_not_create_it(self):
+        timeline.remove_post(1, self.author.id)
+        timeline.remove_authors(self.follower.id, self.author.id)
+        self.assertFalse(self.redis.exists(self.key))
+
+
+@override_settings(IMAGE_PROCESSING_ASYNC=True, IMAGE_PROCESSING_WORKERS=1)
+class PostImageProcessingTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        media = override_settings(MEDIA_ROOT=media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+
+        self.user = User.objects.create_user('yazar')
+        self.post = Post.objects.create(user=self.user, content='resimli')
+        self.images = [
+            PostImage.objects.create(post=self.post, image=make_jpeg(f'{index}.jpg', color), order=index)
+            for index, color in enumerate(['red', 'green', 'blue'])
+        ]
+
+    def test_first_job_processes_siblings_once(self):
+        from apps.common import rendition_store
+
+        with mock.patch.object(rendition_store, 'get_renditions', wraps=rendition_store.get_renditions) as renditions:
+            run_pending_jobs()
+
+        # Üç görev de tamamlanır ama resimler tek seferde işlenir
+        self.assertEqual(renditions.call_count, 1)
+        self.assertEqual(len(renditions.call_args.args[0]), 3)
+        self.assertEqual(
+            ImageProcessingJob.objects.filter(
+                content_type__model='postimage', status=ImageProcessingJob.STATUS_DONE
+            ).count(),
+            3,
+        )
+        for image in self.images:
+            image.refresh_from_db()
+            self.assertTrue(image.processed)
+            self.assertTrue(image.thumbnail.name.startswith('renditions/'))
+
+    def test_processed_sibling_is_not_rendered_again(self):
+        from apps.post.models import process_post_image_renditions
+
+        process_post_image_renditions(self.images[0])
+        first = PostImage.objects.get(pk=self.images[1].pk)
+
+        with mock.patch('apps.common.rendition_store.get_renditions') as renditions:
+            process_post_image_renditions(self.images[1])
+        renditions.assert_not_called()
+        self.assertEqual(PostImage.objects.get(pk=self.images[1].pk).medium.name, first.medium.name)
+
+    def test_renditions_are_rendered_outside_transaction(self):
+        from django.db import connection
+        from apps.common import rendition_store
+        from apps.post.models import process_post_image_renditions
+
+        depth = len(connection.atomic_blocks)
+        claims = []
+
+        def render(*args, **kwargs):
+            self.assertEqual(len(connection.atomic_blocks), depth)
+            claims.extend(PostImage.objects.values_list('processing_started_at', flat=True))
+            return real_render(*args, **kwargs)
+
+        real_render = rendition_store.get_renditions
+        with mock.patch.object(rendition_store, 'get_renditions', side_effect=render):
+            process_post_image_renditions(self.images[0])
+
+        self.assertEqual(len(claims), 3)
+        self.assertTrue(all(claims))
+        self.assertFalse(PostImage.objects.filter(processing_started_at__isnull=False).exists())
+        self.assertFalse(PostImage.objects.filter(processed=False).exists())
+
+    def test_image_claimed_by_another_worker_is_retried(self):
+        from apps.post.models import process_post_image_renditions
+
+        PostImage.objects.filter(pk=self.images[0].pk).update(processing_started_at=timezone.now())
+
+        with self.assertRaises(RuntimeError):
+            process_post_image_renditions(self.images[0])
+        self.assertEqual(
+            set(PostImage.objects.filter(processed=True).values_list('pk', flat=True)),
+            {self.images[1].pk, self.images[2].pk},
+        )
+
+        # Çökmüş worker'ın eski kaydı yeniden alınır
+        from apps.common.image_jobs import IMAGE_JOB_LOCK_TIMEOUT
+        PostImage.objects.filter(pk=self.images[0].pk).update(
+            processing_started_at=timezone.now() - timedelta(seconds=IMAGE_JOB_LOCK_TIMEOUT + 1)
+        )
+        process_post_image_renditions(self.images[0])
+        self.assertTrue(PostImage.objects.get(pk=self.images[0].pk).processed)
+
+    def test_image_processed_meanwhile_is_not_overwritten(self):
+        from apps.common import rendition_store
+        from apps.post.models import process_post_image_renditions
+
+        def render(*args, **kwargs):
+            result = real_render(*args, **kwargs)
+            PostImage.objects.filter(pk=self.images[1].pk).update(processed=True, medium='baska.webp')
+            return result
+
+        real_render = rendition_store.get_renditions
+        with mock.patch.object(rendition_store, 'get_renditions', side_effect=render), \
+                mock.patch.object(rendition_store, 'release_files') as release:
+            process_post_image_renditions(self.images[0])
+
+        self.assertEqual(PostImage.objects.get(pk=self.images[1].pk).medium.name, 'baska.webp')
+        release.assert_called_once()
+
+    def test_failed_render_releases_claims(self):
+        from apps.post.models import process_post_image_renditions
+
+        with mock.patch('apps.common.rendition_store.get_renditions', side_effect=OSError('disk dolu')):
+            with self.assertRaises(OSError):
+                process_post_image_renditions(self.images[0])
+        self.assertFalse(PostImage.objects.filter(processing_started_at__isnull=False).exists())
+        self.assertFalse(PostImage.objects.filter(processed=True).exists())
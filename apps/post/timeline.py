@@ -0,0 +1,338 @@
+"""
+"Takip edilenler" akışı için fan-out-on-write ana sayfa zaman çizelgesi.
+
+Her kullanıcı için cache'de en yeniden eskiye sıralı, boyutu sınırlı bir
+(post_id, author_id) listesi tutulur:
+- Gönderi oluşturulduğunda yazarın takipçilerinin sıcak (cache'de bulunan) zaman
+  çizelgelerine eklenir, silindiğinde onlardan çıkarılır. Dağıtım istek içinde değil,
+  kendi kuyruğundan (apps.post.fanout, `dispatch_timeline_fanout` worker'ı) yapılır
+- Takibi bırakma / engelleme durumunda ilgili yazarın gönderileri listeden çıkarılır,
+  yeni takipte liste geçersiz kılınır
+
+Güncellemeler atomiktir: prod'da (django-redis) liste Redis sorted set'i olarak tutulur ve
+ZADD / ZREMRANGEBYRANK / ZREM ile sunucu tarafında değiştirilir; diğer cache
+backend'lerinde (yerelde locmem) her liste anahtar başına bir kilitle okunup yazılır,
+kilit alınamazsa liste silinir ve bir sonraki okumada yeniden oluşturulur.
+
+Soğuk (cache'de olmayan) zaman çizelgeleri ilk okumada veritabanından doldurulur ve o
+istek mevcut takip sorgusuyla cevaplanır. Takipçi sayısı sınırı aşan (ünlü) yazarların
+gönderileri dağıtılmaz; okuma sırasında takip alt sorgusuyla akışa eklenir.
+
+Görünürlük (engelleme / gizli profil) kuralları okuma sırasında ayrıca uygulanır,
+bu yüzden listede kalmış olası eski kayıtlar akışa sızmaz.
+"""
+import logging
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Exists, OuterRef, Q
+
+from apps.common.utils.redis_scripts import redis_connection, redis_script
+
+logger = logging.getLogger(__name__)
+
+HOME_TIMELINE_MAX_LENGTH = getattr(settings, 'HOME_TIMELINE_MAX_LENGTH', 800)
+HOME_TIMELINE_TIMEOUT = getattr(settings, 'HOME_TIMELINE_TIMEOUT', 60 * 60 * 24)  # 1 gün
+HOME_TIMELINE_FANOUT_LIMIT = getattr(settings, 'HOME_TIMELINE_FANOUT_LIMIT', 5000)
+CELEBRITY_CACHE_KEY = "home_timeline_celebrities"
+CELEBRITY_CACHE_TIMEOUT = 600  # 10 dakika
+FANOUT_BATCH_SIZE = 500
+TIMELINE_LOCK_TIMEOUT = 10  # saniye
+TIMELINE_LOCK_RETRIES = 20
+TIMELINE_LOCK_WAIT = 0.05  # saniye
+
+# Redis sorted set'inde liste var ama boş olabilir (kimseyi takip etmeyen kullanıcı);
+# bu üye en yüksek skorla her zaman set'te durur. Oluşturma sırasında BUILDING üyesi
+# de eklenir, liste tamamlanana kadar okuyucular soğuk liste gibi davranır.
+READY_MEMBER = '+'
+BUILDING_MEMBER = '~'
+
+# Liste varsa gönderiyi ekler ve en yeni HOME_TIMELINE_MAX_LENGTH kaydı (+ işaret üyeleri) bırakır
+PUSH_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return 0
+end
+redis.call('ZADD', KEYS[1], ARGV[1], ARGV[2])
+local markers = redis.call('ZCOUNT', KEYS[1], '+inf', '+inf')
+redis.call('ZREMRANGEBYRANK', KEYS[1], 0, -(tonumber(ARGV[3]) + markers + 1))
+return 1
+"""
+
+# Yazarı ARGV'de olan kayıtları (üye: "post_id:author_id") listeden çıkarır
+REMOVE_AUTHORS_SCRIPT = """
+local authors = {}
+for i = 1, #ARGV do
+    authors[ARGV[i]] = true
+end
+local removed = 0
+for _, member in ipairs(redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', '(+inf')) do
+    local author = string.match(member, ':(%d+)$')
+    if author and authors[author] then
+        removed = removed + redis.call('ZREM', KEYS[1], member)
+    end
+end
+return removed
+"""
+
+def _timeline_key(user_id):
+    return f"home_timeline_{user_id}"
+
+
+def _redis_key(user_id):
+    return cache.make_key(_timeline_key(user_id))
+
+
+def _member(post_id, author_id):
+    return f"{post_id}:{author_id}"
+
+
+@contextmanager
+def _timeline_lock(user_id):
+    """
+    Redis dışı backend'lerde liste başına kilit (cache.add).
+    Kilit alınamazsa False verir.
+    """
+    lock_key = f"{_timeline_key(user_id)}_lock"
+    for _ in range(TIMELINE_LOCK_RETRIES):
+        if cache.add(lock_key, 1, TIMELINE_LOCK_TIMEOUT):
+            try:
+                yield True
+            finally:
+                cache.delete(lock_key)
+            return
+        time.sleep(TIMELINE_LOCK_WAIT)
+    yield False
+
+
+def followed_authors_condition(user_id):
+    """Kullanıcının takip ettiği yazarlar ve kendisi için sorgu koşulu"""
+    from apps.profiles.models import Profile
+
+    Follow = Profile.following.through
+    follows = Follow.objects.filter(
+        from_profile__user_id=user_id,
+        to_profile__user_id=OuterRef('user_id'),
+    )
+    return Q(user_id=user_id) | Q(Exists(follows))
+
+
+def celebrity_author_ids():
+    """Takipçi sayısı fan-out sınırını aşan yazarların id kümesi (cache'li)"""
+    celebrities = cache.get(CELEBRITY_CACHE_KEY)
+    if celebrities is None:
+        from apps.profiles.models import Profile
+
+        celebrities = frozenset(
+            Profile.objects.annotate(
+                follower_count=Count('followers')
+            ).filter(
+                follower_count__gt=HOME_TIMELINE_FANOUT_LIMIT
+            ).values_list('user_id', flat=True)
+        )
+        cache.set(CELEBRITY_CACHE_KEY, celebrities, CELEBRITY_CACHE_TIMEOUT)
+    return celebrities
+
+
+def _query_timeline(user_id):
+    from apps.post.models import Post
+
+    return [
+        tuple(entry) for entry in Post.objects.filter(
+            followed_authors_condition(user_id)
+        ).exclude(
+            user_id__in=celebrity_author_ids() - {user_id}
+        ).order_by('-id').values_list('id', 'user_id')[:HOME_TIMELINE_MAX_LENGTH]
+    ]
+
+
+def build_timeline(user_id):
+    """Zaman çizelgesini veritabanından oluşturur ve cache'e yazar"""
+    connection = redis_connection()
+    if connection is None:
+        with _timeline_lock(user_id) as locked:
+            entries = _query_timeline(user_id)
+            if locked:
+                cache.set(_timeline_key(user_id), entries, HOME_TIMELINE_TIMEOUT)
+        return entries
+
+    # Liste sorgudan önce oluşturulur: sorgu sırasında commit edilen gönderilerin
+    # dağıtımı boş listeye düşer, sorgu sonucu mevcut üyelerle birleştirilir
+    key = _redis_key(user_id)
+    pipe = connection.pipeline()
+    pipe.delete(key)
+    pipe.zadd(key, {READY_MEMBER: '+inf', BUILDING_MEMBER: '+inf'})
+    pipe.expire(key, HOME_TIMELINE_TIMEOUT)
+    pipe.execute()
+
+    entries = _query_timeline(user_id)
+    pipe = connection.pipeline()
+    if entries:
+        pipe.zadd(key, {_member(post_id, author_id): post_id for post_id, author_id in entries})
+    pipe.zrem(key, BUILDING_MEMBER)
+    pipe.zremrangebyrank(key, 0, -(HOME_TIMELINE_MAX_LENGTH + 2))
+    pipe.execute()
+    return entries
+
+
+def get_timeline(user_id):
+    """Sıcak zaman çizelgesini döndürür, soğuksa (ya da oluşturuluyorsa) None"""
+    connection = redis_connection()
+    if connection is None:
+        return cache.get(_timeline_key(user_id))
+
+    members = [member.decode() for member in connection.zrevrange(_redis_key(user_id), 0, -1)]
+    if not members or BUILDING_MEMBER in members:
+        return None
+    return [
+        tuple(int(value) for value in member.split(':'))
+        for member in members if member != READY_MEMBER
+    ]
+
+
+def _follower_user_ids(author_id):
+    """Yazarı takip eden kullanıcı id'leri (yazarın kendisi dahil)"""
+    from apps.profiles.models import Profile
+
+    yield author_id
+    yield from Profile.objects.filter(
+        following__user_id=author_id
+    ).values_list('user_id', flat=True).iterator(chunk_size=FANOUT_BATCH_SIZE)
+
+
+def _batches(user_ids):
+    batch = []
+    for user_id in user_ids:
+        batch.append(user_id)
+        if len(batch) >= FANOUT_BATCH_SIZE:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _update_timelines(user_ids, update):
+    """
+    Redis dışı backend'lerde sıcak zaman çizelgelerini kilit altında günceller.
+    Soğuk olanlar atlanır; ilk okumada zaten güncel hâlleriyle oluşturulurlar.
+    """
+    for user_id in user_ids:
+        key = _timeline_key(user_id)
+        with _timeline_lock(user_id) as locked:
+            if not locked:
+                # Güncelleme kaybolmasın: liste bir sonraki okumada yeniden oluşturulur
+                cache.delete(key)
+                continue
+            entries = cache.get(key)
+            if entries is None:
+                continue
+            new_entries = update(entries)
+            if new_entries is not None:
+                cache.set(key, new_entries, HOME_TIMELINE_TIMEOUT)
+
+
+def push_post(post_id, author_id):
+    """Yeni gönderiyi takipçilerin zaman çizelgelerine dağıtır"""
+    if author_id in celebrity_author_ids():
+        return
+
+    connection = redis_connection()
+    if connection is None:
+        def add(entries):
+            if any(entry[0] == post_id for entry in entries):
+                return None
+            entries = sorted(entries + [(post_id, author_id)], key=lambda entry: entry[0], reverse=True)
+            return entries[:HOME_TIMELINE_MAX_LENGTH]
+
+        _update_timelines(_follower_user_ids(author_id), add)
+        return
+
+    push = redis_script(connection, PUSH_SCRIPT)
+    member = _member(post_id, author_id)
+    for user_ids in _batches(_follower_user_ids(author_id)):
+        pipe = connection.pipeline(transaction=False)
+        for user_id in user_ids:
+            push(keys=[_redis_key(user_id)], args=[post_id, member, HOME_TIMELINE_MAX_LENGTH], client=pipe)
+        pipe.execute()
+
+
+def remove_post(post_id, author_id):
+    """Silinen gönderiyi takipçilerin zaman çizelgelerinden çıkarır (listede boş yer kaplamasın)"""
+    if author_id in celebrity_author_ids():
+        return
+
+    connection = redis_connection()
+    if connection is None:
+        def remove(entries):
+            remaining = [entry for entry in entries if entry[0] != post_id]
+            return remaining if len(remaining) != len(entries) else None
+
+        _update_timelines(_follower_user_ids(author_id), remove)
+        return
+
+    member = _member(post_id, author_id)
+    for user_ids in _batches(_follower_user_ids(author_id)):
+        pipe = connection.pipeline(transaction=False)
+        for user_id in user_ids:
+            # Olmayan (soğuk) anahtarda ZREM bir şey yapmaz, anahtarı oluşturmaz
+            pipe.zrem(_redis_key(user_id), member)
+        pipe.execute()
+
+
+def remove_authors(user_id, *author_ids):
+    """Belirtilen yazarların gönderilerini kullanıcının zaman çizelgesinden çıkarır"""
+    connection = redis_connection()
+    if connection is None:
+        authors = set(author_ids)
+
+        def remove(entries):
+            remaining = [entry for entry in entries if entry[1] not in authors]
+            return remaining if len(remaining) != len(entries) else None
+
+        _update_timelines([user_id], remove)
+        return
+
+    redis_script(connection, REMOVE_AUTHORS_SCRIPT)(keys=[_redis_key(user_id)], args=list(author_ids))
+
+
+def invalidate_timeline(*user_ids):
+    """Zaman çizelgelerini siler; bir sonraki okumada yeniden oluşturulur"""
+    cache.delete_many([_timeline_key(user_id) for user_id in user_ids if user_id])
+
+
+class HomeTimeline:
+    """
+    "Takip edilenler" akışını zaman çizelgesinden filtreleyen servis.
+    """
+
+    def __init__(self, user):
+        self.user = user
+
+    def filter_queryset(self, queryset):
+        followed = followed_authors_condition(self.user.id)
+
+        try:
+            entries = get_timeline(self.user.id)
+            if entries is None:
+                # Soğuk zaman çizelgesi: bir sonraki istek için doldur, şimdilik sorguyla cevapla
+                build_timeline(self.user.id)
+        except Exception as e:
+            logger.warning(f"Ana sayfa zaman çizelgesi okunamadı (user {self.user.id}): {e}")
+            entries = None
+
+        if entries is None:
+            return queryset.filter(followed)
+
+        condition = Q(pk__in=[entry[0] for entry in entries])
+
+        # Ünlü yazarların gönderileri dağıtılmadığı için okuma sırasında eklenir
+        celebrities = celebrity_author_ids()
+        if celebrities:
+            condition |= Q(user_id__in=celebrities) & followed
+
+        # Liste dolduysa, listeden eski gönderiler için takip sorgusuna düşülür
+        if len(entries) >= HOME_TIMELINE_MAX_LENGTH:
+            condition |= Q(pk__lt=entries[-1][0]) & followed
+
+        return queryset.filter(condition)
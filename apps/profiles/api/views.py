@@ -502,17 +502,17 @@ class AvatarUploadView(APIView):
                 
                 # Eski avatar resimlerini temizle
                 if profile.avatar:
-                    # Eski resmi sil (signal handler yeni boyutları oluşturacak)
+                    # Eski resmi sil (yeni boyutlar arka planda oluşturulacak)
                     if os.path.isfile(profile.avatar.path):
                         os.remove(profile.avatar.path)
                 
-                # Processing flag'ini sıfırla ki signal handler çalışsın
+                # Processing flag'ini sıfırla ki işleme görevi kuyruğa eklensin
                 profile.avatar_processed = False
                 
-                # Yeni avatar'ı kaydet (signal handler otomatik olarak processing yapacak)
+                # Yeni avatar'ı kaydet (boyutlar process_image_jobs worker'ı tarafından oluşturulur)
                 profile.avatar.save(filename, data, save=True)
                 
-                # Signal handler'ın işlemesini bekle
+                # Boyutlar hazır olana kadar istemci orijinal avatarı kullanır
                 profile.refresh_from_db()
                 
                 # Response'a yeni multi-size avatar bilgilerini ekle
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from apps.profiles.search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = 'Kişi araması satırlarını (UserSearchIndex) tüm kullanıcılar için yeniden yazar'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Her partide yazılacak satır sayısı (varsayılan: 1000)',
+        )
+
+    def handle(self, *args, **options):
+        written = rebuild_index(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'✅ {written} kullanıcı için arama satırı yazıldı'))
@@ -0,0 +1,72 @@
+# Generated by Django 5.2.1 on 2026-10-18 17:34
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models, transaction
+
+BATCH_SIZE = 1000
+TRIGRAM_INDEX = 'profiles_usersearchindex_search_text_trgm'
+
+
+def build_search_index(apps, schema_editor):
+    """Mevcut kullanıcıların arama satırlarını oluştur"""
+    from apps.profiles.search import index_values
+
+    User = apps.get_model('auth', 'User')
+    UserSearchIndex = apps.get_model('profiles', 'UserSearchIndex')
+
+    rows = []
+    for user in User.objects.only('id', 'username', 'first_name', 'last_name').iterator(chunk_size=BATCH_SIZE):
+        rows.append(UserSearchIndex(user_id=user.id, **index_values(user)))
+        if len(rows) >= BATCH_SIZE:
+            UserSearchIndex.objects.bulk_create(rows)
+            rows = []
+    if rows:
+        UserSearchIndex.objects.bulk_create(rows)
+
+
+def create_trigram_index(apps, schema_editor):
+    """PostgreSQL: pg_trgm eklentisi kurulabiliyorsa search_text üzerinde GIN trigram index'i"""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    try:
+        with transaction.atomic(using=schema_editor.connection.alias):
+            schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    except Exception:
+        # Eklenti yetkisi yok: arama index'siz (önceden hesaplanmış tablo üzerinde) çalışır
+        return
+    schema_editor.execute(
+        f'CREATE INDEX IF NOT EXISTS {TRIGRAM_INDEX} ON profiles_usersearchindex '
+        f'USING gin (search_text gin_trgm_ops)'
+    )
+
+
+def drop_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(f'DROP INDEX IF EXISTS {TRIGRAM_INDEX}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('profiles', '0009_profile_avatar_large'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserSearchIndex',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='search_index', serialize=False, to=settings.AUTH_USER_MODEL, verbose_name='Kullanıcı')),
+                ('name', models.CharField(max_length=301, verbose_name='Ad Soyad')),
+                ('username', models.CharField(max_length=150, verbose_name='Kullanıcı Adı')),
+                ('search_text', models.TextField(verbose_name='Arama Metni')),
+            ],
+            options={
+                'verbose_name': 'Kişi Arama Kaydı',
+                'verbose_name_plural': 'Kişi Arama Kayıtları',
+            },
+        ),
+        migrations.RunPython(build_search_index, migrations.RunPython.noop),
+        migrations.RunPython(create_trigram_index, drop_trigram_index),
+    ]
@@ -4,8 +4,9 @@ from apps.dataset.models import University, Department, GraduationStatus
 import os
 from datetime import datetime
 from apps.notifications.services import NotificationService
-from django.db.models.signals import post_delete, pre_save, post_save
+from django.db.models.signals import post_delete, pre_save, post_save, m2m_changed
 from django.dispatch import receiver
+from apps.common.image_jobs import enqueue_image_job, image_job_handler
 
 def avatar_upload_path(instance, filename):
     """Upload path for profile avatars organized by date and user ID"""
@@ -416,7 +417,32 @@ class FollowRequest(models.Model):
         unique_together = ('from_user', 'to_user')  # Bir kullanıcı aynı kişiye birden fazla istek gönderemez
 
 
+class UserSearchIndex(models.Model):
+    """Kişi araması için kullanıcının normalize edilmiş adı (apps.profiles.search)"""
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='search_index', verbose_name="Kullanıcı")
+    name = models.CharField(max_length=301, verbose_name="Ad Soyad")
+    username = models.CharField(max_length=150, verbose_name="Kullanıcı Adı")
+    # " ad soyad kullanıcıadı"; PostgreSQL'de pg_trgm GIN index'i migration ile eklenir
+    search_text = models.TextField(verbose_name="Arama Metni")
+
+    class Meta:
+        verbose_name = "Kişi Arama Kaydı"
+        verbose_name_plural = "Kişi Arama Kayıtları"
+
+    def __str__(self):
+        return self.search_text.strip()
+
+
 # Signal fonksiyonları
+@receiver(post_save, sender=User)
+def update_user_search_index(sender, instance, created, update_fields=None, **kwargs):
+    """Ad, soyad veya kullanıcı adı değiştiğinde arama satırını güncelle"""
+    if update_fields is not None and not {'username', 'first_name', 'last_name'} & set(update_fields):
+        return  # Ör. giriş sırasında sadece last_login kaydediliyor
+    from apps.profiles.search import index_user
+    index_user(instance)
+
+
 @receiver(post_delete, sender=Profile)
 def delete_avatar_files_on_profile_delete(sender, instance, **kwargs):
     """Profil silindiğinde tüm avatar dosyalarını sil"""
@@ -476,48 +502,122 @@ def delete_old_avatar_files_on_change(sender, instance, **kwargs):
         pass  # Profil mevcut değilse hiçbir şey yapma
 
 
+@receiver(pre_save, sender=Profile)
+def invalidate_visibility_on_privacy_change(sender, instance, **kwargs):
+    """Profil gizliliği değiştiğinde tüm görünürlük kümelerini geçersiz kıl"""
+    if not instance.pk:
+        return
+
+    was_private = Profile.objects.filter(pk=instance.pk).values_list('is_private', flat=True).first()
+    if was_private is not None and was_private != instance.is_private:
+        from apps.profiles.visibility import invalidate_all_visibility
+        invalidate_all_visibility()
+
+
+@receiver(m2m_changed, sender=Profile.following.through)
+def invalidate_visibility_on_follow_change(sender, instance, action, reverse, pk_set, **kwargs):
+    """Takip ilişkisi değiştiğinde takip eden kullanıcıların görünürlük kümelerini geçersiz kıl"""
+    from apps.profiles.visibility import invalidate_visibility, invalidate_all_visibility
+
+    if action == 'post_clear':
+        invalidate_all_visibility()
+    elif action in ('post_add', 'post_remove') and pk_set:
+        if reverse:
+            # to_user.followers.add(from_user) - takip edenler pk_set içinde
+            invalidate_visibility(*Profile.objects.filter(pk__in=pk_set).values_list('user_id', flat=True))
+        else:
+            invalidate_visibility(instance.user_id)
+
+
+@receiver(m2m_changed, sender=Profile.blocked.through)
+def invalidate_visibility_on_block_change(sender, instance, action, reverse, pk_set, **kwargs):
+    """Engelleme değiştiğinde iki tarafın da görünürlük kümelerini geçersiz kıl"""
+    from apps.profiles.visibility import invalidate_visibility, invalidate_all_visibility
+
+    if action == 'post_clear':
+        invalidate_all_visibility()
+    elif action in ('post_add', 'post_remove') and pk_set:
+        user_ids = list(Profile.objects.filter(pk__in=pk_set).values_list('user_id', flat=True))
+        invalidate_visibility(instance.user_id, *user_ids)
+
+
+@receiver(m2m_changed, sender=Profile.following.through)
+def update_timelines_on_follow_change(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Takip değiştiğinde ana sayfa zaman çizelgelerini güncelle:
+    takip bırakılınca yazarın gönderileri çıkarılır, yeni takipte liste yeniden oluşturulur
+    """
+    from apps.post.timeline import invalidate_timeline, remove_authors
+
+    if action == 'pre_clear':
+        if reverse:
+            # Takipçilerin hepsi çıkarılıyor
+            for follower_user_id in instance.followers.values_list('user_id', flat=True):
+                remove_authors(follower_user_id, instance.user_id)
+        else:
+            invalidate_timeline(instance.user_id)
+    elif action in ('post_add', 'post_remove') and pk_set:
+        other_user_ids = list(Profile.objects.filter(pk__in=pk_set).values_list('user_id', flat=True))
+        if reverse:
+            # pk_set takip eden profiller, instance takip edilen
+            pairs = [(user_id, instance.user_id) for user_id in other_user_ids]
+        else:
+            pairs = [(instance.user_id, user_id) for user_id in other_user_ids]
+
+        if action == 'post_add':
+            invalidate_timeline(*[follower_id for follower_id, _ in pairs])
+        else:
+            for follower_id, author_id in pairs:
+                remove_authors(follower_id, author_id)
+
+
+@receiver(m2m_changed, sender=Profile.blocked.through)
+def update_timelines_on_block(sender, instance, action, reverse, pk_set, **kwargs):
+    """Engellemede iki tarafın gönderileri de birbirinin zaman çizelgesinden çıkarılır"""
+    if action != 'post_add' or not pk_set:
+        return
+
+    from apps.post.timeline import remove_authors
+
+    for user_id in Profile.objects.filter(pk__in=pk_set).values_list('user_id', flat=True):
+        remove_authors(instance.user_id, user_id)
+        remove_authors(user_id, instance.user_id)
+
+
+@image_job_handler(Profile)
+def process_profile_avatar_renditions(instance):
+    """
+    Avatar boyutlarını oluştur (process_image_jobs worker'ı tarafından çalıştırılır)
+    """
+    if not instance.avatar or instance.avatar_processed:
+        return
+
+    from apps.common.utils.image_processor import process_profile_image
+
+    # Profile için convenience fonksiyonu kullan
+    saved_files = process_profile_image(instance.avatar, instance.user_id)
+    if not saved_files:
+        raise ValueError(f"Profile avatar processing failed for user {instance.user_id}")
+
+    # Processed dosyaları profile field'larına ata - signal handler'ı bypass et.
+    # İşleme sırasında avatar değiştiyse yeni avatar için ayrı görev çalışır.
+    Profile.objects.filter(pk=instance.pk, avatar=instance.avatar.name).update(
+        avatar_thumbnail=saved_files.get('thumbnail', ''),
+        avatar_medium=saved_files.get('medium', ''),
+        avatar_large=saved_files.get('large', ''),
+        avatar_processed=True
+    )
+
+
 @receiver(post_save, sender=Profile)
 def process_profile_avatar(sender, instance, created, **kwargs):
     """
-    Profile kaydedildiğinde avatar'ı otomatik olarak işle
+    Profile kaydedildiğinde avatar'ı işleme kuyruğuna ekle
     """
     # Sadece avatar varsa ve henüz işlenmemişse işle
     if instance.avatar and not instance.avatar_processed:
         # Sonsuz döngüyü önlemek için update_fields kontrolü
         if 'avatar_processed' in (kwargs.get('update_fields') or []):
             return
-            
-        try:
-            from apps.common.utils.image_processor import process_profile_image
-            
-            print(f"Processing avatar for user {instance.user.username}...")
-            
-            # Profile için convenience fonksiyonu kullan
-            saved_files = process_profile_image(instance.avatar, instance.user.id)
-            
-            if saved_files:
-                # Processed dosyaları profile field'larına ata
-                if 'thumbnail' in saved_files:
-                    instance.avatar_thumbnail.name = saved_files['thumbnail']
-                if 'medium' in saved_files:
-                    instance.avatar_medium.name = saved_files['medium']
-                if 'large' in saved_files:
-                    instance.avatar_large.name = saved_files['large']
-                
-                # İşleme başarılı oldu - signal handler'ı bypass et
-                Profile.objects.filter(pk=instance.pk).update(
-                    avatar_thumbnail=instance.avatar_thumbnail.name if instance.avatar_thumbnail else '',
-                    avatar_medium=instance.avatar_medium.name if instance.avatar_medium else '',
-                    avatar_large=instance.avatar_large.name if instance.avatar_large else '',
-                    avatar_processed=True
-                )
-                print(f"Profile avatar processed successfully for user {instance.user.username}")
-            else:
-                print(f"Profile avatar processing failed for user {instance.user.username}")
-            
-        except Exception as e:
-            import logging
-            logger = logging.getLogger(__name__)
-            logger.error(f"Profile avatar processing failed for user {instance.user.username}: {e}")
-            print(f"Profile avatar processing error: {e}")
-            # İşleme başarısız olursa orijinal avatar'ı kullan
+
+        enqueue_image_job(instance)
@@ -0,0 +1,122 @@
+"""
+Kişi araması: sohbet kullanıcı/oda araması ve üye listesi için ortak.
+
+auth_user üzerinde ad, soyad ve kullanıcı adına `icontains` her tuşta tüm tabloyu
+tarıyordu. Bunun yerine her kullanıcı için normalize edilmiş bir arama satırı
+(UserSearchIndex) tutulur:
+- Türkçe büyük/küçük harf dönüşümü (İ -> i, I -> ı) yapılır, ardından aksanlar atılır;
+  "IŞIK", "ışık" ve "isik" aynı şekilde aranır
+- PostgreSQL'de search_text üzerinde pg_trgm GIN index'i vardır (eklenti kurulabildiyse);
+  `LIKE '%terim%'` aramaları index'ten yapılır. SQLite'da aynı önceden hesaplanmış tablo taranır
+- Sonuçlar sıralanır: ad soyad / kullanıcı adı sorguyla başlayanlar, sonra bir kelimesi
+  sorguyla başlayanlar, sonra diğer eşleşmeler
+
+Satırlar User kaydedildiğinde güncellenir (profiles.models); toplu yeniden oluşturma için
+`python manage.py rebuild_people_search_index`.
+"""
+import unicodedata
+
+from django.db.models import Case, IntegerField, Q, Value, When
+
+_TURKISH_LOWER = str.maketrans({'İ': 'i', 'I': 'ı'})
+
+
+def fold(text):
+    """Türkçe'ye uygun küçük harf + aksansız hali: 'İrem IŞIK' -> 'irem isik'"""
+    text = (text or '').translate(_TURKISH_LOWER).lower().replace('ı', 'i')
+    text = ''.join(
+        char for char in unicodedata.normalize('NFKD', text) if not unicodedata.combining(char)
+    )
+    return ' '.join(text.split())
+
+
+def index_values(user):
+    """Kullanıcının arama satırı alanları"""
+    name = fold(f"{user.first_name} {user.last_name}")
+    username = fold(user.username)
+    return {
+        'name': name,
+        'username': username,
+        # Baştaki boşluk kelime başı eşleşmesini (' terim') mümkün kılar
+        'search_text': f" {name} {username}",
+    }
+
+
+def index_user(user):
+    from apps.profiles.models import UserSearchIndex
+
+    UserSearchIndex.objects.update_or_create(user=user, defaults=index_values(user))
+
+
+def rebuild_index(batch_size=1000):
+    """
+    Tüm kullanıcıların arama satırlarını yeniden yazar; yazılan satır sayısını döner.
+
+    Tablo boşaltılmaz: satırlar partiler halinde upsert edilir, yeniden oluşturma sırasında
+    arama eski satırlarla çalışmaya devam eder. Silinen kullanıcıların satırları CASCADE ile
+    zaten silindiğinden geride eski satır kalmaz.
+    """
+    from django.contrib.auth.models import User
+    from apps.profiles.models import UserSearchIndex
+
+    def upsert(rows):
+        return len(UserSearchIndex.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=['user'],
+            update_fields=['name', 'username', 'search_text'],
+        ))
+
+    rows, written = [], 0
+    for user in User.objects.only('id', 'username', 'first_name', 'last_name').iterator(chunk_size=batch_size):
+        rows.append(UserSearchIndex(user_id=user.id, **index_values(user)))
+        if len(rows) >= batch_size:
+            written += upsert(rows)
+            rows = []
+    if rows:
+        written += upsert(rows)
+    return written
+
+
+def search_condition(query, user_field=''):
+    """
+    Sorgudaki her kelimeyi içeren kullanıcılar için Q nesnesi.
+    user_field: queryset'ten kullanıcıya giden yol (Profile için 'user__')
+    """
+    terms = fold(query).split()
+    if not terms:
+        return None
+    condition = Q()
+    for term in terms:
+        condition &= Q(**{f'{user_field}search_index__search_text__contains': term})
+    return condition
+
+
+def apply_people_search(queryset, query, user_field=''):
+    """
+    Queryset'i kişi aramasıyla filtreler, `search_rank` ile açıklar ve sıralar.
+    Sorgu boşsa boş queryset döner.
+    """
+    condition = search_condition(query, user_field)
+    if condition is None:
+        return queryset.none()
+
+    folded = fold(query)
+    field = f'{user_field}search_index__'
+    rank = Case(
+        When(Q(**{f'{field}name__startswith': folded}) | Q(**{f'{field}username__startswith': folded}), then=Value(0)),
+        When(**{f'{field}search_text__contains': f' {folded}'}, then=Value(1)),
+        default=Value(2),
+        output_field=IntegerField(),
+    )
+    return queryset.filter(condition).annotate(search_rank=rank).order_by('search_rank', f'{field}name')
+
+
+def search_users(query, exclude_user=None):
+    """Sıralı kullanıcı araması (sohbet için)"""
+    from django.contrib.auth.models import User
+
+    users = User.objects.all()
+    if exclude_user is not None:
+        users = users.exclude(id=exclude_user.id)
+    return apply_people_search(users, query)
@@ -1,3 +1,126 @@
-from django.test import TestCase
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from apps.notifications.registry import invalidate_notification_types
+from apps.post.models import Post
+from apps.profiles import visibility
+from apps.profiles.models import Profile, UserSearchIndex
+from apps.profiles.search import fold, rebuild_index, search_users
+
+
+class FoldTests(TestCase):
+    def test_turkish_case_and_accents(self):
+        self.assertEqual(fold('İrem IŞIK'), 'irem isik')
+        self.assertEqual(fold('ışık'), 'isik')
+        self.assertEqual(fold('ÇAĞLA  Öztürk '), 'cagla ozturk')
+        self.assertEqual(fold(None), '')
+
+
+class PeopleSearchTests(TestCase):
+    def setUp(self):
+        self.users = {
+            username: User.objects.create_user(username, first_name=first_name, last_name=last_name)
+            for username, first_name, last_name in (
+                ('irem', 'İrem', 'Işık'),
+                ('ayse', 'Ayşe', 'Irmak'),
+                ('kemal', 'Kemal', 'Biriş'),
+            )
+        }
+
+    def usernames(self, query):
+        return [user.username for user in search_users(query)]
+
+    def test_search_is_case_and_accent_insensitive(self):
+        self.assertEqual(self.usernames('IŞIK'), ['irem'])
+        self.assertEqual(self.usernames('isik'), ['irem'])
+
+    def test_prefix_matches_are_ranked_first(self):
+        # 'ir': ad başı (irem), kelime başı (ayse irmak), kelime içi (kemal biris)
+        self.assertEqual(self.usernames('ir'), ['irem', 'ayse', 'kemal'])
+
+    def test_rebuild_updates_rows_in_place(self):
+        User.objects.filter(username='irem').update(last_name='Yıldız')
+        UserSearchIndex.objects.filter(user=self.users['ayse']).delete()
+
+        self.assertEqual(rebuild_index(batch_size=2), 3)
+        self.assertEqual(UserSearchIndex.objects.count(), 3)
+        self.assertEqual(UserSearchIndex.objects.get(user=self.users['irem']).name, 'irem yildiz')
+        self.assertEqual(self.usernames('yildiz'), ['irem'])
+        self.assertEqual(self.usernames('irmak'), ['ayse'])
+
+
+@override_settings(CHANNEL_LAYERS={'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}})
+class VisibilityCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        invalidate_notification_types()
+        self.viewer = User.objects.create_user('okuyucu')
+        self.author = User.objects.create_user('yazar')
+        for user in (self.viewer, self.author):
+            Profile.objects.get_or_create(user=user)
+        self.post = Post.objects.create(user=self.author, content='görünür mü?')
+        self.client = APIClient()
+        self.client.force_authenticate(self.viewer)
+
+    def excluded(self):
+        return visibility.get_excluded_user_ids(self.viewer)
+
+    def assert_hidden(self):
+        self.assertIn(self.author.id, self.excluded())
+        self.assertEqual(self.client.get(f'/api/v1/posts/posts/{self.post.pk}/').status_code, 403)
+        response = self.client.get('/api/v1/posts/posts/')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn(self.post.pk, [post['id'] for post in response.data['results']])
+
+    def assert_visible(self):
+        self.assertNotIn(self.author.id, self.excluded())
+        self.assertEqual(self.client.get(f'/api/v1/posts/posts/{self.post.pk}/').status_code, 200)
+
+    def test_block_invalidates_both_sides(self):
+        self.assert_visible()
+        self.assertIsNotNone(cache.get(visibility._cache_key(self.viewer.id)))
+
+        self.author.profile.block(self.viewer.profile)
+        self.assertIsNone(cache.get(visibility._cache_key(self.viewer.id)))
+        self.assert_hidden()
+
+        self.author.profile.unblock(self.viewer.profile)
+        self.assert_visible()
+
+    def test_unfollowing_private_profile_hides_posts(self):
+        Profile.objects.filter(user=self.author).update(is_private=True)
+        self.viewer.profile.following.add(self.author.profile)
+        self.assert_visible()
+
+        self.viewer.profile.unfollow(self.author.profile)
+        self.assert_hidden()
+
+    def test_follower_removed_from_reverse_side_is_invalidated(self):
+        Profile.objects.filter(user=self.author).update(is_private=True)
+        self.viewer.profile.following.add(self.author.profile)
+        self.assert_visible()
+
+        self.author.profile.followers.remove(self.viewer.profile)
+        self.assert_hidden()
+
+    def test_privacy_toggle_bumps_generation(self):
+        self.assert_visible()
+        generation = visibility._get_generation()
+
+        profile = self.author.profile
+        profile.is_private = True
+        profile.save()
+        self.assertEqual(visibility._get_generation(), generation + 1)
+        self.assert_hidden()
+
+        profile.is_private = False
+        profile.save()
+        self.assertEqual(visibility._get_generation(), generation + 2)
+        self.assert_visible()
+
+    def test_saving_without_privacy_change_keeps_generation(self):
+        generation = visibility._get_generation()
+        self.author.profile.save()
+        self.assertEqual(visibility._get_generation(), generation)
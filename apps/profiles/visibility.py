@@ -0,0 +1,164 @@
+"""
+Profil görünürlük kuralları (engelleme / gizli profil) için ortak yardımcılar.
+
+Bir kullanıcının içeriğini göremeyeceği yazarların id kümesi cache'de tutulur:
+- Benim engellediğim kullanıcılar
+- Beni engelleyen kullanıcılar
+- Takip etmediğim gizli profiller
+
+Takip/engelleme değişikliklerinde ilgili kullanıcıların kümesi silinir, gizlilik
+değişikliklerinde ise nesil (generation) sayacı artırılarak tüm kümeler geçersiz olur.
+
+Liste sorguları için aynı kurallar veritabanı tarafında Exists alt sorguları olarak
+uygulanır (VisibilityService.filter_queryset); tekil kontroller ise istek başına
+bir kez yüklenen cache'li kümeyi kullanır (VisibilityService.can_view).
+"""
+from django.core.cache import cache
+from django.db.models import Exists, OuterRef
+
+VISIBILITY_CACHE_TIMEOUT = 300  # 5 dakika
+VISIBILITY_GENERATION_KEY = "visibility_generation"
+
+
+def _get_generation():
+    generation = cache.get(VISIBILITY_GENERATION_KEY)
+    if generation is None:
+        generation = 1
+        cache.add(VISIBILITY_GENERATION_KEY, generation, None)
+    return generation
+
+
+def _cache_key(user_id, generation=None):
+    if generation is None:
+        generation = _get_generation()
+    return f"visibility_excluded_{generation}_{user_id}"
+
+
+def compute_excluded_user_ids(user_id):
+    """Kullanıcının içeriğini göremeyeceği yazar id'lerini tek sorguda hesaplar"""
+    from apps.profiles.models import Profile
+
+    blocked = Profile.objects.filter(blocked_by__user_id=user_id).values_list('user_id', flat=True)
+    blocked_by = Profile.objects.filter(blocked__user_id=user_id).values_list('user_id', flat=True)
+    private_not_following = Profile.objects.filter(is_private=True).exclude(
+        user_id=user_id
+    ).exclude(
+        followers__user_id=user_id
+    ).values_list('user_id', flat=True)
+
+    return frozenset(blocked.union(blocked_by, private_not_following))
+
+
+def get_excluded_user_ids(user):
+    """
+    Kullanıcının göremeyeceği yazar id'lerini döndürür (cache'li).
+
+    Args:
+        user: Görüntüleyen kullanıcı
+    """
+    if not user or not user.is_authenticated:
+        return frozenset()
+
+    key = _cache_key(user.id)
+    excluded = cache.get(key)
+    if excluded is None:
+        excluded = compute_excluded_user_ids(user.id)
+        cache.set(key, excluded, VISIBILITY_CACHE_TIMEOUT)
+    return excluded
+
+
+def hidden_author_conditions(user, field='user', exclude_private=True):
+    """
+    Yazarı görünmez yapan kuralları Exists ifadeleri olarak döndürür.
+
+    Args:
+        user: Görüntüleyen kullanıcı
+        field: Queryset modelindeki yazar (User) alanının adı
+        exclude_private: Takip edilmeyen gizli profiller de gizlensin mi?
+    """
+    from apps.profiles.models import Profile
+
+    author_id = OuterRef(f"{field}_id")
+    Block = Profile.blocked.through
+
+    conditions = [
+        # Benim engellediğim yazarlar
+        Exists(Block.objects.filter(from_profile__user_id=user.id, to_profile__user_id=author_id)),
+        # Beni engelleyen yazarlar
+        Exists(Block.objects.filter(from_profile__user_id=author_id, to_profile__user_id=user.id)),
+    ]
+
+    if exclude_private:
+        # Takip etmediğim gizli profiller
+        conditions.append(Exists(
+            Profile.objects.filter(user_id=author_id, is_private=True).exclude(
+                user_id=user.id
+            ).exclude(
+                followers__user_id=user.id
+            )
+        ))
+
+    return conditions
+
+
+def exclude_hidden_authors(queryset, user, field='user', exclude_private=True):
+    """Queryset'ten kullanıcının göremeyeceği yazarların kayıtlarını çıkarır"""
+    if not user or not user.is_authenticated:
+        return queryset
+
+    for condition in hidden_author_conditions(user, field, exclude_private):
+        queryset = queryset.filter(~condition)
+    return queryset
+
+
+class VisibilityService:
+    """
+    Gönderi, itiraf, yorum ve üye listeleri için ortak engelleme/gizlilik servisi.
+    İstek başına tek bir örnek kullanılır (for_request).
+    """
+
+    def __init__(self, user):
+        self.user = user
+        self._excluded_user_ids = None
+
+    @classmethod
+    def for_request(cls, request):
+        """İsteğe bağlı (memoize edilmiş) servis örneğini döndürür"""
+        service = getattr(request, '_visibility_service', None)
+        if service is None or service.user != request.user:
+            service = cls(request.user)
+            request._visibility_service = service
+        return service
+
+    @property
+    def excluded_user_ids(self):
+        if self._excluded_user_ids is None:
+            self._excluded_user_ids = get_excluded_user_ids(self.user)
+        return self._excluded_user_ids
+
+    def filter_queryset(self, queryset, field='user', exclude_private=True):
+        """Görünmeyen yazarların kayıtlarını veritabanı tarafında filtreler"""
+        return exclude_hidden_authors(queryset, self.user, field, exclude_private)
+
+    def can_view(self, author_id):
+        """Kullanıcı belirtilen yazarın içeriğini görebilir mi?"""
+        if not self.user or not self.user.is_authenticated:
+            return True
+        return author_id == self.user.id or author_id not in self.excluded_user_ids
+
+
+def invalidate_visibility(*user_ids):
+    """Belirtilen kullanıcıların görünürlük kümelerini geçersiz kılar"""
+    generation = _get_generation()
+    cache.delete_many([_cache_key(user_id, generation) for user_id in user_ids if user_id])
+
+
+def invalidate_all_visibility():
+    """
+    Tüm kullanıcıların görünürlük kümelerini geçersiz kılar.
+    Bir profilin gizlilik durumu değiştiğinde herkesin kümesi etkilenir.
+    """
+    try:
+        cache.incr(VISIBILITY_GENERATION_KEY)
+    except ValueError:
+        cache.set(VISIBILITY_GENERATION_KEY, 2, None)
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import FCMToken, NotificationLog
+from .models import FCMToken, NotificationLog, PushOutbox
 
 
 @admin.register(FCMToken)
@@ -49,3 +49,12 @@ class NotificationLogAdmin(admin.ModelAdmin):
             'fields': ('error_message', 'sent_at')
         }),
     )
+
+
+@admin.register(PushOutbox)
+class PushOutboxAdmin(admin.ModelAdmin):
+    list_display = ('id', 'user', 'title', 'status', 'attempts', 'available_at', 'updated_at')
+    list_filter = ('status',)
+    search_fields = ('user__username', 'title', 'last_error')
+    readonly_fields = ('created_at', 'updated_at')
+    ordering = ('-created_at',)
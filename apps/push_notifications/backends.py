@@ -0,0 +1,88 @@
+"""
+Push gönderim backend'leri.
+
+Outbox worker'ı gönderimi PUSH_BACKEND ayarındaki backend'e yaptırır:
+- FirebasePushBackend: FCM üzerinden gerçek gönderim (prod)
+- LocalPushBackend: FCM yerine geçen yerel backend; gönderimleri bellekte tutar ve
+  NotificationLog'a yazar. Geliştirme ortamında ve testlerde Firebase gerekmez,
+  `fail_next` ile geçici FCM hataları (tekrar deneme yolu) simüle edilebilir.
+
+Backend'in `send` metodu teslim edildiyse True, alıcının aktif cihazı yoksa False döner;
+tekrar denenebilir hatalarda PushDeliveryError fırlatır.
+"""
+import threading
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+
+class PushDeliveryError(Exception):
+    """Geçici gönderim hatası; kayıt daha sonra tekrar denenir"""
+
+
+class BasePushBackend:
+    def send(self, user_id, title, body, data=None):
+        raise NotImplementedError
+
+
+class FirebasePushBackend(BasePushBackend):
+    def send(self, user_id, title, body, data=None):
+        from .services import firebase_service
+
+        return firebase_service.send_notification(user_id, title, body, data, raise_errors=True)
+
+
+class LocalPushBackend(BasePushBackend):
+    """FCM stand-in: aktif token başına bir mesajı `sent` listesine ekler"""
+
+    sent = []
+    _failures = 0
+    _lock = threading.Lock()
+
+    def send(self, user_id, title, body, data=None):
+        from .models import FCMToken, NotificationLog
+
+        with self._lock:
+            if LocalPushBackend._failures:
+                LocalPushBackend._failures -= 1
+                raise PushDeliveryError('Simüle edilmiş FCM hatası')
+
+        tokens = list(FCMToken.objects.filter(user_id=user_id, is_active=True))
+        if not tokens:
+            return False
+
+        with self._lock:
+            LocalPushBackend.sent.extend(
+                {'token': token.fcm_token, 'user_id': user_id, 'title': title, 'body': body, 'data': data or {}}
+                for token in tokens
+            )
+        NotificationLog.objects.bulk_create([
+            NotificationLog(user_id=user_id, fcm_token=token, title=title, body=body,
+                            data=data or {}, status='success')
+            for token in tokens
+        ])
+        return True
+
+    @classmethod
+    def fail_next(cls, count=1):
+        """Sonraki `count` gönderimi geçici hatayla sonuçlandırır"""
+        with cls._lock:
+            cls._failures = count
+
+    @classmethod
+    def reset(cls):
+        with cls._lock:
+            cls.sent.clear()
+            cls._failures = 0
+
+
+_backend = None
+
+
+def get_push_backend():
+    global _backend
+    if _backend is None:
+        _backend = import_string(getattr(
+            settings, 'PUSH_BACKEND', 'apps.push_notifications.backends.FirebasePushBackend'
+        ))()
+    return _backend
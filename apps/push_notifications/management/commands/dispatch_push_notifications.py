@@ -0,0 +1,73 @@
+"""
+Push bildirimi outbox worker'ı
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from apps.push_notifications.models import PushOutbox
+from apps.push_notifications.outbox import purge_outbox, run_pending_pushes
+
+
+class Command(BaseCommand):
+    help = "Outbox'taki push bildirimlerini (bildirimler, sohbet mesajları) gönderir"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Bekleyen kayıtları bir kez gönder ve çık (cron için)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=100,
+            help='Her turda alınacak kayıt sayısı (varsayılan: 100)',
+        )
+        parser.add_argument(
+            '--sleep',
+            type=float,
+            default=0.5,
+            help='Outbox boşken bekleme süresi, saniye (varsayılan: 0.5)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Sadece outbox durumunu göster, gönderim yapma',
+        )
+
+    def handle(self, *args, **options):
+        if options['dry_run']:
+            for status, label in PushOutbox.STATUS_CHOICES:
+                count = PushOutbox.objects.filter(status=status).count()
+                self.stdout.write(f"{label}: {count}")
+            return
+
+        batch_size = options['batch_size']
+        purged = purge_outbox()
+        if purged:
+            self.stdout.write(f"🗑️ {purged} eski outbox kaydı silindi")
+        self.stdout.write("Push gönderim worker'ı başladı")
+
+        try:
+            while True:
+                close_old_connections()
+                sent, skipped, failed = run_pending_pushes(batch_size)
+                processed = sent + skipped + failed
+
+                if processed:
+                    self.stdout.write(
+                        self.style.SUCCESS(f"✅ {sent} push gönderildi") +
+                        (f", {skipped} alıcının aktif cihazı yok" if skipped else '') +
+                        (self.style.ERROR(f", ❌ {failed} push başarısız") if failed else '')
+                    )
+
+                if options['once']:
+                    if processed < batch_size:
+                        break
+                    continue
+
+                if not processed:
+                    time.sleep(options['sleep'])
+        except KeyboardInterrupt:
+            self.stdout.write("Worker durduruldu")
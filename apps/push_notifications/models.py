@@ -1,5 +1,6 @@
 from django.db import models
 from django.contrib.auth.models import User
+from django.utils import timezone
 
 
 class FCMToken(models.Model):
@@ -66,3 +67,47 @@ class NotificationLog(models.Model):
     
     def __str__(self):
         return f"{self.user.username} - {self.title} - {self.status}"
+
+
+class PushOutbox(models.Model):
+    """
+    Gönderilecek push bildirimleri (outbox).
+    Kayıt, bildirimi oluşturan işlemle aynı transaction içinde yazılır; gönderim
+    commit sonrası `dispatch_push_notifications` worker'ı tarafından yapılır.
+    """
+    STATUS_PENDING = 'pending'
+    STATUS_PROCESSING = 'processing'
+    STATUS_SENT = 'sent'
+    STATUS_SKIPPED = 'skipped'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Bekliyor'),
+        (STATUS_PROCESSING, 'Gönderiliyor'),
+        (STATUS_SENT, 'Gönderildi'),
+        (STATUS_SKIPPED, 'Atlandı'),  # Aktif cihaz token'ı yok
+        (STATUS_FAILED, 'Başarısız'),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='push_outbox')
+    title = models.CharField(max_length=255)
+    body = models.TextField()
+    data = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True, default='')
+    available_at = models.DateTimeField(default=timezone.now)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'push_outbox'
+        verbose_name = 'Push Outbox'
+        verbose_name_plural = 'Push Outbox'
+        ordering = ['available_at', 'id']
+        indexes = [
+            models.Index(fields=['status', 'available_at']),  # Worker'ın bekleyen kayıtları bulması için
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} - {self.title} - {self.status}"
@@ -0,0 +1,164 @@
+"""
+Push bildirimi outbox'ı.
+
+Bildirim ve sohbet kodu FCM'e istek içinde (ya da WebSocket consumer'ında) senkron
+gitmek yerine `enqueue_push` ile PushOutbox kaydı yazar. Kayıt çağıranın transaction'ına
+dahildir: geri alınan bir bildirim için push gönderilmez, commit edilen hiçbir push kaybolmaz.
+
+Gönderim `python manage.py dispatch_push_notifications` worker'ı tarafından yapılır:
+- Hazır kayıtlar SKIP LOCKED ile kilitlenir (birden fazla worker çalışabilir)
+- Bir partideki gönderimler PUSH_DISPATCH_CONCURRENCY thread ile eşzamanlı yapılır
+- Geçici hatalar artan bekleme süresiyle PUSH_MAX_ATTEMPTS kez denenir
+
+PUSH_DISPATCH_ASYNC kapalıysa (worker'sız geliştirme) kayıtlar commit sonrası
+aynı süreçte gönderilir.
+"""
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .backends import get_push_backend
+
+logger = logging.getLogger(__name__)
+
+PUSH_DISPATCH_CONCURRENCY = getattr(settings, 'PUSH_DISPATCH_CONCURRENCY', 8)
+PUSH_MAX_ATTEMPTS = getattr(settings, 'PUSH_MAX_ATTEMPTS', 5)
+PUSH_RETRY_DELAY = 15  # saniye, her denemede katlanır
+PUSH_LOCK_TIMEOUT = 300  # 5 dakika sonra kilitli kalan kayıt tekrar alınır
+PUSH_OUTBOX_RETENTION_DAYS = getattr(settings, 'PUSH_OUTBOX_RETENTION_DAYS', 7)
+
+_executor = None
+
+
+def _get_executor():
+    # Thread'ler (ve veritabanı bağlantıları) partiler arasında yeniden kullanılır
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=max(1, PUSH_DISPATCH_CONCURRENCY),
+                                       thread_name_prefix='push-dispatch')
+    return _executor
+
+
+def enqueue_push(user_ids, title, body, data=None):
+    """
+    Alıcılar için outbox kayıtları oluşturur (çağıranın transaction'ı içinde).
+
+    Returns:
+        list: Oluşturulan PushOutbox kayıtları
+    """
+    from .models import PushOutbox
+
+    pushes = PushOutbox.objects.bulk_create([
+        PushOutbox(user_id=user_id, title=title[:255], body=body, data=data or {})
+        for user_id in user_ids
+    ])
+
+    if pushes and not getattr(settings, 'PUSH_DISPATCH_ASYNC', True):
+        push_ids = [push.pk for push in pushes]
+        transaction.on_commit(lambda: dispatch_pushes(claim_pushes(len(push_ids), push_ids=push_ids)))
+    return pushes
+
+
+def claim_pushes(limit=100, push_ids=None):
+    """
+    Gönderime hazır kayıtları kilitleyip 'processing' durumuna alır.
+    PostgreSQL'de SKIP LOCKED sayesinde birden fazla worker aynı kaydı almaz.
+    """
+    from .models import PushOutbox
+
+    now = timezone.now()
+    stale = now - timedelta(seconds=PUSH_LOCK_TIMEOUT)
+
+    with transaction.atomic():
+        ready = PushOutbox.objects.select_for_update(skip_locked=True).filter(
+            Q(status=PushOutbox.STATUS_PENDING, available_at__lte=now) |
+            Q(status=PushOutbox.STATUS_PROCESSING, locked_at__lt=stale)
+        )
+        if push_ids is not None:
+            ready = ready.filter(pk__in=push_ids)
+        pushes = list(ready.order_by('available_at', 'id')[:limit])
+        if pushes:
+            PushOutbox.objects.filter(pk__in=[push.pk for push in pushes]).update(
+                status=PushOutbox.STATUS_PROCESSING,
+                locked_at=now,
+            )
+    return pushes
+
+
+def _send(push):
+    try:
+        return get_push_backend().send(push.user_id, push.title, push.body, push.data), None
+    except Exception as e:
+        return None, e
+
+
+def _send_in_thread(push):
+    close_old_connections()
+    return _send(push)
+
+
+def dispatch_pushes(pushes):
+    """
+    Kilitlenmiş kayıtları eşzamanlı gönderir ve durumlarını günceller.
+
+    Returns:
+        tuple: (gönderilen, atlanan, başarısız) kayıt sayıları
+    """
+    from .models import PushOutbox
+
+    if not pushes:
+        return 0, 0, 0
+
+    if len(pushes) == 1 or PUSH_DISPATCH_CONCURRENCY <= 1:
+        results = [_send(push) for push in pushes]
+    else:
+        results = list(_get_executor().map(_send_in_thread, pushes))
+
+    sent_ids, skipped_ids, failed = [], [], 0
+    for push, (delivered, error) in zip(pushes, results):
+        push.attempts += 1
+        if error is None:
+            (sent_ids if delivered else skipped_ids).append(push.pk)
+            continue
+
+        failed += 1
+        logger.warning(f"Push gönderimi başarısız (outbox #{push.pk}, deneme {push.attempts}): {error}")
+        push.last_error = str(error)
+        if push.attempts >= PUSH_MAX_ATTEMPTS:
+            push.status = PushOutbox.STATUS_FAILED
+        else:
+            push.status = PushOutbox.STATUS_PENDING
+            push.available_at = timezone.now() + timedelta(
+                seconds=PUSH_RETRY_DELAY * 2 ** (push.attempts - 1)
+            )
+        push.locked_at = None
+        push.save(update_fields=['attempts', 'last_error', 'status', 'available_at', 'locked_at', 'updated_at'])
+
+    for status, ids in ((PushOutbox.STATUS_SENT, sent_ids), (PushOutbox.STATUS_SKIPPED, skipped_ids)):
+        if ids:
+            PushOutbox.objects.filter(pk__in=ids).update(
+                status=status, attempts=F('attempts') + 1, locked_at=None, updated_at=timezone.now()
+            )
+
+    return len(sent_ids), len(skipped_ids), failed
+
+
+def run_pending_pushes(limit=100):
+    """Bekleyen kayıtlardan bir parti gönderir; (gönderilen, atlanan, başarısız) döner"""
+    return dispatch_pushes(claim_pushes(limit))
+
+
+def purge_outbox(days=PUSH_OUTBOX_RETENTION_DAYS):
+    """Tamamlanmış (gönderilen, atlanan, başarısız) eski kayıtları siler"""
+    from .models import PushOutbox
+
+    deleted, _ = PushOutbox.objects.filter(
+        status__in=[PushOutbox.STATUS_SENT, PushOutbox.STATUS_SKIPPED, PushOutbox.STATUS_FAILED],
+        updated_at__lt=timezone.now() - timedelta(days=days),
+    ).delete()
+    return deleted
@@ -13,10 +13,14 @@ try:
 except ImportError:
     FIREBASE_AVAILABLE = False
 
+from .backends import PushDeliveryError
 from .models import FCMToken, NotificationLog
 
 logger = logging.getLogger(__name__)
 
+# FCM multicast isteği başına en fazla token sayısı
+FCM_MULTICAST_LIMIT = 500
+
 
 class FirebaseNotificationService:
     """
@@ -114,174 +118,162 @@ class FirebaseNotificationService:
             logger.error(f"FCM Token silme hatası: {str(e)}")
             return False
     
-    def send_notification(self, user_id: int, title: str, body: str, data: Optional[Dict[str, Any]] = None) -> bool:
+    def _build_multicast(self, tokens: List[str], title: str, body: str,
+                         data: Optional[Dict[str, Any]]) -> 'messaging.MulticastMessage':
+        """
+        Aynı bildirimi birden fazla token'a gönderen FCM multicast mesajı
+        """
+        return messaging.MulticastMessage(
+            notification=messaging.Notification(
+                title=title,
+                body=body
+            ),
+            data=self._prepare_data(data),
+            tokens=tokens,
+            android=messaging.AndroidConfig(
+                priority='high',
+                notification=messaging.AndroidNotification(
+                    icon='ic_notification',
+                    color='#FF6B6B',
+                    sound='default'
+                )
+            ),
+            apns=messaging.APNSConfig(
+                payload=messaging.APNSPayload(
+                    aps=messaging.Aps(
+                        alert=messaging.ApsAlert(
+                            title=title,
+                            body=body
+                        ),
+                        badge=1,
+                        sound='default'
+                    )
+                )
+            )
+        )
+    
+    def send_to_tokens(self, token_objects: List[FCMToken], title: str, body: str,
+                       data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Token'lara FCM_MULTICAST_LIMIT'lik multicast istekleriyle gönderim yapar.
+        Geçersiz token'lar tek UPDATE ile pasif yapılır, loglar bulk_create ile yazılır.
+        
+        Returns:
+            dict: success/failed sayıları ve geçici hata mesajları (errors)
+        """
+        results = {"success": 0, "failed": 0, "errors": []}
+        
+        for start in range(0, len(token_objects), FCM_MULTICAST_LIMIT):
+            chunk = token_objects[start:start + FCM_MULTICAST_LIMIT]
+            logs = []
+            unregistered_ids = []
+            
+            try:
+                response = messaging.send_each_for_multicast(
+                    self._build_multicast([token_obj.fcm_token for token_obj in chunk], title, body, data)
+                )
+                responses = response.responses
+            except Exception as e:
+                # İstek bütünüyle başarısız (ağ, kimlik doğrulama vs.): parçadaki tüm token'lar
+                error_msg = str(e)
+                logger.error(f"FCM multicast gönderim hatası: {error_msg}")
+                results["failed"] += len(chunk)
+                results["errors"].append(error_msg)
+                logs = [
+                    self._build_log(token_obj, title, body, data, 'failed', error_msg)
+                    for token_obj in chunk
+                ]
+                self._save_logs(logs)
+                continue
+            
+            for token_obj, result in zip(chunk, responses):
+                if result.success:
+                    results["success"] += 1
+                    logs.append(self._build_log(token_obj, title, body, data, 'success'))
+                    continue
+                
+                results["failed"] += 1
+                if isinstance(result.exception, messaging.UnregisteredError):
+                    # Token geçersiz, pasif yap
+                    unregistered_ids.append(token_obj.pk)
+                    logs.append(self._build_log(token_obj, title, body, data, 'failed', 'Token geçersiz'))
+                else:
+                    error_msg = str(result.exception) if result.exception else 'Bilinmeyen hata'
+                    results["errors"].append(error_msg)
+                    logs.append(self._build_log(token_obj, title, body, data, 'failed', error_msg))
+            
+            if unregistered_ids:
+                FCMToken.objects.filter(pk__in=unregistered_ids).update(is_active=False)
+            self._save_logs(logs)
+            logger.info(
+                f"FCM multicast gönderildi: {response.success_count} başarılı, "
+                f"{response.failure_count} başarısız, {len(unregistered_ids)} token pasif yapıldı"
+            )
+        
+        return results
+    
+    def send_notification(self, user_id: int, title: str, body: str, data: Optional[Dict[str, Any]] = None,
+                          raise_errors: bool = False) -> bool:
         """
-        Tek bir kullanıcıya push notification gönderir
+        Tek bir kullanıcıya (tüm aktif cihazlarına tek istekle) push notification gönderir
+
+        raise_errors=True ise (outbox worker'ı) hiçbir cihaza ulaşılamayan geçici
+        hatalarda PushDeliveryError fırlatılır, kayıt tekrar denenir.
         """
         try:
             logger.debug(f"Firebase durumu - FIREBASE_AVAILABLE: {FIREBASE_AVAILABLE}, app: {self.app}")
             if not FIREBASE_AVAILABLE or not self.app:
                 logger.error("Firebase başlatılmamış veya mevcut değil")
+                if raise_errors:
+                    raise PushDeliveryError("Firebase başlatılmamış veya mevcut değil")
                 return False
             
             # Kullanıcının aktif FCM token'larını al
-            user = User.objects.get(id=user_id)
-            fcm_tokens = FCMToken.objects.filter(user=user, is_active=True)
+            fcm_tokens = list(FCMToken.objects.filter(user_id=user_id, is_active=True).only('id', 'user_id', 'fcm_token'))
             
-            if not fcm_tokens.exists():
+            if not fcm_tokens:
                 logger.warning(f"User {user_id} için aktif FCM token bulunamadı")
                 return False
             
-            success_count = 0
+            results = self.send_to_tokens(fcm_tokens, title, body, data)
             
-            for token_obj in fcm_tokens:
-                try:
-                    # FCM mesajı oluştur
-                    message = messaging.Message(
-                        notification=messaging.Notification(
-                            title=title,
-                            body=body
-                        ),
-                        data=self._prepare_data(data),
-                        token=token_obj.fcm_token,
-                        android=messaging.AndroidConfig(
-                            priority='high',
-                            notification=messaging.AndroidNotification(
-                                icon='ic_notification',
-                                color='#FF6B6B',
-                                sound='default'
-                            )
-                        ),
-                        apns=messaging.APNSConfig(
-                            payload=messaging.APNSPayload(
-                                aps=messaging.Aps(
-                                    alert=messaging.ApsAlert(
-                                        title=title,
-                                        body=body
-                                    ),
-                                    badge=1,
-                                    sound='default'
-                                )
-                            )
-                        )
-                    )
-                    
-                    # Mesajı gönder
-                    response = messaging.send(message)
-                    
-                    # Log kaydı
-                    self._log_notification(user, token_obj, title, body, data, 'success')
-                    success_count += 1
-                    
-                    logger.info(f"FCM mesajı gönderildi: {response}")
-                    
-                except messaging.UnregisteredError:
-                    # Token geçersiz, sil
-                    token_obj.is_active = False
-                    token_obj.save()
-                    self._log_notification(user, token_obj, title, body, data, 'failed', 'Token geçersiz')
-                    
-                except Exception as e:
-                    error_msg = str(e)
-                    logger.error(f"FCM gönderim hatası: {error_msg}")
-                    self._log_notification(user, token_obj, title, body, data, 'failed', error_msg)
-            
-            return success_count > 0
+            if raise_errors and results["errors"] and not results["success"]:
+                raise PushDeliveryError('; '.join(results["errors"]))
+            return results["success"] > 0
             
-        except User.DoesNotExist:
-            logger.error(f"User {user_id} bulunamadı")
-            return False
+        except PushDeliveryError:
+            raise
         except Exception as e:
             logger.error(f"FCM notification gönderim hatası: {str(e)}")
             return False
     
     def send_bulk_notifications(self, user_ids: List[int], title: str, body: str, data: Optional[Dict[str, Any]] = None) -> Dict[str, int]:
         """
-        Birden fazla kullanıcıya push notification gönderir
+        Birden fazla kullanıcıya push notification gönderir.
+        Kullanıcılar parça parça işlenir; token'lar bellekte toplanmaz.
         """
         results = {"success": 0, "failed": 0}
         
         if not FIREBASE_AVAILABLE or not self.app:
-            logger.error("deneme", FIREBASE_AVAILABLE, self.app)
-
             logger.error("Firebase başlatılmamış veya mevcut değil")
             return results
         
+        user_ids = list(user_ids)
         try:
-            # Aktif FCM token'ları al
-            fcm_tokens = FCMToken.objects.filter(
-                user_id__in=user_ids, 
-                is_active=True
-            ).select_related('user')
-            
-            if not fcm_tokens.exists():
-                logger.warning(f"Belirtilen kullanıcılar için aktif FCM token bulunamadı: {user_ids}")
-                return results
-            
-            # Mesajları hazırla
-            messages = []
-            token_objects = []
-            
-            for token_obj in fcm_tokens:
-                try:
-                    message = messaging.Message(
-                        notification=messaging.Notification(
-                            title=title,
-                            body=body
-                        ),
-                        data=self._prepare_data(data),
-                        token=token_obj.fcm_token,
-                        android=messaging.AndroidConfig(
-                            priority='high',
-                            notification=messaging.AndroidNotification(
-                                icon='ic_notification',
-                                color='#FF6B6B',
-                                sound='default'
-                            )
-                        ),
-                        apns=messaging.APNSConfig(
-                            payload=messaging.APNSPayload(
-                                aps=messaging.Aps(
-                                    alert=messaging.ApsAlert(
-                                        title=title,
-                                        body=body
-                                    ),
-                                    badge=1,
-                                    sound='default'
-                                )
-                            )
-                        )
-                    )
-                    
-                    messages.append(message)
-                    token_objects.append(token_obj)
-                    
-                except Exception as e:
-                    logger.error(f"Mesaj oluşturma hatası - User {token_obj.user.pk}: {str(e)}")
-                    results["failed"] += 1
-                    self._log_notification(token_obj.user, token_obj, title, body, data, 'failed', str(e))
-            
-            # Toplu gönderim
-            if messages:
-                response = messaging.send_all(messages)
+            for start in range(0, len(user_ids), FCM_MULTICAST_LIMIT):
+                fcm_tokens = list(FCMToken.objects.filter(
+                    user_id__in=user_ids[start:start + FCM_MULTICAST_LIMIT],
+                    is_active=True
+                ).only('id', 'user_id', 'fcm_token'))
+                if not fcm_tokens:
+                    continue
                 
-                # Sonuçları işle
-                for i, result in enumerate(response.responses):
-                    token_obj = token_objects[i]
-                    
-                    if result.success:
-                        results["success"] += 1
-                        self._log_notification(token_obj.user, token_obj, title, body, data, 'success')
-                    else:
-                        results["failed"] += 1
-                        error_msg = result.exception.details if result.exception else 'Bilinmeyen hata'
-                        self._log_notification(token_obj.user, token_obj, title, body, data, 'failed', error_msg)
-                        
-                        # Token geçersizse pasif yap
-                        if isinstance(result.exception, messaging.UnregisteredError):
-                            token_obj.is_active = False
-                            token_obj.save()
+                chunk_results = self.send_to_tokens(fcm_tokens, title, body, data)
+                results["success"] += chunk_results["success"]
+                results["failed"] += chunk_results["failed"]
             
+            if not results["success"] and not results["failed"]:
+                logger.warning(f"Belirtilen {len(user_ids)} kullanıcı için aktif FCM token bulunamadı")
             return results
             
         except Exception as e:
@@ -304,21 +296,24 @@ class FirebaseNotificationService:
         
         return prepared_data
     
-    def _log_notification(self, user: User, token_obj: FCMToken, title: str, body: str, 
-                         data: Optional[Dict[str, Any]], status: str, error_message: Optional[str] = None):
+    def _build_log(self, token_obj: FCMToken, title: str, body: str, data: Optional[Dict[str, Any]],
+                   status: str, error_message: Optional[str] = None) -> NotificationLog:
+        return NotificationLog(
+            user_id=token_obj.user_id,
+            fcm_token=token_obj,
+            title=title,
+            body=body,
+            data=data or {},
+            status=status,
+            error_message=error_message
+        )
+    
+    def _save_logs(self, logs: List[NotificationLog]):
         """
-        Notification gönderim logunu kaydeder
+        Notification gönderim loglarını toplu kaydeder
         """
         try:
-            NotificationLog.objects.create(
-                user=user,
-                fcm_token=token_obj,
-                title=title,
-                body=body,
-                data=data or {},
-                status=status,
-                error_message=error_message
-            )
+            NotificationLog.objects.bulk_create(logs, batch_size=FCM_MULTICAST_LIMIT)
         except Exception as e:
             logger.error(f"Notification log kaydetme hatası: {str(e)}")
     
@@ -1,3 +1,89 @@
-from django.test import TestCase
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from apps.push_notifications import outbox
+from apps.push_notifications.backends import LocalPushBackend
+from apps.push_notifications.models import FCMToken, PushOutbox
+
+
+@override_settings(PUSH_DISPATCH_ASYNC=True)
+class PushOutboxTests(TestCase):
+    def setUp(self):
+        LocalPushBackend.reset()
+        backend = mock.patch.object(outbox, 'get_push_backend', return_value=LocalPushBackend())
+        backend.start()
+        self.addCleanup(backend.stop)
+        self.addCleanup(LocalPushBackend.reset)
+
+        self.user = User.objects.create_user('alici')
+        FCMToken.objects.create(user=self.user, fcm_token='token-1', platform='android')
+
+    def make_ready(self):
+        PushOutbox.objects.update(available_at=timezone.now())
+
+    def test_push_is_sent_by_worker(self):
+        outbox.enqueue_push([self.user.id], 'Başlık', 'Mesaj')
+
+        self.assertEqual(outbox.run_pending_pushes(), (1, 0, 0))
+        push = PushOutbox.objects.get()
+        self.assertEqual(push.status, PushOutbox.STATUS_SENT)
+        self.assertEqual(push.attempts, 1)
+        self.assertEqual([sent['token'] for sent in LocalPushBackend.sent], ['token-1'])
+
+    def test_recipient_without_device_is_skipped(self):
+        other = User.objects.create_user('cihazsiz')
+        outbox.enqueue_push([other.id], 'Başlık', 'Mesaj')
+
+        self.assertEqual(outbox.run_pending_pushes(), (0, 1, 0))
+        self.assertEqual(PushOutbox.objects.get().status, PushOutbox.STATUS_SKIPPED)
+
+    def test_failed_push_is_retried_with_backoff(self):
+        outbox.enqueue_push([self.user.id], 'Başlık', 'Mesaj')
+        LocalPushBackend.fail_next(2)
+
+        before = timezone.now()
+        self.assertEqual(outbox.run_pending_pushes(), (0, 0, 1))
+        push = PushOutbox.objects.get()
+        self.assertEqual(push.status, PushOutbox.STATUS_PENDING)
+        self.assertEqual(push.attempts, 1)
+        self.assertIsNone(push.locked_at)
+        self.assertIn('Simüle', push.last_error)
+        self.assertGreaterEqual(push.available_at, before + timedelta(seconds=outbox.PUSH_RETRY_DELAY))
+
+        # Bekleme süresi dolmadan tekrar alınmaz
+        self.assertEqual(outbox.run_pending_pushes(), (0, 0, 0))
+
+        # İkinci hatada bekleme süresi katlanır
+        self.make_ready()
+        before = timezone.now()
+        self.assertEqual(outbox.run_pending_pushes(), (0, 0, 1))
+        push.refresh_from_db()
+        self.assertEqual(push.attempts, 2)
+        self.assertGreaterEqual(push.available_at, before + timedelta(seconds=outbox.PUSH_RETRY_DELAY * 2))
+
+        self.make_ready()
+        self.assertEqual(outbox.run_pending_pushes(), (1, 0, 0))
+        push.refresh_from_db()
+        self.assertEqual(push.status, PushOutbox.STATUS_SENT)
+        self.assertEqual(push.attempts, 3)
+        self.assertEqual(len(LocalPushBackend.sent), 1)
+
+    def test_push_fails_after_max_attempts(self):
+        outbox.enqueue_push([self.user.id], 'Başlık', 'Mesaj')
+        LocalPushBackend.fail_next(2)
+
+        with mock.patch.object(outbox, 'PUSH_MAX_ATTEMPTS', 2):
+            outbox.run_pending_pushes()
+            self.make_ready()
+            self.assertEqual(outbox.run_pending_pushes(), (0, 0, 1))
+
+        push = PushOutbox.objects.get()
+        self.assertEqual(push.status, PushOutbox.STATUS_FAILED)
+        self.assertEqual(push.attempts, 2)
+        self.make_ready()
+        self.assertEqual(outbox.run_pending_pushes(), (0, 0, 0))
+        self.assertEqual(LocalPushBackend.sent, [])
@@ -511,6 +511,18 @@ FIREBASE_SERVICE_ACCOUNT_KEY = config(
 # Firebase service account key dosyası var mı kontrol et
 FIREBASE_ENABLED = os.path.exists(FIREBASE_SERVICE_ACCOUNT_KEY)
 
+# Push bildirimleri outbox üzerinden gönderilir: python manage.py dispatch_push_notifications
+# False yapılırsa gönderim commit sonrası aynı süreçte yapılır (worker'sız geliştirme için)
+PUSH_DISPATCH_ASYNC = config('PUSH_DISPATCH_ASYNC', default=True, cast=bool)
+PUSH_DISPATCH_CONCURRENCY = config('PUSH_DISPATCH_CONCURRENCY', default=8, cast=int)
+PUSH_MAX_ATTEMPTS = config('PUSH_MAX_ATTEMPTS', default=5, cast=int)
+# Development'ta FCM yerine yerel backend (gönderimler bellekte ve NotificationLog'da tutulur)
+PUSH_BACKEND = config(
+    'PUSH_BACKEND',
+    default='apps.push_notifications.backends.LocalPushBackend' if DEBUG
+    else 'apps.push_notifications.backends.FirebasePushBackend'
+)
+
 # ==============================================================================
 # RECAPTCHA CONFIGURATION
 # ==============================================================================
@@ -591,3 +603,27 @@ NEW_ACCOUNT_DAILY_LIMITS = {
     'likes': config('NEW_ACCOUNT_LIKE_LIMIT', default=50, cast=int)
 }
 
+
+# ==============================================================================
+# HOME TIMELINE
+# ==============================================================================
+
+# Yeni / silinen gönderilerin ana sayfa zaman çizelgelerine dağıtımı: python manage.py dispatch_timeline_fanout
+# False yapılırsa dağıtım commit sonrası istek sürecinde yapılır (worker'sız geliştirme için)
+HOME_TIMELINE_FANOUT_ASYNC = config('HOME_TIMELINE_FANOUT_ASYNC', default=True, cast=bool)
+
+
+# ==============================================================================
+# IMAGE PROCESSING
+# ==============================================================================
+
+# Resimler arka planda işlenir: python manage.py process_image_jobs
+# False yapılırsa işleme commit sonrası istek sürecinde yapılır (worker'sız geliştirme için)
+IMAGE_PROCESSING_ASYNC = config('IMAGE_PROCESSING_ASYNC', default=True, cast=bool)
+IMAGE_JOB_MAX_ATTEMPTS = config('IMAGE_JOB_MAX_ATTEMPTS', default=3, cast=int)
+
+# Çok resimli gönderilerde (resim x preset) paralel işleme.
+# 0: CPU sayısı (en fazla 4), 1: sıralı işleme
+IMAGE_PROCESSING_WORKERS = config('IMAGE_PROCESSING_WORKERS', default=0, cast=int)
+# Worker süreci başına bellek sınırı (MB)
+IMAGE_PROCESSING_MEMORY_LIMIT_MB = config('IMAGE_PROCESSING_MEMORY_LIMIT_MB', default=1024, cast=int)
@@ -7,5 +7,18 @@ unset PYTHONPATH
 export PYTHONPATH=/var/www/kampuslu
 export DJANGO_SETTINGS_MODULE=core.settings
 
+# Arka plan worker'ları (IMAGE_PROCESSING_ASYNC / HOME_TIMELINE_FANOUT_ASYNC / PUSH_DISPATCH_ASYNC
+# açıkken resimler, zaman çizelgesi dağıtımı ve push bildirimleri bunlarla işlenir)
+WORKER_PIDS=()
+venv/bin/python manage.py process_image_jobs &
+WORKER_PIDS+=($!)
+venv/bin/python manage.py dispatch_timeline_fanout &
+WORKER_PIDS+=($!)
+venv/bin/python manage.py dispatch_push_notifications &
+WORKER_PIDS+=($!)
+
+# Daphne kapanınca worker'ları da durdur
+trap 'kill "${WORKER_PIDS[@]}" 2>/dev/null' EXIT
+
 # Daphne'yi başlat
-exec venv/bin/daphne -b 127.0.0.1 -p 8001 core.asgi:application
\ No newline at end of file
+venv/bin/daphne -b 127.0.0.1 -p 8001 core.asgi:application